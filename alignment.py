@@ -0,0 +1,110 @@
+"""
+Calendar alignment of mixed-asset panels (24/7 crypto, exchange-traded
+indices, futures, forex) without silently losing history.
+
+Series are first merged on the union of their dates: the sorted date arrays
+are merged (stable sort of already-sorted runs, then deduplication) and each
+series is scattered into the union by position, with no hash join. The wide
+price panel is then aligned on a calendar chosen by policy:
+- "Compound": trading calendar, i.e. dates where at least one asset that
+  does not trade on weekends has a price (all dates when every asset trades
+  24/7). Prices are forward-filled onto it, so the weekend moves of crypto
+  are compounded into the next trading day instead of being dropped;
+- "Forward-fill": every date of the union, prices forward-filled (an asset
+  that is closed has a zero return that day);
+- "Intersect": only the dates where every asset has a price.
+
+Returns are always computed from the aligned prices, so a gap is compounded
+over the next row instead of being lost. Rows before every asset has a first
+price are the only dates dropped, and align_prices reports every count.
+"""
+import numpy as np
+import pandas as pd
+
+from intraday import infer_bars_per_year
+
+ALIGNMENT_POLICIES = ["Compound", "Forward-fill", "Intersect"]
+
+
+def union_index(indexes) -> pd.DatetimeIndex:
+    """Sorted union of several sorted DatetimeIndexes (same time zone)."""
+    indexes = [idx for idx in indexes if len(idx)]
+    if not indexes:
+        return pd.DatetimeIndex([])
+    tz = indexes[0].tz
+    # .values is UTC for tz-aware indexes; the stable sort merges sorted runs
+    keys = np.sort(np.concatenate([idx.values for idx in indexes]), kind="stable")
+    keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+    union = pd.DatetimeIndex(keys, name=indexes[0].name)
+    return union.tz_localize("UTC").tz_convert(tz) if tz is not None else union
+
+
+def union_frame(series: dict) -> pd.DataFrame:
+    """{name: Series with a sorted DatetimeIndex} -> wide frame on the union of dates."""
+    index = union_index([s.index for s in series.values()])
+    keys = index.values
+    values = np.full((len(index), len(series)), np.nan)
+    for j, s in enumerate(series.values()):
+        values[np.searchsorted(keys, s.index.values), j] = s.to_numpy(dtype=float)
+    return pd.DataFrame(values, index=index, columns=list(series))
+
+
+def trades_weekends(prices: pd.DataFrame) -> np.ndarray:
+    """Per column: True when the asset has prices on Saturdays or Sundays (e.g. crypto)."""
+    weekend = prices.index.dayofweek >= 5
+    return np.isfinite(prices.to_numpy(dtype=float)[weekend]).any(axis=0)
+
+
+def trading_calendar(prices: pd.DataFrame) -> np.ndarray:
+    """Row mask of the dates where an asset that is closed on weekends has a price."""
+    listed = np.isfinite(prices.to_numpy(dtype=float))
+    exchange = ~trades_weekends(prices)
+    if not exchange.any():
+        return listed.any(axis=1)
+    return listed[:, exchange].any(axis=1)
+
+
+def align_prices(prices: pd.DataFrame, policy: str = "Compound") -> tuple[pd.DataFrame, dict]:
+    """
+    Align a wide price frame (dates x assets, NaN where an asset has no
+    price) on the calendar of `policy`. Returns (aligned prices, info):
+    - dates: dates with at least one price;
+    - rows: dates kept;
+    - warm_up: dates dropped before every asset has a price;
+    - merged: other dates left out, whose moves are compounded into the next row;
+    - filled: forward-filled prices in the kept rows;
+    - periods_per_year: 365 when Saturday rows are kept, 252 otherwise.
+    """
+    listed = np.isfinite(prices.to_numpy(dtype=float))
+    if policy == "Intersect":
+        rows = listed.all(axis=1)
+    elif policy == "Forward-fill":
+        rows = listed.any(axis=1)
+    elif policy == "Compound":
+        rows = trading_calendar(prices)
+    else:
+        raise ValueError(f"Unknown alignment policy: {policy!r}")
+
+    # Warm-up: rows before every asset has its first price
+    started = np.logical_or.accumulate(listed, axis=0).all(axis=1)
+    rows &= started
+    aligned = prices.ffill()[rows]
+
+    dates = listed.any(axis=1)
+    first = int(started.argmax()) if started.any() else len(prices)
+    info = {
+        "policy": policy,
+        "dates": int(dates.sum()),
+        "rows": int(rows.sum()),
+        "warm_up": int(dates[:first].sum()),
+        "filled": int((~listed[rows]).sum()),
+        "periods_per_year": infer_bars_per_year(aligned.index),
+    }
+    info["merged"] = info["dates"] - info["rows"] - info["warm_up"]
+    return aligned, info
+
+
+def aligned_returns(prices: pd.DataFrame, policy: str = "Compound") -> tuple[pd.DataFrame, dict]:
+    """Simple returns between consecutive aligned rows, and the alignment info."""
+    aligned, info = align_prices(prices, policy)
+    return aligned.pct_change().iloc[1:], info
@@ -0,0 +1,290 @@
+"""
+Computation behind the dashboard pages, free of any Streamlit dependency so
+it can be reused by batch jobs, the CLI tools and tests.
+
+Results are memoized on the fingerprints of the input data (versioning.py):
+a refresh where no bar changed returns the previous result objects, which
+must therefore be treated as read-only.
+"""
+import numpy as np
+import pandas as pd
+
+from alignment import aligned_returns
+from costs import CostModel, turnover_metrics
+from cross_section import cross_sectional_momentum
+from metrics import compute_metrics_matrix
+from montecarlo import historical_var, monte_carlo_var, parametric_var
+from optimizer import optimize_weights
+from portfolio_sim import simulate_portfolio
+from profiling import timed
+from rolling import rolling_correlation, rolling_risk
+from strategies import (
+    moving_average_strategy,
+    moving_average_sweep,
+    momentum_strategy,
+    momentum_sweep,
+)
+from versioning import attach_fingerprint, memoize_on_fingerprint
+
+
+@timed()
+@memoize_on_fingerprint
+def single_asset_analysis(
+    data: pd.DataFrame,
+    short_window: int = 20,
+    long_window: int = 50,
+    lookback: int = 60,
+    costs: CostModel | None = None,
+    periods_per_year: float = 252,
+) -> dict:
+    """Buy & Hold vs MA vs Momentum on one price/return frame."""
+    ma_df = moving_average_strategy(
+        data, short_window=short_window, long_window=long_window, costs=costs
+    )
+    mom_df = momentum_strategy(data, lookback=lookback, costs=costs)
+
+    # Last price vs the previous session's close (same as the last return on daily bars)
+    last_date = data.index[-1].date()
+    before = data["price"][data.index.date < last_date]
+    if not before.empty:
+        day_ret = float(data["price"].iloc[-1] / before.iloc[-1] - 1)
+    else:
+        day_ret = float(data["return"].iloc[-1])
+
+    strategy_returns = pd.DataFrame(
+        {
+            "price": np.ravel(data["price"].to_numpy()),
+            "ret_bh": np.ravel(data["return"].to_numpy()),
+            "ret_ma": np.ravel(ma_df["strategy_return"].to_numpy()),
+            "ret_mom": np.ravel(mom_df["strategy_return"].to_numpy()),
+        },
+        index=data.index,
+    )
+
+    equity = (1 + strategy_returns[["ret_bh", "ret_ma", "ret_mom"]]).cumprod()
+    equity.columns = ["Buy & Hold", "MA Strategy", "Momentum Strategy"]
+    equity.insert(0, "Price", strategy_returns["price"])
+
+    return {
+        "ma": ma_df,
+        "momentum": mom_df,
+        "returns": strategy_returns,
+        "equity": equity,
+        "last_price": float(strategy_returns["price"].iloc[-1]),
+        "day_return": day_ret,
+        "cum_bh": float(equity["Buy & Hold"].iloc[-1] - 1),
+        "trading": pd.DataFrame(
+            {
+                "MA Strategy": turnover_metrics(ma_df["trade"], ma_df["cost"], periods_per_year),
+                "Momentum Strategy": turnover_metrics(
+                    mom_df["trade"], mom_df["cost"], periods_per_year
+                ),
+            }
+        ).T,
+    }
+
+
+@timed()
+@memoize_on_fingerprint
+def panel_returns(
+    panel: pd.DataFrame, labels: dict, alignment: str = "Compound"
+) -> tuple[pd.DataFrame, list, dict]:
+    """
+    Wide returns by label from a load_yahoo_panel frame, computed from the
+    prices aligned with an alignment.py policy (no date is silently lost).
+    labels: {label: ticker}. Returns (returns, missing labels, alignment info).
+    """
+    available = set(panel["price"].columns) if not panel.empty else set()
+    kept = {label: tkr for label, tkr in labels.items() if tkr in available}
+    missing = [label for label in labels if label not in kept]
+
+    if not kept:
+        return pd.DataFrame(), missing, {}
+    prices = panel["price"][list(kept.values())]
+    prices.columns = list(kept)
+    returns, info = aligned_returns(prices, alignment)
+    return attach_fingerprint(returns), missing, info
+
+
+@timed()
+@memoize_on_fingerprint
+def optimized_allocation(
+    returns: pd.DataFrame,
+    method: str,
+    long_only: bool = True,
+    max_weight: float | None = None,
+    rf: float = 0.0,
+    periods_per_year: float = 252,
+) -> dict:
+    """Optimized target weights for a returns panel (see optimizer.py)."""
+    return optimize_weights(
+        returns,
+        method,
+        long_only=long_only,
+        max_weight=max_weight,
+        rf=rf,
+        periods_per_year=periods_per_year,
+    )
+
+
+@timed()
+@memoize_on_fingerprint
+def portfolio_analysis(
+    returns: pd.DataFrame,
+    weights: pd.Series,
+    rebalance: str | None = "Daily",
+    threshold: float | None = None,
+    initial_nav: float = 100.0,
+    costs: CostModel | None = None,
+    periods_per_year: float = 252,
+) -> dict:
+    """Rebalanced portfolio, equity curves, correlation and per-asset metrics."""
+    result = simulate_portfolio(
+        returns, weights, rebalance=rebalance, threshold=threshold, costs=costs
+    )
+    portfolio_returns = result["returns"]
+    nav = result["nav"]
+
+    current_nav = float(initial_nav * nav.iloc[-1])
+    last_day = portfolio_returns.index[-1].date()
+    today_ret = portfolio_returns.loc[portfolio_returns.index.date == last_day]
+    day_ret = float(today_ret.sum()) if not today_ret.empty else 0.0
+
+    equity = (1 + returns).cumprod()
+    equity["Portfolio"] = nav
+
+    return {
+        **result,
+        "nav_value": current_nav,
+        "day_pnl": current_nav * day_ret,
+        "equity": equity,
+        "corr": returns.corr(),
+        "asset_metrics": compute_metrics_matrix(
+            returns.assign(Portfolio=portfolio_returns), periods_per_year=periods_per_year
+        ),
+        "trading": turnover_metrics(result["trades"], result["costs"], periods_per_year),
+    }
+
+
+@timed()
+@memoize_on_fingerprint
+def rolling_risk_analysis(
+    returns: pd.DataFrame,
+    portfolio_returns: pd.Series,
+    window: int = 63,
+    benchmark: pd.Series | None = None,
+    pairs=None,
+    periods_per_year: float = 252,
+) -> dict:
+    """
+    Rolling risk of each asset and the portfolio (rolling.py), plus the
+    rolling correlation of the selected asset pairs.
+    """
+    return {
+        **rolling_risk(
+            returns,
+            window,
+            benchmark,
+            periods_per_year=periods_per_year,
+            portfolio=portfolio_returns,
+        ),
+        "pair_correlation": rolling_correlation(returns, window, pairs) if pairs else None,
+    }
+
+
+@timed()
+@memoize_on_fingerprint
+def portfolio_var_analysis(
+    returns: pd.DataFrame,
+    weights: pd.Series,
+    horizon: int = 1,
+    level: float = 0.05,
+    n_paths: int = 100_000,
+    seed: int | None = 0,
+    workers: int = 1,
+    periods_per_year: float = 252,
+) -> pd.DataFrame:
+    """
+    Historical, parametric and Monte Carlo VaR / CVaR of a fixed-weight
+    portfolio over `horizon` trading days (252 a year), i.e. the same span
+    of time in bars of `returns` whatever its periods_per_year.
+    """
+    bars = max(1, round(horizon * periods_per_year / 252))
+    rows = {
+        "Historical": historical_var(returns, weights, bars, level),
+        "Parametric (Gaussian)": parametric_var(returns, weights, bars, level),
+    }
+    for method in ("Gaussian", "Bootstrap"):
+        result = monte_carlo_var(
+            returns, weights, bars, n_paths, level, method=method, seed=seed, workers=workers
+        )
+        rows[f"Monte Carlo ({method})"] = {"var": result["var"], "cvar": result["cvar"]}
+    return pd.DataFrame(rows).T.rename(columns={"var": "VaR", "cvar": "CVaR"})
+
+
+@timed()
+@memoize_on_fingerprint
+def sweep_analysis(
+    data: pd.DataFrame,
+    short_windows,
+    long_windows,
+    lookbacks,
+    periods_per_year: float = 252,
+    costs: CostModel | None = None,
+) -> dict:
+    """MA and momentum parameter sweeps (see strategies.py), net of `costs`."""
+    return {
+        "ma": moving_average_sweep(
+            data, short_windows, long_windows, periods_per_year=periods_per_year, costs=costs
+        ),
+        "momentum": momentum_sweep(
+            data, lookbacks, periods_per_year=periods_per_year, costs=costs
+        ),
+    }
+
+
+@timed()
+@memoize_on_fingerprint
+def cross_sectional_analysis(
+    prices: pd.DataFrame,
+    lookback: int = 126,
+    skip: int = 0,
+    top_k: int = 3,
+    long_short: bool = False,
+    rebalance: str = "Monthly",
+    costs: CostModel | None = None,
+    periods_per_year: float = 252,
+) -> dict:
+    """
+    Cross-sectional momentum on a wide price frame (see cross_section.py),
+    compared with an equal-weight book of the same universe rebalanced on
+    the same dates. `prices` should already be aligned (alignment.align_prices),
+    with the matching periods_per_year.
+    """
+    result = cross_sectional_momentum(
+        prices,
+        lookback,
+        skip,
+        top_k,
+        long_short=long_short,
+        rebalance=rebalance,
+        periods_per_year=periods_per_year,
+        costs=costs,
+    )
+    # Equal weight = every asset ranked "top": top_k at least the universe size
+    equal = cross_sectional_momentum(
+        prices,
+        1,
+        0,
+        prices.shape[1],
+        rebalance=rebalance,
+        periods_per_year=periods_per_year,
+        costs=costs,
+    )
+    label = f"Top {top_k} long/short" if long_short else f"Top {top_k} long"
+    returns = pd.DataFrame({label: result["returns"], "Equal weight": equal["returns"]})
+    return {
+        **result,
+        "equity": (1 + returns).cumprod(),
+        "metrics": compute_metrics_matrix(returns, periods_per_year=periods_per_year),
+    }
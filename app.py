@@ -3,6 +3,10 @@ from streamlit_autorefresh import st_autorefresh
 
 from pages.single_asset import render_single_asset
 from pages.portfolio import render_portfolio
+from pages.snapshots import render_snapshots
+from profiling import profile_run
+from streamlit_adapters import render_timings
+from universe import UNIVERSE, UNIVERSE_BY_CATEGORY
 
 
 # ----------------- Global config -----------------
@@ -42,6 +46,10 @@ def go_portfolio():
     st.session_state.page = "Portfolio"
 
 
+def go_snapshots():
+    st.session_state.page = "Snapshots"
+
+
 # ----------------- Sidebar + refresh -----------------
 auto_refresh = True
 refresh_mins = 5
@@ -51,6 +59,7 @@ with st.sidebar:
     st.button("Home", on_click=go_home, use_container_width=True)
     st.button("Single Asset", on_click=go_single_asset, use_container_width=True)
     st.button("Portfolio", on_click=go_portfolio, use_container_width=True)
+    st.button("Snapshots", on_click=go_snapshots, use_container_width=True)
     st.markdown("---")
     st.caption("Python / Git / Linux for Finance – ESILV")
 
@@ -64,38 +73,6 @@ if auto_refresh:
     st_autorefresh(interval=int(refresh_mins * 60 * 1000), key="auto_refresh")
 
 
-# ----------------- Asset universe -----------------
-UNIVERSE = {
-    
-    "Engie (ENGI)": "ENGI.PA",
-    "CAC 40": "^FCHI",
-    "EURUSD": "EURUSD=X",
-    "Bitcoin": "BTC-USD",
-    "Ethereum": "ETH-USD",
-    "Solana": "SOL-USD",
-    "WTI Crude Oil": "CL=F",
-    "Natural Gas": "NG=F",
-}
-
-UNIVERSE_BY_CATEGORY = {
-    "Equities / Indices": {
-        "Engie (ENGI)": "ENGI.PA",
-        "CAC 40": "^FCHI",
-    },
-    "Forex": {"EURUSD": "EURUSD=X"},
-    "Crypto": {
-        "Bitcoin": "BTC-USD",
-        "Ethereum": "ETH-USD",
-        "Solana": "SOL-USD",
-    },
-    "Commodities": {
-        "WTI Crude Oil": "CL=F",
-        "Natural Gas": "NG=F",
-    },
-    "Mixed (all types)": UNIVERSE,
-}
-
-
 # ----------------- Pages -----------------
 if st.session_state.page == "Home":
     st.markdown(
@@ -161,9 +138,18 @@ if st.session_state.page == "Home":
         )
 
 elif st.session_state.page == "Single Asset":
-    render_single_asset(UNIVERSE, auto_refresh)
+    with profile_run("single_asset") as timings:
+        render_single_asset(UNIVERSE, auto_refresh)
+    render_timings(timings)
 
 elif st.session_state.page == "Portfolio":
-    render_portfolio(UNIVERSE_BY_CATEGORY, auto_refresh)
+    with profile_run("portfolio") as timings:
+        render_portfolio(UNIVERSE_BY_CATEGORY, auto_refresh)
+    render_timings(timings)
+
+elif st.session_state.page == "Snapshots":
+    with profile_run("snapshots") as timings:
+        render_snapshots()
+    render_timings(timings)
 
 #
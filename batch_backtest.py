@@ -0,0 +1,301 @@
+"""
+Headless batch backtester: every strategy and parameter combination of a
+grid, run on many tickers outside the Streamlit process.
+
+Each (ticker, strategy) pair is one task that backtests all of its parameter
+combinations with strategies.backtest / strategy_metrics. Tasks are spread
+over a process pool and prices live in a shared-memory block
+(walk_forward.SharedPricePanel), so workers never receive a pickled frame.
+
+Every finished task is appended to a checkpoint file (one JSON line), so an
+interrupted sweep restarts where it stopped when run again with the same
+arguments. The checkpoint is removed once the results table is written.
+
+Example (nightly research sweep):
+    python batch_backtest.py --universe-file tickers.txt --start 2010-01-01 \
+        --strategies ma momentum breakout --grid grid.json --workers 8 \
+        --fee-bps 5 --output sweep.parquet
+
+The grid is a JSON object (inline or a .json file) of
+{strategy: {param: [values, ...]}}; stop_loss / take_profit / trailing_stop
+can be part of it. Strategies missing from it use DEFAULT_GRIDS.
+"""
+import argparse
+import datetime as dt
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from costs import CostModel
+from daily_report import load_universe
+from data import load_yahoo_panel
+from profiling import profile_run
+from strategies import STRATEGIES, backtest, strategy_metrics
+from walk_forward import SharedPricePanel
+
+DEFAULT_GRIDS = {
+    "ma": {"short_window": [10, 20, 30, 50], "long_window": [50, 100, 150, 200]},
+    "momentum": {"lookback": [20, 60, 120, 250]},
+    "breakout": {"entry_window": [20, 55, 100], "exit_window": [10, 20, 50]},
+}
+
+# Combinations that make no sense for a strategy are skipped
+CONSTRAINTS = {
+    "ma": lambda p: p["short_window"] < p["long_window"],
+}
+
+
+def expand_grid(strategy: str, grid: dict) -> list:
+    """All parameter dicts of a {param: values} grid that satisfy the strategy constraint."""
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    valid = CONSTRAINTS.get(strategy)
+    return [p for p in combos if valid is None or valid(p)]
+
+
+def parse_grid(spec: str | None) -> dict:
+    """Grid from inline JSON or a .json file path (None -> {})."""
+    if not spec:
+        return {}
+    if os.path.exists(spec):
+        with open(spec) as f:
+            return json.load(f)
+    return json.loads(spec)
+
+
+# ----------------- Tasks -----------------
+_panel = None
+
+
+def _init_worker(tickers, offsets, shm_name):
+    global _panel
+    _panel = SharedPricePanel(tickers, offsets, shm_name)
+
+
+def run_task(
+    ticker_idx: int, strategy: str, combos: list, costs: CostModel | None = None
+) -> list:
+    """Backtest every parameter combination of one strategy on one ticker."""
+    df = _panel.frame(ticker_idx)
+    rows = []
+    for params in combos:
+        result = backtest(df, STRATEGIES[strategy], costs, **params)
+        rows.append(
+            {
+                "ticker": _panel.tickers[ticker_idx],
+                "strategy": strategy,
+                **params,
+                "n_bars": len(df),
+                **strategy_metrics(result),
+            }
+        )
+    return rows
+
+
+def _run_task(args):
+    return run_task(*args)
+
+
+# ----------------- Checkpoints -----------------
+def task_key(ticker: str, strategy: str, combos: list, start, end, costs) -> str:
+    """Identifies a task and everything its result depends on."""
+    return json.dumps([ticker, strategy, combos, str(start), str(end), repr(costs)], default=str)
+
+
+def load_checkpoint(path: str) -> dict:
+    """{task key: rows} of the tasks finished by a previous run."""
+    done = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:  # line cut by an interruption
+                    continue
+                done[entry["key"]] = entry["rows"]
+    return done
+
+
+def _progress(done: int, total: int, t0: float, label: str):
+    elapsed = time.perf_counter() - t0
+    eta = elapsed / done * (total - done) if done else float("nan")
+    print(
+        f"[{done}/{total}] {label}  elapsed {elapsed:.0f}s  eta {eta:.0f}s",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def run_batch(
+    series: dict,
+    strategies: list,
+    grids: dict | None = None,
+    costs: CostModel | None = None,
+    workers: int | None = None,
+    checkpoint: str | None = None,
+    start=None,
+    end=None,
+    progress: bool = True,
+) -> pd.DataFrame:
+    """
+    Backtest {ticker: price Series} with every strategy and grid combination.
+    Returns one row per (ticker, strategy, parameters): parameters, n_bars,
+    performance metrics and trading activity (net of `costs`).
+
+    Tasks already in `checkpoint` are not recomputed; new ones are appended
+    to it as they finish. start/end only enter the checkpoint keys.
+    """
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategies: {unknown}")
+    grids = {**DEFAULT_GRIDS, **(grids or {})}
+    workers = workers or os.cpu_count() or 1
+
+    tickers = list(series)
+    tasks, keys, param_names = [], [], {}
+    for strategy in strategies:
+        combos = expand_grid(strategy, grids.get(strategy, {}))
+        param_names.update(dict.fromkeys(grids.get(strategy, {})))
+        for i, ticker in enumerate(tickers):
+            tasks.append((i, strategy, combos, costs))
+            keys.append(task_key(ticker, strategy, combos, start, end, costs))
+
+    done = load_checkpoint(checkpoint)
+    results = {key: done[key] for key in keys if key in done}
+    pending = [(key, task) for key, task in zip(keys, tasks) if key not in results]
+    if progress and results:
+        print(f"Resuming: {len(results)}/{len(tasks)} tasks from {checkpoint}", file=sys.stderr)
+
+    global _panel
+    panel = SharedPricePanel.create(series)
+    log = open(checkpoint, "a") if checkpoint else None
+    t0 = time.perf_counter()
+
+    def finish(key, task, rows):
+        results[key] = rows
+        if log is not None:
+            log.write(json.dumps({"key": key, "rows": rows}) + "\n")
+            log.flush()
+        if progress:
+            label = f"{tickers[task[0]]} {task[1]} ({len(rows)} runs)"
+            _progress(len(results), len(tasks), t0, label)
+
+    try:
+        if workers == 1:
+            _panel = panel
+            for key, task in pending:
+                finish(key, task, _run_task(task))
+            _panel = None
+        elif pending:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(panel.tickers, panel.offsets, panel.name),
+            ) as pool:
+                futures = {pool.submit(_run_task, task): (key, task) for key, task in pending}
+                for future in as_completed(futures):
+                    key, task = futures[future]
+                    finish(key, task, future.result())
+    finally:
+        _panel = None
+        if log is not None:
+            log.close()
+        panel.close()
+
+    # Task order whatever the completion order; parameter columns first
+    table = pd.DataFrame([row for key in keys for row in results[key]])
+    first = ["ticker", "strategy", *param_names, "n_bars"]
+    return table[[c for c in first if c in table] + [c for c in table if c not in first]]
+
+
+def best_runs(results: pd.DataFrame, metric: str = "sharpe") -> pd.DataFrame:
+    """Best row by `metric` for each (ticker, strategy)."""
+    if results.empty:
+        return results
+    ranked = results.dropna(subset=[metric])
+    best = ranked.loc[ranked.groupby(["ticker", "strategy"], sort=False)[metric].idxmax()]
+    return best.reset_index(drop=True)
+
+
+def save_results(results: pd.DataFrame, path: str):
+    """Write the table as Parquet (.parquet) or CSV (anything else)."""
+    if path.endswith(".parquet"):
+        results.to_parquet(path, index=False)
+    else:
+        results.to_csv(path, index=False)
+
+
+# ----------------- CLI -----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch backtest over tickers and parameter grids.")
+    parser.add_argument("--tickers", nargs="+", help="tickers to backtest")
+    parser.add_argument(
+        "--universe-file",
+        help="JSON {label: ticker} or text file with one ticker per line",
+    )
+    parser.add_argument("--start", default="2015-01-01")
+    parser.add_argument("--end", default=dt.date.today().isoformat())
+    parser.add_argument(
+        "--strategies", nargs="+", choices=sorted(STRATEGIES), default=sorted(DEFAULT_GRIDS)
+    )
+    parser.add_argument(
+        "--grid", help='JSON grid or .json file, e.g. {"momentum": {"lookback": [20, 60]}}'
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--fee-bps", type=float, default=0.0, help="proportional fee per trade")
+    parser.add_argument("--slippage-bps", type=float, default=0.0)
+    parser.add_argument("--output", default="batch_backtest.csv", help=".csv or .parquet")
+    parser.add_argument(
+        "--checkpoint", default=None, help="resume file (default: <output>.checkpoint.jsonl)"
+    )
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers or [])
+    if args.universe_file:
+        tickers += list(load_universe(args.universe_file).values())
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        parser.error("give --tickers and/or --universe-file")
+
+    checkpoint = args.checkpoint or args.output + ".checkpoint.jsonl"
+    if args.fresh and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    with profile_run("batch_backtest"):
+        panel, failures = load_yahoo_panel(tuple(tickers), args.start, args.end)
+        for ticker, error in failures.items():
+            print(f"WARNING: no data for {ticker} ({error}), skipped.")
+        if panel.empty:
+            print("ERROR: no data for any ticker.")
+            return 1
+        prices = panel["price"]
+        series = {t: prices[t].dropna() for t in prices.columns}
+
+        results = run_batch(
+            series,
+            args.strategies,
+            grids=parse_grid(args.grid),
+            costs=CostModel(fee_bps=args.fee_bps, slippage_bps=args.slippage_bps),
+            workers=args.workers,
+            checkpoint=checkpoint,
+            start=args.start,
+            end=args.end,
+        )
+
+    save_results(results, args.output)
+    os.remove(checkpoint)
+    print(f"{len(results)} backtests saved to {args.output}")
+    best = best_runs(results)
+    if not best.empty:
+        print(best.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1 @@
+"""Offline benchmarks for the data, strategy, metric and portfolio hot paths."""
@@ -0,0 +1,268 @@
+"""
+Time the hot paths on synthetic GBM data and write the results to JSON.
+
+    python -m benchmarks.run --days 2520 --assets 50 --output bench.json
+
+Each case reports the best and median wall time over --repeat runs and the
+peak Python memory allocated during one run (tracemalloc). Everything runs
+offline: the data cases use a price store backed by the synthetic provider
+and by fixtures replayed from disk (providers.FileProvider).
+"""
+import argparse
+import atexit
+import datetime as dt
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from alignment import aligned_returns, union_frame
+from batch_backtest import run_batch
+from benchmarks.synthetic import StubUpstream, gbm_asset_frame, gbm_downloader, gbm_prices
+from charts import downsample
+from costs import CostModel
+from cross_section import cross_sectional_momentum
+from data import LIVE_TTL, _request
+from fetch_service import FetchService
+from intraday import RingBuffer
+from metrics import StreamingMetrics, compute_metrics_matrix, compute_performance_metrics
+from montecarlo import monte_carlo_var
+from optimizer import optimize_weights
+from portfolio_sim import simulate_portfolio
+from price_store import PriceStore
+from providers import FileProvider, save_fixture
+from rolling import rolling_beta, rolling_correlation, rolling_var, rolling_volatility
+from snapshots import load_snapshot, snapshot_bytes
+from strategies import (
+    backtest,
+    breakout_signals,
+    momentum_strategy,
+    momentum_sweep,
+    moving_average_strategy,
+    moving_average_sweep,
+)
+
+
+def measure(fn, repeat: int = 5) -> dict:
+    """Best/median wall time (seconds) and peak traced memory (MB) of fn()."""
+    fn()  # warm-up (imports, caches)
+
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "best_s": min(times),
+        "median_s": statistics.median(times),
+        "peak_mb": peak / 1e6,
+        "repeat": repeat,
+    }
+
+
+def build_cases(n_days: int, n_assets: int) -> dict:
+    """{name: zero-argument callable} for every benchmarked hot path."""
+    asset = gbm_asset_frame(n_days, seed=1)
+    prices = gbm_prices(n_days + 1, n_assets, seed=2)
+    returns = prices.pct_change().dropna()
+    weights = np.full(n_assets, 1.0 / n_assets)
+    stream = StreamingMetrics.from_returns(asset["return"])
+
+    def data_store_cold():
+        with tempfile.TemporaryDirectory() as root:
+            store = PriceStore(root, downloader=gbm_downloader())
+            for i in range(min(n_assets, 20)):
+                store.sync(f"T{i}", "2010-01-01", "2020-01-01")
+
+    warm_root = tempfile.mkdtemp(prefix="bench_store_")
+    atexit.register(shutil.rmtree, warm_root, ignore_errors=True)
+    warm_store = PriceStore(warm_root, downloader=gbm_downloader())
+    for i in range(min(n_assets, 20)):
+        warm_store.sync(f"T{i}", "2010-01-01", "2020-01-01")
+
+    def data_store_warm():
+        for i in range(min(n_assets, 20)):
+            warm_store.sync(f"T{i}", "2012-01-01", "2019-01-01")
+
+    fixture_root = tempfile.mkdtemp(prefix="bench_fixtures_")
+    atexit.register(shutil.rmtree, fixture_root, ignore_errors=True)
+    for i in range(min(n_assets, 20)):
+        save_fixture(fixture_root, f"T{i}", warm_store.read(f"T{i}"))
+
+    def data_store_replay():
+        with tempfile.TemporaryDirectory() as root:
+            store = PriceStore(root, downloader=FileProvider(fixture_root))
+            for i in range(min(n_assets, 20)):
+                store.sync(f"T{i}", "2010-01-01", "2020-01-01")
+
+    # Only ranges that reach today can receive new bars and expire
+    if _request("T0", "2010-01-01", "2020-01-01")[3] is not None:
+        raise RuntimeError("a closed historical range must not expire")
+    if _request("T0", "2020-01-01", dt.date.today())[3] != LIVE_TTL:
+        raise RuntimeError(f"a range reaching today must expire after {LIVE_TTL} s")
+
+    def data_fetch_coalesced():
+        # 64 concurrent sessions asking for 8 tickers: 8 upstream calls
+        service, upstream = FetchService(max_concurrency=4), StubUpstream(latency=0.01)
+        tickers = [f"T{i % 8}" for i in range(64)]
+        threads = [
+            threading.Thread(
+                target=service.get, args=(t, upstream, t, "2010-01-01", "2020-01-01")
+            )
+            for t in tickers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        service.close()
+        if upstream.calls != 8:
+            raise RuntimeError(f"{upstream.calls} upstream calls for 8 distinct requests")
+        if upstream.peak > service.max_concurrency:
+            raise RuntimeError("concurrency limit exceeded")
+
+    last_return = float(asset["return"].iloc[-1])
+
+    def streaming_one_bar():
+        stream.update(last_return)
+
+    ring = RingBuffer(10_000)
+    ring.extend(asset.index[-10_000:], asset["price"].to_numpy()[-10_000:])
+    last_time, last_price = asset.index[-1], float(asset["price"].iloc[-1])
+
+    def ring_buffer_one_bar():
+        ring.append(last_time, last_price)
+        ring.values.mean()
+
+    # Mixed calendars: every asset misses ~2% of the dates (holidays, gaps)
+    gapped = {
+        c: prices[c].sample(frac=0.98, random_state=i).sort_index()
+        for i, c in enumerate(prices.columns)
+    }
+    gapped_prices = union_frame(gapped)
+
+    equity = (1 + returns).cumprod()
+    sim = simulate_portfolio(returns, weights, "Monthly")
+    snapshot = snapshot_bytes("portfolio", {"n_assets": n_assets}, {"returns": returns}, sim)
+
+    return {
+        "data.price_store_cold_sync": data_store_cold,
+        "data.price_store_warm_read": data_store_warm,
+        "data.price_store_fixture_replay": data_store_replay,
+        "data.fetch_service_coalesced": data_fetch_coalesced,
+        "snapshots.export_portfolio": lambda: snapshot_bytes(
+            "portfolio", {"n_assets": n_assets}, {"returns": returns}, sim
+        ),
+        "snapshots.load_portfolio": lambda: load_snapshot(snapshot),
+        "strategies.moving_average": lambda: moving_average_strategy(asset, 20, 50),
+        "strategies.momentum": lambda: momentum_strategy(asset, 60),
+        "strategies.breakout_with_stops": lambda: backtest(
+            asset, breakout_signals, stop_loss=0.05, trailing_stop=0.1, entry_window=55
+        ),
+        "strategies.moving_average_sweep": lambda: moving_average_sweep(
+            asset, range(5, 101, 5), range(20, 251, 10)
+        ),
+        "strategies.momentum_sweep": lambda: momentum_sweep(asset, range(5, 251)),
+        "strategies.batch_grid_serial": lambda: run_batch(
+            {t: prices[t] for t in prices.columns[:5]},
+            ["ma", "momentum", "breakout"],
+            workers=1,
+            progress=False,
+        ),
+        "strategies.moving_average_sweep_costs": lambda: moving_average_sweep(
+            asset, range(5, 101, 5), range(20, 251, 10), costs=CostModel(fee_bps=10, slippage_bps=5)
+        ),
+        "metrics.series": lambda: compute_performance_metrics(asset["return"]),
+        "metrics.matrix": lambda: compute_metrics_matrix(returns),
+        "metrics.streaming_one_bar": streaming_one_bar,
+        "intraday.ring_buffer_one_bar": ring_buffer_one_bar,
+        "portfolio.simulate_daily": lambda: simulate_portfolio(returns, weights, "Daily"),
+        "portfolio.simulate_monthly": lambda: simulate_portfolio(returns, weights, "Monthly"),
+        "portfolio.simulate_threshold": lambda: simulate_portfolio(
+            returns, weights, "Quarterly", threshold=0.05
+        ),
+        "portfolio.simulate_monthly_costs": lambda: simulate_portfolio(
+            returns, weights, "Monthly", costs=CostModel(fee_bps=10, fixed_cost=5)
+        ),
+        "portfolio.correlation": lambda: returns.corr(),
+        "cross_section.momentum_long_short": lambda: cross_sectional_momentum(
+            prices, top_k=max(1, n_assets // 5), long_short=True, costs=CostModel(fee_bps=10)
+        ),
+        "alignment.union_frame": lambda: union_frame(gapped),
+        "alignment.compound_returns": lambda: aligned_returns(gapped_prices, "Compound"),
+        "alignment.forward_fill_returns": lambda: aligned_returns(gapped_prices, "Forward-fill"),
+        "charts.equity_lttb": lambda: downsample(equity, method="lttb"),
+        "charts.equity_minmax": lambda: downsample(equity, method="minmax"),
+        "rolling.volatility": lambda: rolling_volatility(returns, 63),
+        "rolling.var": lambda: rolling_var(returns, 252),
+        "rolling.beta": lambda: rolling_beta(returns, returns.iloc[:, 0], 63),
+        "rolling.correlation_all_pairs": lambda: rolling_correlation(returns, 63),
+        "montecarlo.gaussian_1m_paths_10d": lambda: monte_carlo_var(
+            returns, weights, horizon=10, n_paths=1_000_000, seed=0
+        ),
+        "montecarlo.bootstrap_100k_paths_10d": lambda: monte_carlo_var(
+            returns, weights, horizon=10, n_paths=100_000, method="Bootstrap", seed=0
+        ),
+        "optimizer.min_variance": lambda: optimize_weights(returns, "Minimum variance"),
+        "optimizer.max_sharpe": lambda: optimize_weights(returns, "Maximum Sharpe"),
+        "optimizer.risk_parity": lambda: optimize_weights(returns, "Risk parity"),
+    }
+
+
+def run(n_days: int, n_assets: int, repeat: int = 5, only: str | None = None) -> dict:
+    cases = build_cases(n_days, n_assets)
+    results = {}
+    for name, fn in cases.items():
+        if only and only not in name:
+            continue
+        results[name] = measure(fn, repeat)
+        r = results[name]
+        print(
+            f"{name:<36} best {r['best_s'] * 1e3:9.2f} ms   "
+            f"median {r['median_s'] * 1e3:9.2f} ms   peak {r['peak_mb']:8.2f} MB"
+        )
+
+    return {
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "params": {"days": n_days, "assets": n_assets, "repeat": repeat},
+        "environment": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analytics hot paths.")
+    parser.add_argument("--days", type=int, default=2520, help="bars per series")
+    parser.add_argument("--assets", type=int, default=50, help="panel width")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default=None, help="run cases whose name contains this")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    report = run(args.days, args.assets, args.repeat, args.only)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from providers import SyntheticProvider
+
+
+def gbm_prices(
+    n_days: int = 2520,
+    n_assets: int = 1,
+    mu: float = 0.07,
+    sigma: float = 0.2,
+    start: str = "2000-01-03",
+    seed: int | None = 0,
+    s0: float = 100.0,
+) -> pd.DataFrame:
+    """
+    Geometric Brownian motion price panel on business days: n_days x n_assets,
+    annualized drift `mu` and volatility `sigma`, columns ASSET_000, ...
+    """
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / 252
+    shocks = rng.standard_normal((n_days, n_assets))
+    log_ret = (mu - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * shocks
+    prices = s0 * np.exp(np.cumsum(log_ret, axis=0))
+    index = pd.bdate_range(start, periods=n_days, name="Date")
+    columns = [f"ASSET_{i:03d}" for i in range(n_assets)]
+    return pd.DataFrame(prices, index=index, columns=columns)
+
+
+def gbm_asset_frame(n_days: int = 2520, seed: int | None = 0, **kwargs) -> pd.DataFrame:
+    """Single-asset frame with the price/return columns used by strategies.py."""
+    prices = gbm_prices(n_days + 1, 1, seed=seed, **kwargs).iloc[:, 0]
+    df = prices.rename("price").to_frame()
+    df["return"] = df["price"].pct_change()
+    return df.dropna()
+
+
+def gbm_downloader(seed: int = 0, **kwargs) -> SyntheticProvider:
+    """
+    Stub downloader for price_store.PriceStore: deterministic GBM closes for
+    any (ticker, start, end[, interval]), without network.
+    """
+    return SyntheticProvider(seed=seed, **kwargs)
+
+
+class StubUpstream:
+    """
+    Local stand-in for a slow upstream: sleeps `latency` seconds per call,
+    counts calls (total and peak concurrency) and answers with GBM closes.
+    """
+
+    def __init__(self, latency: float = 0.01, seed: int = 0):
+        self.latency = latency
+        self.provider = SyntheticProvider(seed=seed)
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker: str, start, end, interval: str = "1d") -> pd.Series | None:
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.latency)
+            return self.provider(ticker, start, end, interval=interval)
+        finally:
+            with self._lock:
+                self.active -= 1
@@ -0,0 +1,118 @@
+"""
+Pluggable result cache behind the fetch service (fetch_service.FetchService).
+
+A backend stores values under hashable keys, optionally with a time-to-live:
+get(key, default), put(key, value, ttl), clear(), plus len / bytes /
+evictions for the service statistics. Two implementations:
+- MemoryCacheBackend (default): thread-safe in-process LRU bounded by the
+  total size of its values; one per process, so shared by every Streamlit
+  session;
+- NoCacheBackend: never keeps anything (benchmarks, tests, debugging).
+
+The backend is chosen at runtime with the CACHE_BACKEND environment variable
+(see make_cache_backend) or passed to FetchService, so batch jobs and the
+dashboard pick one without any Streamlit dependency.
+"""
+import collections
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+
+
+def sizeof(value) -> int:
+    """Approximate memory footprint in bytes (pandas objects measured deeply)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class MemoryCacheBackend:
+    """Thread-safe LRU cache bounded by the total size of its values."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: float):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[2] is not None and time.monotonic() >= entry[2]:
+                self._remove(key)
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, ttl: float | None = None):
+        """Insert `value` (expiring after ttl seconds when given), then evict down to max_bytes."""
+        size = sizeof(value)
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self.bytes += size
+            # The newest entry is kept even when it alone exceeds the budget
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+class NoCacheBackend:
+    """Always recompute: nothing is stored."""
+
+    name = "none"
+    bytes = 0
+    evictions = 0
+
+    def __len__(self):
+        return 0
+
+    def get(self, key, default=None):
+        return default
+
+    def put(self, key, value, ttl: float | None = None):
+        pass
+
+    def clear(self):
+        pass
+
+
+def make_cache_backend(spec: str | None = None, max_bytes: float = 512e6):
+    """
+    Build a backend from a spec string (default: the CACHE_BACKEND
+    environment variable): "memory" (LRU of max_bytes) or "none".
+    """
+    spec = spec or CACHE_BACKEND
+    if spec == "memory":
+        return MemoryCacheBackend(max_bytes)
+    if spec == "none":
+        return NoCacheBackend()
+    raise ValueError(f"Unknown cache backend spec: {spec!r}")
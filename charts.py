@@ -0,0 +1,97 @@
+"""
+Chart payload preparation: shape-preserving downsampling of long series.
+
+st.line_chart serializes every row it gets, so multi-year daily or intraday
+histories make the JSON payload and the browser rendering dominate page
+latency. Charts only need a few thousand points to look identical:
+- "lttb" (Largest-Triangle-Three-Buckets) keeps, in each bucket, the point
+  that forms the largest triangle with the previously kept point and the
+  next bucket's average, which preserves the visual shape;
+- "minmax" keeps the minimum and maximum of each bucket (every spike
+  survives), fully vectorized.
+
+For a frame, indices are selected per column (on its non-missing values) and
+the union of rows is kept, so every series is drawn from its own extremes.
+Only chart inputs are downsampled: tables and exports use the full data.
+"""
+import numpy as np
+import pandas as pd
+
+CHART_MAX_POINTS = 2000
+DOWNSAMPLING_METHODS = ["lttb", "minmax"]
+
+
+def _x_values(index: pd.Index) -> np.ndarray:
+    """Numeric x coordinates: seconds for a DatetimeIndex, positions otherwise."""
+    if isinstance(index, pd.DatetimeIndex) and len(index):
+        return (index - index[0]).total_seconds().to_numpy()
+    return np.arange(len(index), dtype=float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions of the n_out points kept by LTTB (first and last always kept)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets between the first and the last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i == n_out - 3:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            nxt = slice(hi, edges[i + 2])
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Positions of the minimum and maximum of each of n_buckets equal buckets."""
+    n = len(y)
+    if 2 * n_buckets + 2 >= n:
+        return np.arange(n)
+    bucket = np.arange(n) * n_buckets // n
+    # Sorted by bucket, then value: each bucket starts with its min, ends with its max
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket, np.arange(n_buckets), side="left")
+    ends = np.searchsorted(bucket, np.arange(n_buckets), side="right") - 1
+    return np.unique(np.concatenate([[0, n - 1], order[starts], order[ends]]))
+
+
+def downsample(data, max_points: int = CHART_MAX_POINTS, method: str = "lttb"):
+    """
+    Rows of a Series/DataFrame to chart: at most about max_points (unchanged
+    when already shorter). Each column gets an equal share of the budget.
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method!r}")
+    if len(data) <= max_points:
+        return data
+
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    budget = max(max_points // max(frame.shape[1], 1), 4)
+    x = _x_values(frame.index)
+    values = frame.to_numpy(dtype=float)
+
+    keep = []
+    for k in range(values.shape[1]):
+        valid = np.flatnonzero(np.isfinite(values[:, k]))
+        if valid.size == 0:
+            continue
+        y = values[valid, k]
+        if method == "lttb":
+            picked = lttb_indices(x[valid], y, budget)
+        else:
+            picked = minmax_indices(y, budget // 2)
+        keep.append(valid[picked])
+
+    if not keep:
+        return data.iloc[[0, -1]]
+    return data.iloc[np.unique(np.concatenate(keep))]
@@ -0,0 +1,104 @@
+"""
+Transaction cost model shared by the strategies and the rebalancing engine.
+
+Trades are absolute changes of position (as a fraction of capital) and are
+taken from vectorized position diffs. The cost of a trade of size s is
+
+    s * (fee + slippage(s)) + fixed_cost / capital   (if s > 0)
+
+with fee and slippage in return units; the default slippage is a constant
+spread plus an optional square-root market impact term. Costs are charged
+as a return drag on the bar where the trade happens.
+"""
+import numpy as np
+
+
+class CostModel:
+    """
+    - fee_bps: proportional fee per unit traded (basis points);
+    - fixed_cost: fixed cost per trade, in currency;
+    - capital: portfolio value used to express fixed costs as a return;
+    - slippage_bps: constant half-spread paid per unit traded;
+    - impact: coefficient of the square-root impact term impact * sqrt(s);
+    - slippage: optional callable s -> slippage rate (replaces the two above).
+    """
+
+    def __init__(
+        self,
+        fee_bps: float = 0.0,
+        fixed_cost: float = 0.0,
+        capital: float = 100_000.0,
+        slippage_bps: float = 0.0,
+        impact: float = 0.0,
+        slippage=None,
+    ):
+        if capital <= 0:
+            raise ValueError("capital must be positive")
+        self.fee_bps = fee_bps
+        self.fixed_cost = fixed_cost
+        self.capital = capital
+        self.slippage_bps = slippage_bps
+        self.impact = impact
+        self.slippage = slippage
+
+    def _key(self) -> tuple:
+        return (
+            self.fee_bps,
+            self.fixed_cost,
+            self.capital,
+            self.slippage_bps,
+            self.impact,
+            self.slippage,
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, CostModel) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return (
+            f"CostModel(fee_bps={self.fee_bps}, fixed_cost={self.fixed_cost}, "
+            f"capital={self.capital}, slippage_bps={self.slippage_bps}, impact={self.impact})"
+        )
+
+    @property
+    def is_zero(self) -> bool:
+        return (
+            self.fee_bps == 0
+            and self.fixed_cost == 0
+            and self.slippage_bps == 0
+            and self.impact == 0
+            and self.slippage is None
+        )
+
+    def slippage_rate(self, size: np.ndarray) -> np.ndarray:
+        if self.slippage is not None:
+            return np.asarray(self.slippage(size), dtype=float)
+        return self.slippage_bps / 1e4 + self.impact * np.sqrt(size)
+
+    def trade_costs(self, trades) -> np.ndarray:
+        """Cost (fraction of capital) of each trade in `trades`, any shape."""
+        size = np.abs(np.asarray(trades, dtype=float))
+        rate = self.fee_bps / 1e4 + self.slippage_rate(size)
+        return size * rate + np.where(size > 0, self.fixed_cost / self.capital, 0.0)
+
+
+def turnover_metrics(trades, costs, periods_per_year: float = 252) -> dict:
+    """
+    Trading activity of a strategy or portfolio, from its trades (T or T x N,
+    fractions of capital) and per-bar costs:
+    - n_trades: number of non-zero trades;
+    - turnover: annualized traded volume (sum of |trades| per year);
+    - cost_drag: annualized cost (sum of costs per year).
+    """
+    trades = np.abs(np.asarray(trades, dtype=float))
+    costs = np.asarray(costs, dtype=float)
+    n = trades.shape[0]
+    years = n / periods_per_year if n else np.nan
+    return {
+        "n_trades": int(np.count_nonzero(trades)),
+        "turnover": float(trades.sum() / years) if n else np.nan,
+        "cost_drag": float(costs.sum() / years) if n else np.nan,
+    }
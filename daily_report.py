@@ -1,54 +1,233 @@
+import argparse
 import datetime as dt
+import json
 import os
-import pandas as pd  # kept if you want to extend the report later
 
-from data import load_yahoo_data
-from metrics import compute_performance_metrics
+import numpy as np
+import pandas as pd
 
-TICKER = "^FCHI"          # main index (CAC 40)
-REPORT_FILE = "daily_report_log.txt"
+from data import load_yahoo_panel, set_fetch_service
+from fetch_service import FetchService
+from intraday import infer_bars_per_year
+from metrics import compute_metrics_matrix
+from profiling import profile_run
+from snapshots import save_snapshot
+from universe import UNIVERSE
+
+REPORT_DIR = os.environ.get("REPORT_DIR", ".")  # where the report files go
+REPORT_FILE = "daily_report_log.txt"      # human-readable summary
+REPORT_JSONL = "daily_report.jsonl"       # one JSON row per ticker and run
 DAYS_LOOKBACK = 252       # lookback for performance metrics
+FETCH_WORKERS = 32        # concurrent downloads
 
 
-def generate_daily_report():
-    end_date = dt.date.today()
-    start_date = end_date - dt.timedelta(days=DAYS_LOOKBACK)
+def load_universe(path: str | None = None) -> dict:
+    """
+    {label: ticker} to report on. Defaults to universe.UNIVERSE; a file can be
+    a JSON object {label: ticker} or plain text with one ticker per line.
+    """
+    if path is None:
+        return dict(UNIVERSE)
+
+    with open(path) as f:
+        content = f.read()
+    if path.endswith(".json"):
+        return dict(json.loads(content))
+
+    tickers = [line.strip() for line in content.splitlines()]
+    return {t: t for t in tickers if t and not t.startswith("#")}
+
+
+def load_reports(path: str | None = None) -> pd.DataFrame:
+    """All report rows written so far, one per (run, ticker)."""
+    if path is None:
+        path = os.path.join(REPORT_DIR, REPORT_JSONL)
+    return pd.read_json(path, lines=True, convert_dates=["date", "generated_at"])
+
+
+def load_report_panel(
+    universe: dict, end_date: dt.date, lookback: int = DAYS_LOOKBACK
+) -> tuple[pd.DataFrame, dict]:
+    """Fetch the universe concurrently: (panel, {ticker: error})."""
+    start_date = end_date - dt.timedelta(days=lookback)
+    tickers = tuple(dict.fromkeys(universe.values()))
+    return load_yahoo_panel(tickers, start_date, end_date)
+
+
+def build_report_rows(
+    universe: dict,
+    panel: pd.DataFrame,
+    failures: dict,
+    end_date: dt.date,
+    lookback: int = DAYS_LOOKBACK,
+) -> list:
+    """Report rows of a loaded panel, metrics computed in one batched pass."""
+    generated_at = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    if panel.empty:
+        metrics = pd.DataFrame()
+    else:
+        # Per asset: 365 periods a year for 24/7 markets (crypto), 252 otherwise
+        periods_per_year = pd.Series(
+            {t: infer_bars_per_year(panel["price"][t].dropna().index) for t in panel["price"]}
+        )
+        metrics = compute_metrics_matrix(panel["return"], periods_per_year=periods_per_year)
+
+    rows = []
+    for label, ticker in universe.items():
+        row = {
+            "date": end_date.isoformat(),
+            "generated_at": generated_at,
+            "ticker": ticker,
+            "label": label,
+            "lookback_days": lookback,
+        }
+        if ticker in failures or ticker not in metrics.index:
+            row["status"] = "error"
+            row["error"] = failures.get(ticker, "no data")
+        else:
+            prices = panel["price"][ticker].dropna()
+            row["status"] = "ok"
+            row["last_price"] = float(prices.iloc[-1])
+            row["last_date"] = prices.index[-1].date().isoformat()
+            # NaN is not valid JSON: missing metrics are written as null
+            row.update(
+                {k: float(v) if np.isfinite(v) else None for k, v in metrics.loc[ticker].items()}
+            )
+        rows.append(row)
+    return rows
+
 
-    data = load_yahoo_data(TICKER, start=start_date, end=end_date)
+def _fmt(value, spec: str) -> str:
+    width = spec.split(".")[0]
+    return f"{'n/a':>{width}}" if value is None else format(value, ">" + spec)
 
-    if data is None or data.empty:
-        log_message = (
-            f"[{dt.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] "
-            f"ERROR: No data for {TICKER}."
+
+def format_summary(rows: list, end_date: dt.date, lookback: int = DAYS_LOOKBACK) -> str:
+    """Human summary of one run, one line per ticker."""
+    lines = [
+        f"--- Daily Report ({end_date}) – {len(rows)} assets, {lookback}d lookback ---",
+        f"{'Asset':<26}{'Close':>12}{'Cum. ret':>10}{'Ann. vol':>10}"
+        f"{'Sharpe':>8}{'Max DD':>10}{'VaR 95%':>10}",
+    ]
+    for row in rows:
+        name = row["ticker"]
+        if row["label"] != row["ticker"]:
+            name = f"{row['label']} ({name})"
+        if row["status"] != "ok":
+            lines.append(f"{name:<26}  ERROR: {row['error']}")
+            continue
+        lines.append(
+            f"{name:<26}{_fmt(row['last_price'], '12.2f')}{_fmt(row['cum_return'], '10.2%')}"
+            f"{_fmt(row['ann_vol'], '10.2%')}{_fmt(row['sharpe'], '8.2f')}"
+            f"{_fmt(row['max_dd'], '10.2%')}{_fmt(row['var_95'], '10.2%')}"
         )
-        print(log_message)
-        with open(REPORT_FILE, "a") as f:
-            f.write(log_message + "\n")
-        return
+    return "\n".join(lines) + "\n\n"
+
 
-    returns = data["return"].dropna()
-    metrics = compute_performance_metrics(returns)
+def save_report_snapshot(
+    universe: dict,
+    panel: pd.DataFrame,
+    rows: list,
+    end_date: dt.date,
+    lookback: int,
+    root: str,
+) -> str | None:
+    """
+    Snapshot of a run (prices, equity curves and metrics by label) for the
+    dashboard's Snapshots page, built from the panel the report was computed on.
+    """
+    if panel.empty:
+        return None
+    tickers = tuple(dict.fromkeys(universe.values()))
 
-    last_price = float(data["price"].iloc[-1].item())
+    labels = {ticker: label for label, ticker in universe.items()}
+    returns = panel["return"].rename(columns=labels)
+    report = pd.DataFrame(rows).set_index("label")
+    metric_columns = [
+        c for c in ("cum_return", "ann_vol", "sharpe", "max_dd", "var_95") if c in report
+    ]
+    return save_snapshot(
+        "daily_report",
+        {"date": end_date, "lookback": lookback, "tickers": tickers},
+        {"prices": panel["price"].rename(columns=labels)},
+        {
+            "equity": (1 + returns.fillna(0.0)).cumprod(),
+            "metrics": report[metric_columns].astype(float),
+            "report": report,
+        },
+        root=root,
+        label=end_date.isoformat(),
+    )
 
 
-    report_content = f"""
---- Daily Report ({end_date}) for {TICKER} (CAC 40) ---
-Closing price: {last_price:.2f}
-Cumulative return ({DAYS_LOOKBACK}d): {metrics['cum_return']:.2%}
-Annualized volatility: {metrics['ann_vol']:.2%}
-Sharpe ratio: {metrics['sharpe']:.2f}
-Maximum drawdown: {metrics['max_dd']:.2%}
-Daily 95% VaR: {metrics['var_95']:.2%}
+def generate_daily_report(
+    universe: dict | None = None,
+    lookback: int = DAYS_LOOKBACK,
+    snapshot_dir: str | None = None,
+    report_dir: str = REPORT_DIR,
+):
+    universe = universe or load_universe()
+    end_date = dt.date.today()
 
-"""
+    panel, failures = load_report_panel(universe, end_date, lookback)
+    rows = build_report_rows(universe, panel, failures, end_date, lookback)
 
-    with open(REPORT_FILE, "a") as f:
-        f.write(report_content)
+    os.makedirs(report_dir, exist_ok=True)
+    jsonl_path = os.path.join(report_dir, REPORT_JSONL)
+    log_path = os.path.join(report_dir, REPORT_FILE)
+    with open(jsonl_path, "a") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
 
-    print(f"Report generated and saved to {REPORT_FILE}")
+    summary = format_summary(rows, end_date, lookback)
+    with open(log_path, "a") as f:
+        f.write("\n" + summary)
+
+    n_errors = sum(row["status"] != "ok" for row in rows)
+    print(summary, end="")
+    print(
+        f"Report generated for {len(rows) - n_errors}/{len(rows)} assets "
+        f"and saved to {log_path} / {jsonl_path}"
+    )
+    if snapshot_dir:
+        path = save_report_snapshot(universe, panel, rows, end_date, lookback, snapshot_dir)
+        if path:
+            print(f"Snapshot saved to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily performance report.")
+    parser.add_argument(
+        "--universe-file",
+        default=os.environ.get("REPORT_UNIVERSE_FILE"),
+        help="JSON {label: ticker} or text file with one ticker per line "
+        "(default: the dashboard universe)",
+    )
+    parser.add_argument("--lookback", type=int, default=DAYS_LOOKBACK)
+    parser.add_argument(
+        "--report-dir",
+        default=REPORT_DIR,
+        help="directory of the summary log and JSONL rows (default: REPORT_DIR or .)",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        help="also save the run as a snapshot in this directory "
+        "(served by the dashboard's Snapshots page)",
+    )
+    args = parser.parse_args(argv)
+
+    # One process per run: a wider fetch pool than the dashboard's
+    set_fetch_service(FetchService(max_concurrency=FETCH_WORKERS))
+    # Stage timings go to PROFILE_LOG when it is set
+    with profile_run("daily_report"):
+        generate_daily_report(
+            load_universe(args.universe_file),
+            args.lookback,
+            snapshot_dir=args.snapshot_dir,
+            report_dir=args.report_dir,
+        )
 
 
 if __name__ == "__main__":
-    generate_daily_report()
-#
\ No newline at end of file
+    main()
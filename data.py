@@ -1,34 +1,169 @@
 import datetime as dt
+import os
 
-import numpy as np
 import pandas as pd
-import streamlit as st
-import yfinance as yf
 
+from alignment import union_frame
+from fetch_service import FetchService
+from intraday import is_intraday, max_history_days
+from price_store import PRICE_STORE_DIR, PriceStore
+from profiling import timed
+from providers import make_provider
+from versioning import attach_fingerprint
 
-@st.cache_data(show_spinner=False, ttl=300)
-def load_yahoo_data(ticker: str, start, end):
+LIVE_TTL = 300  # seconds before a range reaching today is fetched again
+
+_store = None
+_service = None
+
+
+def get_price_store() -> PriceStore:
+    """
+    Shared on-disk price store (created on first use), fed by the provider
+    configured with DATA_PROVIDER (providers.make_provider). Offline
+    providers get their own sub-directory so their prices never mix with
+    downloaded ones.
+    """
+    global _store
+    if _store is None:
+        provider = make_provider()
+        root = PRICE_STORE_DIR
+        if provider.name in ("file", "synthetic"):
+            root = os.path.join(PRICE_STORE_DIR, provider.name)
+        _store = PriceStore(root, downloader=provider)
+    return _store
+
+
+def prices_to_frame(prices: pd.Series) -> pd.DataFrame:
+    """Build the usual price/return frame from a Series of closes."""
+    df = prices.rename("price").to_frame()
+    df["return"] = df["price"].pct_change()
+    df = df.dropna()
+    return df
+
+
+def intraday_range(start, end, interval: str) -> tuple[dt.date, dt.date]:
+    """
+    Clamp [start, end] to what Yahoo serves for an intraday interval, with
+    `end` made inclusive so the current session's bars are included.
+    """
+    start, end = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+    oldest = dt.date.today() - dt.timedelta(days=max_history_days(interval) - 1)
+    return max(start, oldest), end + dt.timedelta(days=1)
+
+
+class NoDataError(LookupError):
+    """No usable data for a ticker and range (raised, so it is never cached)."""
+
+
+def _fetch_frame(ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+    """
+    Price/return frame of one ticker from the price store. Raises NoDataError
+    when there is no data: an empty answer may be a transient upstream
+    hiccup, so it must not stay in the fetch cache. Provider failures are
+    raised as well.
+    """
+    if is_intraday(interval):
+        start, end = intraday_range(start, end, interval)
+    prices = get_price_store().sync(ticker, start, end, interval=interval)
+
+    if prices is None or prices.empty:
+        raise NoDataError("no data for this period")
+
+    df = prices_to_frame(prices)
+    if df.empty:
+        raise NoDataError("not enough observations")
+    return attach_fingerprint(df, ticker)
+
+
+def get_fetch_service() -> FetchService:
+    """
+    Process-wide fetch service (created on first use, sized by the
+    FETCH_CONCURRENCY / FETCH_CACHE_MB environment variables), shared by
+    every dashboard session.
+    """
+    global _service
+    if _service is None:
+        _service = FetchService()
+    return _service
+
+
+def set_fetch_service(service: FetchService):
+    """Use `service` for the loaders from now on (e.g. a wider pool for batch jobs)."""
+    global _service
+    _service = service
+
+
+def _request(ticker: str, start, end, interval: str = "1d") -> tuple:
+    """(key, fn, args, ttl) fetch request of one ticker frame."""
+    key = (ticker, pd.Timestamp(start).date(), pd.Timestamp(end).date(), interval)
+    # Past ranges never change: they stay cached until evicted
+    ttl = LIVE_TTL if key[2] >= dt.date.today() else None
+    return key, _fetch_frame, (ticker, start, end, interval), ttl
+
+
+@timed()
+def load_yahoo_data(ticker: str, start, end, interval: str = "1d"):
     """
     Download daily data from Yahoo Finance and return a DataFrame
     with columns: price, return.
+    History already in the local price store is read from disk; only the
+    missing head/tail of [start, end) is downloaded.
+    interval: "1d" or an intraday bar size from intraday.INTERVALS ("1h",
+    "5m", ...); intraday ranges are clamped to what Yahoo serves and include
+    the `end` date.
+    Returns None when there is no data; provider failures (after retries)
+    raise providers.ProviderError.
+    Requests go through the shared fetch service: concurrent identical
+    requests from several sessions share one fetch.
     """
+    key, fn, args, ttl = _request(ticker, start, end, interval)
     try:
-        df = yf.download(
-            ticker,
-            start=start,
-            end=end,
-            auto_adjust=True,
-            progress=False,
-        )
-    except Exception:
+        return get_fetch_service().get(key, fn, *args, ttl=ttl)
+    except NoDataError:
         return None
 
-    if df is None or df.empty:
-        return None
 
-    df = df[["Close"]].rename(columns={"Close": "price"})
-    df["return"] = df["price"].pct_change()
-    df = df.dropna()
+@timed()
+def load_yahoo_panel(tickers: tuple, start, end):
+    """
+    Fetch several tickers concurrently through the shared fetch service
+    (global concurrency limit, shared in-flight requests) and return
+    (panel, failures):
+    - panel: wide DataFrame with (field, ticker) columns, field in
+      {"price", "return"}, on the union of all dates (alignment.union_frame;
+      see alignment.py to put it on one calendar);
+    - failures: {ticker: error message} for tickers that returned nothing.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    service = get_fetch_service()
+    panel_key = ("panel", tuple(tickers), pd.Timestamp(start).date(), pd.Timestamp(end).date())
+    hit = service.cache.get(panel_key)
+    if hit is not None:
+        return hit
 
-    return df
-#
\ No newline at end of file
+    frames, failures = {}, {}
+    requests = [_request(t, start, end) for t in tickers]
+    for ticker, result in zip(tickers, service.get_many(requests)):
+        if isinstance(result, NoDataError):
+            failures[ticker] = str(result)
+        elif isinstance(result, Exception):
+            failures[ticker] = f"{type(result).__name__}: {result}"
+        else:
+            frames[ticker] = result
+
+    if not frames:
+        return pd.DataFrame(), failures
+
+    panel = pd.concat(
+        {
+            field: union_frame({t: df[field] for t, df in frames.items()})
+            for field in ("price", "return")
+        },
+        axis=1,
+    )
+    attach_fingerprint(panel)
+    # Partial panels are not kept: the failed tickers are retried on the next call
+    if not failures:
+        service.cache.put(panel_key, (panel, failures), requests[0][3])
+    return panel, failures
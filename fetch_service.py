@@ -0,0 +1,141 @@
+"""
+Shared fetch service for the data loaders: single-flight requests, a global
+concurrency limit and a pluggable result cache (size-bounded LRU by default).
+
+Every Streamlit session runs in its own thread of one server process, so
+analysts opening the dashboard together used to load the same (ticker,
+range) several times once the cache expired. The service runs an asyncio
+event loop in a background thread and all callers go through it:
+- single flight: concurrent requests for the same key share one in-flight
+  fetch, and every waiter gets its result (or its exception);
+- concurrency limit: at most `max_concurrency` fetches run at once across
+  all sessions (a semaphore in front of a thread pool of the same size);
+- cache: results go to a pluggable backend (cache.py), by default an LRU
+  kept under `max_bytes` (least recently used entries go first). Only
+  entries given a ttl expire, e.g. ranges that reach today and can still
+  receive new bars.
+
+Failures are not cached. The upstream is any blocking callable, so a local
+stub is enough to test the service (see benchmarks/synthetic.py).
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import make_cache_backend
+
+FETCH_CONCURRENCY = int(os.environ.get("FETCH_CONCURRENCY", "8"))
+FETCH_CACHE_MB = float(os.environ.get("FETCH_CACHE_MB", "512"))
+
+_MISSING = object()
+
+
+class FetchService:
+    """
+    Deduplicated, rate-limited and cached calls of blocking fetch functions,
+    usable from any thread (get / get_many) or from coroutines (fetch).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = FETCH_CONCURRENCY,
+        max_bytes: float = FETCH_CACHE_MB * 1e6,
+        cache=None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        # Any cache.py backend; the one configured by CACHE_BACKEND by default
+        self.cache = cache if cache is not None else make_cache_backend(max_bytes=max_bytes)
+        self.counts = {"hits": 0, "fetches": 0, "coalesced": 0, "errors": 0}
+        self._inflight = {}  # key -> asyncio.Task, touched by the loop thread only
+        self._loop = None
+        self._start_lock = threading.Lock()
+
+    # ----------------- Event loop -----------------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="fetch"
+                )
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                threading.Thread(target=loop.run_forever, name="fetch-loop", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def close(self):
+        """Stop the event loop and the worker threads (the cache is kept)."""
+        with self._start_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._executor.shutdown(wait=False)
+                self._loop = None
+
+    # ----------------- Async API -----------------
+    async def fetch(self, key, fn, *args, ttl: float | None = None):
+        """Cached result of fn(*args) under `key`, sharing any in-flight call."""
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self.counts["hits"] += 1
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._run(key, fn, args, ttl))
+        else:
+            self.counts["coalesced"] += 1
+        # A cancelled waiter must not cancel the fetch shared with the others
+        return await asyncio.shield(task)
+
+    async def _run(self, key, fn, args, ttl):
+        try:
+            async with self._semaphore:
+                self.counts["fetches"] += 1
+                value = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, fn, *args
+                )
+        except Exception:
+            self.counts["errors"] += 1
+            raise
+        else:
+            self.cache.put(key, value, ttl)
+            return value
+        finally:
+            del self._inflight[key]
+
+    # ----------------- Blocking API -----------------
+    def get(self, key, fn, *args, ttl: float | None = None):
+        """Blocking fetch(): cache hits are answered without leaving the calling thread."""
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self.counts["hits"] += 1
+            return value
+        future = asyncio.run_coroutine_threadsafe(
+            self.fetch(key, fn, *args, ttl=ttl), self._ensure_loop()
+        )
+        return future.result()
+
+    def get_many(self, requests) -> list:
+        """
+        Run (key, fn, args, ttl) requests concurrently; returns their results
+        in order, with the exception instead of the value for failed ones.
+        """
+
+        async def gather():
+            return await asyncio.gather(
+                *(self.fetch(key, fn, *args, ttl=ttl) for key, fn, args, ttl in requests),
+                return_exceptions=True,
+            )
+
+        return asyncio.run_coroutine_threadsafe(gather(), self._ensure_loop()).result()
+
+    def stats(self) -> dict:
+        """Request counters plus the cache occupancy."""
+        return {
+            **self.counts,
+            "entries": len(self.cache),
+            "cache_mb": self.cache.bytes / 1e6,
+            "evictions": self.cache.evictions,
+        }
@@ -0,0 +1,215 @@
+"""
+Intraday bars: interval definitions, annualization, resampling and
+fixed-capacity ring buffers for live series.
+"""
+import numpy as np
+import pandas as pd
+
+# Yahoo Finance interval -> (pandas offset, max history in days available upstream)
+INTERVALS = {
+    "1m": ("1min", 7),
+    "5m": ("5min", 60),
+    "15m": ("15min", 60),
+    "30m": ("30min", 60),
+    "1h": ("1h", 730),
+    "1d": ("1D", None),
+}
+
+TRADING_DAYS = 252
+
+
+def is_intraday(interval: str) -> bool:
+    return interval != "1d"
+
+
+def max_history_days(interval: str) -> int | None:
+    """How far back Yahoo serves bars of this interval (None: unlimited)."""
+    return INTERVALS[interval][1]
+
+
+def max_bars(interval: str) -> int:
+    """
+    Upper bound on the bars Yahoo serves for an intraday interval: its whole
+    history (plus the current day) traded around the clock.
+    """
+    bars_per_day = pd.Timedelta("1D") / pd.Timedelta(INTERVALS[interval][0])
+    return int((max_history_days(interval) + 1) * bars_per_day)
+
+
+def infer_bars_per_year(index: pd.DatetimeIndex, default: float = TRADING_DAYS) -> float:
+    """
+    Annualization factor derived from the bars themselves: median bars per
+    active day x active days per year (365 when the asset trades on
+    Saturdays, e.g. crypto, TRADING_DAYS otherwise). Gives 252 / 365 for
+    equity / crypto dailies, ~23 x 252 for hourly futures or FX, 24 x 365
+    for hourly crypto, and does not drift as live bars are appended.
+    Falls back to `default` for an empty index.
+    """
+    if len(index) == 0:
+        return float(default)
+    _, bars_per_day = np.unique(index.normalize().asi8, return_counts=True)
+    days = 365.0 if (index.dayofweek == 5).any() else float(TRADING_DAYS)
+    return float(np.median(bars_per_day)) * days
+
+
+def coarser_intervals(interval: str) -> list:
+    """Intervals of INTERVALS that `interval` bars can be resampled to."""
+    step = pd.Timedelta(INTERVALS[interval][0])
+    return [i for i, (rule, _) in INTERVALS.items() if pd.Timedelta(rule) > step]
+
+
+def resample_prices(prices: pd.Series, rule: str) -> pd.Series:
+    """
+    Last price per `rule` bucket (e.g. "1h", "1D"), empty buckets dropped.
+    Buckets are labelled by their left edge and include it: [t, t + rule).
+    """
+    return prices.resample(rule, label="left", closed="left").last().dropna()
+
+
+def resample_frame(data: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Resample a price/return frame, recomputing returns at the new frequency."""
+    df = resample_prices(data["price"], rule).rename("price").to_frame()
+    df["return"] = df["price"].pct_change()
+    return df.dropna()
+
+
+class RingBuffer:
+    """
+    Fixed-capacity buffer of (timestamp, value) pairs backed by NumPy arrays.
+
+    Every value is written twice, at i and i + capacity, so the last `size`
+    values are always one contiguous slice: appends never reallocate and
+    reads never copy. Memory stays at 2 x capacity no matter how many bars
+    have been appended.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._times = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros(2 * capacity, dtype=np.float64)
+        self._next = 0  # write position in [0, capacity)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, timestamp, value: float):
+        ts = pd.Timestamp(timestamp).as_unit("ns").value
+        i = self._next
+        self._times[i] = self._times[i + self.capacity] = ts
+        self._values[i] = self._values[i + self.capacity] = value
+        self._next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, timestamps, values):
+        """Append many bars (only the last `capacity` ones are kept)."""
+        times = pd.DatetimeIndex(timestamps).as_unit("ns").asi8
+        values = np.asarray(values, dtype=np.float64)
+        if len(times) > self.capacity:
+            times, values = times[-self.capacity :], values[-self.capacity :]
+        n = len(times)
+        if n == 0:
+            return
+        pos = (self._next + np.arange(n)) % self.capacity
+        self._times[pos] = self._times[pos + self.capacity] = times
+        self._values[pos] = self._values[pos + self.capacity] = values
+        self._next = int((self._next + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
+
+    def replace_last(self, value: float):
+        """Overwrite the most recent value (e.g. a bar still being formed)."""
+        if self.size == 0:
+            raise IndexError("empty buffer")
+        i = (self._next - 1) % self.capacity
+        self._values[i] = self._values[i + self.capacity] = value
+
+    def _window(self) -> slice:
+        # The last `size` values always end at _next in the upper copy
+        end = self._next + self.capacity
+        return slice(end - self.size, end)
+
+    @property
+    def times(self) -> np.ndarray:
+        """Timestamps (int64 ns) oldest first, as a read-only view."""
+        view = self._times[self._window()]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def values(self) -> np.ndarray:
+        """Values oldest first, as a read-only view."""
+        view = self._values[self._window()]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def first_time(self) -> pd.Timestamp | None:
+        if self.size == 0:
+            return None
+        return pd.Timestamp(int(self.times[0]))
+
+    @property
+    def last_time(self) -> pd.Timestamp | None:
+        if self.size == 0:
+            return None
+        return pd.Timestamp(int(self._times[(self._next - 1) % self.capacity]))
+
+    def to_series(self, name: str = "price") -> pd.Series:
+        index = pd.DatetimeIndex(self.times.view("datetime64[ns]"))
+        return pd.Series(self.values.copy(), index=index, name=name)
+
+
+class LiveSeries:
+    """
+    Bounded live price series for the dashboard: feed it the latest download
+    and only bars newer than the last one seen are appended (the last bar is
+    overwritten if it was revised). If the range start moves forward the
+    buffer is trimmed; if it moves back, or the end moves back, the buffer is
+    rebuilt from the download.
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        self.buffer = RingBuffer(capacity)
+        self.dropped = 0  # oldest bars overwritten once the buffer is full
+
+    @classmethod
+    def for_interval(cls, interval: str):
+        """Buffer large enough for the whole history Yahoo serves at `interval`."""
+        return cls(max_bars(interval))
+
+    def update(self, prices: pd.Series) -> int:
+        """Absorb new bars from `prices`; returns the number appended."""
+        prices = prices.dropna()
+        if prices.empty:
+            return 0
+        first, last = self.buffer.first_time, self.buffer.last_time
+        if first is not None:
+            if prices.index[-1] < last or (prices.index[0] < first and not self.dropped):
+                # Range end or start moved back (an overflowed buffer starts later anyway)
+                self._reset()
+            elif prices.index[0] > first:
+                # Range start moved forward: keep the buffered bars still in range
+                kept = self.buffer.to_series()
+                kept = kept[kept.index >= prices.index[0]]
+                self._reset()
+                self.buffer.extend(kept.index, kept.to_numpy())
+        last = self.buffer.last_time
+        if last is not None:
+            if last in prices.index:
+                self.buffer.replace_last(float(prices.loc[last]))
+            prices = prices[prices.index > last]
+        self.dropped += max(0, len(self.buffer) + len(prices) - self.buffer.capacity)
+        self.buffer.extend(prices.index, prices.to_numpy(dtype=float))
+        return len(prices)
+
+    def _reset(self):
+        self.buffer = RingBuffer(self.buffer.capacity)
+        self.dropped = 0
+
+    def frame(self) -> pd.DataFrame:
+        """price/return frame of the buffered window."""
+        df = self.buffer.to_series().to_frame()
+        df["return"] = df["price"].pct_change()
+        return df.dropna()
@@ -1,21 +1,31 @@
+import heapq
+import warnings
+
 import numpy as np
 import pandas as pd
 
+from profiling import timed
+
 
-def compute_performance_metrics(returns: pd.Series, rf: float = 0.0) -> dict:
-    """Métriques standard : rendement cumulé, vol, Sharpe, max drawdown, VaR 95%."""
+def compute_performance_metrics(
+    returns: pd.Series, rf: float = 0.0, periods_per_year: float = 252
+) -> dict:
+    """
+    Métriques standard : rendement cumulé, vol, Sharpe, max drawdown, VaR 95%.
+    periods_per_year annualise vol et Sharpe (252 en daily, voir intraday.py).
+    """
     returns = returns.dropna()
 
     # Rendement cumulé
     cum_return = (1 + returns).prod() - 1
 
     # Volatilité annualisée
-    ann_vol = returns.std() * np.sqrt(252)
+    ann_vol = returns.std() * np.sqrt(periods_per_year)
 
     # Sharpe annualisé
     if ann_vol > 0:
-        excess_ret = returns.mean() - rf / 252
-        sharpe = (excess_ret / returns.std()) * np.sqrt(252)
+        excess_ret = returns.mean() - rf / periods_per_year
+        sharpe = (excess_ret / returns.std()) * np.sqrt(periods_per_year)
     else:
         sharpe = np.nan
 
@@ -35,3 +45,222 @@ def compute_performance_metrics(returns: pd.Series, rf: float = 0.0) -> dict:
         "max_dd": max_dd,
         "var_95": var_95,
     }
+
+
+@timed()
+def compute_metrics_matrix(
+    returns, rf: float = 0.0, periods_per_year: float = 252
+) -> pd.DataFrame:
+    """
+    compute_performance_metrics for every column of a 2-D returns array or
+    wide DataFrame in one vectorized pass along axis 0.
+    Missing values are skipped per column, as the Series version does with
+    dropna(). periods_per_year is a scalar or one value per column (a Series
+    is matched on the column names). Returns one row per column and one
+    column per metric.
+    """
+    if isinstance(returns, pd.DataFrame):
+        names = returns.columns
+        r = returns.to_numpy(dtype=float)
+    else:
+        r = np.asarray(returns, dtype=float)
+        if r.ndim == 1:
+            r = r[:, None]
+        names = pd.RangeIndex(r.shape[1])
+    if isinstance(periods_per_year, pd.Series):
+        periods_per_year = periods_per_year.reindex(names).to_numpy(dtype=float)
+    periods_per_year = np.asarray(periods_per_year, dtype=float)
+
+    missing = np.isnan(r)
+    has_missing = missing.any()
+    filled = np.where(missing, 0.0, r) if has_missing else r
+    count = (~missing).sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Rendement cumulé et drawdown : un rendement manquant = equity plate
+        equity = np.cumprod(1.0 + filled, axis=0)
+        cum_return = equity[-1] - 1.0 if len(r) else np.full(r.shape[1], np.nan)
+        if has_missing:
+            # The running peak starts at each column's first valid point
+            leading = np.cumsum(~missing, axis=0) == 0
+            peak = np.maximum.accumulate(np.where(leading, 0.0, equity), axis=0)
+            drawdown = np.where(leading, 0.0, equity / peak - 1.0)
+        else:
+            drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1.0
+        max_dd = np.where(count > 0, drawdown.min(axis=0, initial=0.0), np.nan)
+
+        mean = filled.sum(axis=0) / count
+        dev = np.where(missing, 0.0, r - mean)
+        std = np.sqrt((dev**2).sum(axis=0) / (count - 1))
+        std = np.where(count > 1, std, np.nan)
+        ann_vol = std * np.sqrt(periods_per_year)
+        sharpe = np.where(
+            ann_vol > 0, (mean - rf / periods_per_year) / std * np.sqrt(periods_per_year), np.nan
+        )
+
+    if has_missing:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+            var_95 = np.nanpercentile(r, 5, axis=0)
+    elif len(r):
+        var_95 = np.percentile(r, 5, axis=0)
+    else:
+        var_95 = np.full(r.shape[1], np.nan)
+
+    return pd.DataFrame(
+        {
+            "cum_return": cum_return,
+            "ann_vol": ann_vol,
+            "sharpe": sharpe,
+            "max_dd": max_dd,
+            "var_95": var_95,
+        },
+        index=names,
+    )
+
+
+class StreamingMetrics:
+    """
+    Incremental version of compute_performance_metrics.
+
+    Each new return is absorbed in O(log n): Welford mean/variance, running
+    equity peak and drawdown, and two heaps split around the VaR quantile
+    (same linear interpolation as np.percentile). results() matches the batch
+    function up to floating-point error.
+    """
+
+    def __init__(self, rf: float = 0.0, var_level: float = 0.05, periods_per_year: float = 252):
+        self.rf = rf
+        self.var_level = var_level
+        self.periods_per_year = periods_per_year
+        self.n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._growth = 1.0
+        self._peak = None
+        self._max_dd = 0.0
+        self._lower = []  # max-heap (negated) of the smallest returns
+        self._upper = []  # min-heap of the others
+        self.last_index = None
+        self.first_index = None
+        self._last_value = None
+
+    @classmethod
+    def from_returns(
+        cls,
+        returns: pd.Series,
+        rf: float = 0.0,
+        var_level: float = 0.05,
+        periods_per_year: float = 252,
+    ):
+        acc = cls(rf=rf, var_level=var_level, periods_per_year=periods_per_year)
+        acc.sync(returns)
+        return acc
+
+    def update(self, r: float):
+        """Absorb one return (NaN values are ignored, as in the batch version)."""
+        r = float(r)
+        if np.isnan(r):
+            return
+
+        self.n += 1
+        delta = r - self._mean
+        self._mean += delta / self.n
+        self._m2 += delta * (r - self._mean)
+
+        self._growth *= 1.0 + r
+        if self._peak is None or self._growth > self._peak:
+            self._peak = self._growth
+        self._max_dd = min(self._max_dd, self._growth / self._peak - 1.0)
+
+        if self._lower and r <= -self._lower[0]:
+            heapq.heappush(self._lower, -r)
+        else:
+            heapq.heappush(self._upper, r)
+        # The lower heap holds the order statistics up to floor(q * (n - 1))
+        target = int(np.floor(self.var_level * (self.n - 1))) + 1
+        while len(self._lower) > target:
+            heapq.heappush(self._upper, -heapq.heappop(self._lower))
+        while len(self._lower) < target:
+            heapq.heappush(self._lower, -heapq.heappop(self._upper))
+
+    def sync(self, returns: pd.Series):
+        """
+        Absorb the bars of `returns` that are newer than the last one seen.
+        If the series no longer extends the accumulated history (different
+        first date, or a revised last bar), the state is rebuilt from scratch.
+        """
+        returns = returns.dropna()
+        if returns.empty:
+            return self
+
+        if self.last_index is not None:
+            stale = returns.index[0] != self.first_index
+            if not stale and self.last_index in returns.index:
+                stale = returns.loc[self.last_index] != self._last_value
+            elif not stale:
+                stale = True
+            if stale:
+                self.__init__(self.rf, self.var_level, self.periods_per_year)
+            else:
+                returns = returns[returns.index > self.last_index]
+
+        for r in returns.to_numpy(dtype=float):
+            self.update(r)
+        if self.n and not returns.empty:
+            if self.first_index is None:
+                self.first_index = returns.index[0]
+            self.last_index = returns.index[-1]
+            self._last_value = returns.iloc[-1]
+        return self
+
+    def _var(self) -> float:
+        if self.n == 0:
+            return np.nan
+        h = self.var_level * (self.n - 1)
+        lo_value = -self._lower[0]
+        frac = h - np.floor(h)
+        if frac == 0 or not self._upper:
+            return lo_value
+        return lo_value + frac * (self._upper[0] - lo_value)
+
+    def results(self) -> dict:
+        """Same keys and definitions as compute_performance_metrics."""
+        std = np.sqrt(self._m2 / (self.n - 1)) if self.n > 1 else np.nan
+        ann_vol = std * np.sqrt(self.periods_per_year)
+        if ann_vol > 0:
+            excess_ret = self._mean - self.rf / self.periods_per_year
+            sharpe = (excess_ret / std) * np.sqrt(self.periods_per_year)
+        else:
+            sharpe = np.nan
+
+        return {
+            "cum_return": self._growth - 1.0,
+            "ann_vol": ann_vol,
+            "sharpe": sharpe,
+            "max_dd": self._max_dd if self.n else np.nan,
+            "var_95": self._var(),
+        }
+
+
+def cached_streaming_metrics(
+    cache: dict,
+    key,
+    returns: pd.Series,
+    rf: float = 0.0,
+    max_entries: int = 32,
+    periods_per_year: float = 252,
+) -> dict:
+    """
+    Metrics of `returns` from an accumulator kept in `cache` (e.g. a dict in
+    st.session_state) under `key`: only the new bars are absorbed on each call.
+    The oldest accumulators are dropped beyond `max_entries`.
+    """
+    acc = cache.pop(key, None)
+    if acc is None or acc.periods_per_year != periods_per_year:
+        acc = StreamingMetrics(rf=rf, periods_per_year=periods_per_year)
+    # Re-insert so the dict order tracks recent use
+    cache[key] = acc
+    while len(cache) > max_entries:
+        cache.pop(next(iter(cache)))
+    return acc.sync(returns).results()
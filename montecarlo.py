@@ -0,0 +1,167 @@
+"""
+Parametric and Monte Carlo VaR / CVaR for a portfolio of assets.
+
+Asset returns over the horizon are drawn either from a multivariate normal
+on log returns (the estimated daily mean and Ledoit-Wolf covariance scaled
+by `horizon`, correlated through the Cholesky factor: one draw per path), or
+by bootstrapping `horizon` historical days (whole cross-sections, so
+correlations are kept) and compounding them. Weights are fixed at the start
+of the horizon (no rebalancing within it).
+
+Paths are simulated in float32 chunks and only the final portfolio return of
+each path is kept, so a million paths over a multi-day horizon need a few
+MB. Chunk k always uses the k-th child of the seed, so results are
+reproducible for a given seed whatever the number of workers.
+
+Sign convention as metrics.var_95: VaR is the `level` quantile of the
+portfolio return (a negative number for a loss), CVaR the mean return at or
+below it.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from optimizer import ledoit_wolf_cov
+
+MC_METHODS = ["Gaussian", "Bootstrap"]
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def _portfolio_inputs(returns: pd.DataFrame, weights) -> tuple[np.ndarray, np.ndarray]:
+    returns = returns.dropna()
+    if isinstance(weights, pd.Series):
+        w = weights.reindex(returns.columns).to_numpy(dtype=float)
+    else:
+        w = np.asarray(weights, dtype=float)
+    if w.shape != (returns.shape[1],) or np.isnan(w).any():
+        raise ValueError("weights must have one value per returns column")
+    return returns.to_numpy(dtype=float), w
+
+
+def parametric_var(returns: pd.DataFrame, weights, horizon: int = 1, level: float = 0.05) -> dict:
+    """Gaussian (variance-covariance) VaR and CVaR of the portfolio over `horizon` days."""
+    values, w = _portfolio_inputs(returns, weights)
+    cov, _ = ledoit_wolf_cov(values, periods_per_year=1)
+    mean = horizon * float(values.mean(axis=0) @ w)
+    std = np.sqrt(horizon * float(w @ cov @ w))
+
+    z = NormalDist().inv_cdf(level)
+    return {
+        "var": float(mean + z * std),
+        "cvar": float(mean - std * NormalDist().pdf(z) / level),
+    }
+
+
+def _simulate_chunk(
+    seed: np.random.SeedSequence,
+    n_paths: int,
+    horizon: int,
+    weights: np.ndarray,
+    mean: np.ndarray,
+    chol: np.ndarray | None,
+    history: np.ndarray | None,
+) -> np.ndarray:
+    """Final portfolio returns of n_paths paths (float32)."""
+    rng = np.random.default_rng(seed)
+    if history is None:
+        # Log returns over the horizon are normal: sum of `horizon` i.i.d. days
+        z = rng.standard_normal((n_paths, weights.size), dtype=np.float32)
+        log_growth = z @ (np.float32(np.sqrt(horizon)) * chol.T)
+        log_growth += np.float32(horizon) * mean
+        growth = np.exp(log_growth, out=log_growth)
+    else:
+        growth = np.ones((n_paths, weights.size), dtype=np.float32)
+        for _ in range(horizon):
+            day = history[rng.integers(0, history.shape[0], size=n_paths)]
+            day += 1.0
+            growth *= day
+    return growth @ weights - np.float32(1.0)
+
+
+def simulate_portfolio_returns(
+    returns: pd.DataFrame,
+    weights,
+    horizon: int = 1,
+    n_paths: int = 100_000,
+    method: str = "Gaussian",
+    seed: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+) -> np.ndarray:
+    """
+    Simulated `horizon`-day portfolio returns, one per path (float32 array).
+    method: "Gaussian" (Cholesky of the Ledoit-Wolf covariance of daily log
+    returns) or "Bootstrap" (historical days drawn with replacement).
+    workers > 1 runs chunks on a thread pool (NumPy releases the GIL in the
+    RNG and matmul).
+    """
+    values, w = _portfolio_inputs(returns, weights)
+    if horizon < 1 or n_paths < 1:
+        raise ValueError("horizon and n_paths must be positive")
+
+    chol = mean = history = None
+    if method == "Gaussian":
+        log_returns = np.log1p(values)
+        cov, _ = ledoit_wolf_cov(log_returns, periods_per_year=1)
+        chol = np.linalg.cholesky(cov).astype(np.float32)
+        mean = log_returns.mean(axis=0).astype(np.float32)
+    elif method == "Bootstrap":
+        history = values.astype(np.float32)
+    else:
+        raise ValueError(f"Unknown Monte Carlo method: {method!r}")
+
+    sizes = [min(chunk_size, n_paths - lo) for lo in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    w32 = w.astype(np.float32)
+
+    def run(k):
+        return _simulate_chunk(seeds[k], sizes[k], horizon, w32, mean, chol, history)
+
+    if workers > 1 and len(sizes) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(run, range(len(sizes))))
+    else:
+        chunks = [run(k) for k in range(len(sizes))]
+    return np.concatenate(chunks)
+
+
+def var_cvar(simulated: np.ndarray, level: float = 0.05) -> tuple[float, float]:
+    """(VaR, CVaR) of simulated returns: `level` quantile and mean below it."""
+    var = float(np.quantile(simulated, level))
+    tail = simulated[simulated <= var]
+    return var, float(tail.mean(dtype=np.float64)) if tail.size else var
+
+
+def monte_carlo_var(
+    returns: pd.DataFrame,
+    weights,
+    horizon: int = 1,
+    n_paths: int = 100_000,
+    level: float = 0.05,
+    method: str = "Gaussian",
+    seed: int | None = None,
+    workers: int = 1,
+) -> dict:
+    """Monte Carlo VaR and CVaR of the portfolio over `horizon` days."""
+    simulated = simulate_portfolio_returns(
+        returns, weights, horizon, n_paths, method=method, seed=seed, workers=workers
+    )
+    var, cvar = var_cvar(simulated, level)
+    return {"var": var, "cvar": cvar, "simulated": simulated}
+
+
+def historical_var(returns: pd.DataFrame, weights, horizon: int = 1, level: float = 0.05) -> dict:
+    """
+    Historical VaR / CVaR of the portfolio on overlapping `horizon`-day
+    windows of realized returns (fixed weights within each window).
+    """
+    values, w = _portfolio_inputs(returns, weights)
+    log_growth = np.vstack([np.zeros(values.shape[1]), np.cumsum(np.log1p(values), axis=0)])
+    asset_h = np.exp(log_growth[horizon:] - log_growth[:-horizon])
+    simulated = asset_h @ w - 1.0
+    if simulated.size == 0:
+        return {"var": np.nan, "cvar": np.nan}
+    var, cvar = var_cvar(simulated, level)
+    return {"var": var, "cvar": cvar}
@@ -0,0 +1,320 @@
+"""
+Portfolio weight optimizers on a wide returns panel: minimum variance,
+maximum Sharpe and equal risk contribution (risk parity).
+
+The covariance is the Ledoit-Wolf shrinkage estimator (towards a scaled
+identity), which stays well conditioned when the number of assets is close
+to or above the number of observations. Every solver is plain NumPy:
+weights always sum to 1 (budget), are >= 0 when long_only, and are capped at
+max_weight in absolute value when given. A few hundred assets solve well
+under a second, so the optimization can rerun on every refresh.
+"""
+import numpy as np
+import pandas as pd
+
+
+def ledoit_wolf_cov(returns, periods_per_year: float = 252) -> tuple[np.ndarray, float]:
+    """
+    Annualized Ledoit-Wolf covariance of a (T, N) returns array/DataFrame
+    (rows with NaNs are dropped). Returns (covariance, shrinkage intensity).
+    """
+    x = np.asarray(returns, dtype=float)
+    x = x[~np.isnan(x).any(axis=1)]
+    t, n = x.shape
+    if t < 2:
+        raise ValueError("At least two complete observations are required")
+
+    x = x - x.mean(axis=0)
+    sample = x.T @ x / t
+    mu = np.trace(sample) / n
+    target = mu * np.eye(n)
+
+    # d2: distance sample -> target, b2: estimation error of the sample covariance
+    d2 = ((sample - target) ** 2).sum()
+    row_norms = (x**2).sum(axis=1)
+    b2_bar = ((row_norms**2).sum() / t - (sample**2).sum()) / t
+    b2 = min(b2_bar, d2)
+    shrinkage = b2 / d2 if d2 > 0 else 1.0
+
+    cov = shrinkage * target + (1 - shrinkage) * sample
+    return cov * periods_per_year, float(shrinkage)
+
+
+def _weight_bounds(n: int, long_only: bool, max_weight: float | None) -> tuple[float, float]:
+    if max_weight is not None and max_weight * n < 1 - 1e-12:
+        raise ValueError(f"max_weight={max_weight:.2%} is infeasible for {n} assets")
+    upper = max_weight if max_weight is not None else (1.0 if long_only else np.inf)
+    lower = 0.0 if long_only else -upper
+    return lower, upper
+
+
+def project_budget_box(v: np.ndarray, lower: float, upper: float) -> np.ndarray:
+    """
+    Euclidean projection of v onto {w : sum(w) = 1, lower <= w <= upper}
+    (finite bounds), i.e. clip(v - tau, lower, upper) for the tau that meets
+    the budget. sum(clip(v - tau)) is piecewise linear in tau: it is evaluated
+    at every breakpoint with sorted prefix sums, in O(n log n).
+    """
+    n = v.size
+    vs = np.sort(v)
+    prefix = np.concatenate([[0.0], np.cumsum(vs)])
+
+    def budget(tau):
+        n_hi = n - np.searchsorted(vs, tau + upper, side="left")
+        n_lo = np.searchsorted(vs, tau + lower, side="right")
+        n_mid = n - n_hi - n_lo
+        mid_sum = prefix[n - n_hi] - prefix[n_lo]
+        return upper * n_hi + lower * n_lo + mid_sum - tau * n_mid
+
+    taus = np.unique(np.concatenate([vs - upper, vs - lower]))
+    values = budget(taus)  # non-increasing in tau
+    k = np.searchsorted(-values, -1.0, side="left")
+    if k == 0:
+        tau = taus[0]
+    elif k == taus.size:
+        tau = taus[-1]
+    else:
+        t0, t1, f0, f1 = taus[k - 1], taus[k], values[k - 1], values[k]
+        tau = t0 + (f0 - 1.0) * (t1 - t0) / (f0 - f1) if f0 != f1 else t0
+    return np.clip(v - tau, lower, upper)
+
+
+def _projected_gradient(cov, q, lower, upper, n_iter: int = 500) -> np.ndarray:
+    """
+    A few hundred accelerated projected-gradient steps (with adaptive
+    restart) on 0.5 w'Cw - q'w: cheap, and enough to find the active bounds.
+    """
+    n = cov.shape[0]
+    step = 1.0 / np.linalg.eigvalsh(cov)[-1]
+    w = project_budget_box(np.full(n, 1.0 / n), lower, upper)
+    y, t = w.copy(), 1.0
+    for _ in range(n_iter):
+        w_next = project_budget_box(y - step * (cov @ y - q), lower, upper)
+        if np.abs(w_next - w).max() < 1e-12:
+            return w_next
+        t_next = 0.5 * (1 + np.sqrt(1 + 4 * t * t))
+        if (cov @ y - q) @ (w_next - w) > 0:
+            # Momentum is going uphill: restart
+            y, t = w_next, 1.0
+        else:
+            y, t = w_next + ((t - 1) / t_next) * (w_next - w), t_next
+        w = w_next
+    return w
+
+
+def solve_box_qp(
+    cov: np.ndarray, q: np.ndarray, lower: float, upper: float, w0=None, tol: float = 1e-12
+) -> np.ndarray:
+    """
+    min 0.5 w'Cw - q'w  s.t.  sum(w) = 1, lower <= w <= upper (finite bounds).
+
+    Primal active-set method: the free weights solve the equality-constrained
+    system, bounds are added when a step hits them and released when their
+    multiplier has the wrong sign. Warm-started from `w0` (a feasible point)
+    or from a few projected-gradient steps, it typically needs only a handful
+    of linear solves.
+    """
+    n = cov.shape[0]
+    w = _projected_gradient(cov, q, lower, upper) if w0 is None else np.asarray(w0, float).copy()
+    at_lo = w <= lower + 1e-10
+    at_hi = (w >= upper - 1e-10) & ~at_lo
+    w[at_lo], w[at_hi] = lower, upper
+
+    for _ in range(10 * n + 10):
+        free = ~(at_lo | at_hi)
+        fixed = np.where(at_hi, upper, lower)
+        if free.any():
+            bound = ~free
+            budget = 1.0 - fixed[bound].sum()
+            rhs = q[free] - cov[np.ix_(free, bound)] @ fixed[bound]
+            a = np.linalg.solve(cov[np.ix_(free, free)], np.column_stack([rhs, np.ones(free.sum())]))
+            lam = (budget - a[:, 0].sum()) / a[:, 1].sum()
+            target = fixed.copy()
+            target[free] = a[:, 0] + lam * a[:, 1]
+        else:
+            target = fixed
+            g = cov @ fixed - q
+            lo_side = g[at_lo].min() if at_lo.any() else g[at_hi].max()
+            hi_side = g[at_hi].max() if at_hi.any() else g[at_lo].min()
+            lam = 0.5 * (lo_side + hi_side)
+
+        p = target - w
+        if np.abs(p).max() <= tol:
+            # Optimal unless a bound multiplier has the wrong sign
+            g = cov @ target - q - lam
+            violation = np.where(at_lo, -g, 0.0) + np.where(at_hi, g, 0.0)
+            i = int(np.argmax(violation))
+            w = target
+            if violation[i] <= tol:
+                return w
+            at_lo[i] = at_hi[i] = False
+            continue
+
+        # Longest feasible step towards target; the blocking weight joins the bounds
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(
+                free & (p < 0), (lower - w) / p, np.where(free & (p > 0), (upper - w) / p, np.inf)
+            )
+        i = int(np.argmin(ratio))
+        alpha = min(1.0, ratio[i])
+        w = w + alpha * p
+        if alpha < 1.0:
+            if p[i] < 0:
+                at_lo[i], w[i] = True, lower
+            else:
+                at_hi[i], w[i] = True, upper
+    return w
+
+
+def max_return_weights(mu: np.ndarray, lower: float, upper: float) -> np.ndarray:
+    """
+    Highest-return weights under the budget and finite bounds: every asset
+    at `lower`, then the remaining budget to the best assets up to `upper`.
+    """
+    mu = np.asarray(mu, dtype=float)
+    w = np.full(mu.size, lower)
+    remaining = 1.0 - w.sum()
+    for i in np.argsort(-mu, kind="stable"):
+        if remaining <= 0:
+            break
+        add = min(upper - lower, remaining)
+        w[i] += add
+        remaining -= add
+    return w
+
+
+def min_variance_weights(
+    cov: np.ndarray, long_only: bool = True, max_weight: float | None = None
+) -> np.ndarray:
+    """Minimum-variance weights under the budget and bound constraints."""
+    n = cov.shape[0]
+    lower, upper = _weight_bounds(n, long_only, max_weight)
+    if np.isinf(upper):
+        x = np.linalg.solve(cov, np.ones(n))
+        return x / x.sum()
+    return solve_box_qp(cov, np.zeros(n), lower, upper)
+
+
+def max_sharpe_weights(
+    cov: np.ndarray,
+    mu: np.ndarray,
+    rf: float = 0.0,
+    long_only: bool = True,
+    max_weight: float | None = None,
+    tol: float = 1e-12,
+) -> np.ndarray:
+    """
+    Maximum-Sharpe (tangency) weights for annualized expected returns `mu`.
+    Unconstrained: w ~ inv(C)(mu - rf). With bounds, the tangency portfolio
+    is the mean-variance optimum for risk aversion 1/gamma with
+    gamma = w'Cw / (mu - rf)'w; that fixed point is iterated with warm-started
+    QP solves (each step can only increase the Sharpe ratio).
+    """
+    n = cov.shape[0]
+    excess = np.asarray(mu, dtype=float) - rf
+    if not (excess > 0).any():
+        raise ValueError("No asset has an expected return above the risk-free rate")
+
+    lower, upper = _weight_bounds(n, long_only, max_weight)
+    if np.isinf(upper):
+        x = np.linalg.solve(cov, excess)
+        if x.sum() <= 0:
+            raise ValueError("Tangency portfolio undefined (negative net exposure)")
+        return x / x.sum()
+
+    w = solve_box_qp(cov, np.zeros(n), lower, upper)
+    if w @ excess <= 0:
+        # Minimum variance loses money: start from the best-returning portfolio
+        w = max_return_weights(excess, lower, upper)
+        if w @ excess <= 0:
+            # gamma would be negative and the iteration would minimize the Sharpe ratio
+            raise ValueError(
+                "No portfolio within the weight bounds has an expected return "
+                "above the risk-free rate"
+            )
+    gamma = (w @ cov @ w) / (w @ excess)
+    for _ in range(200):
+        w = solve_box_qp(cov, gamma * excess, lower, upper, w0=w)
+        gamma_next = (w @ cov @ w) / (w @ excess)
+        if abs(gamma_next - gamma) <= tol * abs(gamma):
+            break
+        gamma = gamma_next
+    return w
+
+
+def risk_parity_weights(cov: np.ndarray, budgets=None, tol: float = 1e-12) -> np.ndarray:
+    """
+    Equal-risk-contribution weights (or risk budgets b, summing to 1).
+    Newton's method on the convex problem min 0.5 y'Cy - sum(b log y), whose
+    solution normalized to sum 1 has risk contributions proportional to b.
+    Always long-only and fully invested.
+    """
+    n = cov.shape[0]
+    b = np.full(n, 1.0 / n) if budgets is None else np.asarray(budgets, dtype=float)
+    b = b / b.sum()
+
+    y = b / np.sqrt(np.diag(cov))
+    for _ in range(100):
+        grad = cov @ y - b / y
+        hess = cov + np.diag(b / y**2)
+        delta = np.linalg.solve(hess, grad)
+        # Damped step keeping y > 0
+        alpha = 1.0
+        while (y - alpha * delta <= 0).any():
+            alpha *= 0.5
+        y = y - alpha * delta
+        if np.abs(grad).max() < tol:
+            break
+    return y / y.sum()
+
+
+def risk_contributions(weights, cov: np.ndarray) -> np.ndarray:
+    """Share of portfolio variance from each asset (sums to 1)."""
+    w = np.asarray(weights, dtype=float)
+    contrib = w * (cov @ w)
+    return contrib / contrib.sum()
+
+
+OPTIMIZERS = ["Minimum variance", "Maximum Sharpe", "Risk parity"]
+
+
+def optimize_weights(
+    returns: pd.DataFrame,
+    method: str = "Minimum variance",
+    long_only: bool = True,
+    max_weight: float | None = None,
+    rf: float = 0.0,
+    periods_per_year: float = 252,
+) -> dict:
+    """
+    Optimized weights for the columns of a wide returns frame.
+    method: one of OPTIMIZERS ("Risk parity" is always long-only and ignores
+    max_weight). Returns a dict with "weights" (Series),
+    "risk_contributions" (Series), "expected_return", "volatility",
+    "sharpe" (annualized, ex-ante) and "shrinkage".
+    """
+    returns = returns.dropna()
+    cov, shrinkage = ledoit_wolf_cov(returns, periods_per_year)
+    mu = returns.mean().to_numpy() * periods_per_year
+
+    if method == "Minimum variance":
+        w = min_variance_weights(cov, long_only, max_weight)
+    elif method == "Maximum Sharpe":
+        w = max_sharpe_weights(cov, mu, rf, long_only, max_weight)
+    elif method == "Risk parity":
+        w = risk_parity_weights(cov)
+    else:
+        raise ValueError(f"Unknown optimization method: {method!r}")
+
+    vol = float(np.sqrt(w @ cov @ w))
+    exp_ret = float(w @ mu)
+    return {
+        "weights": pd.Series(w, index=returns.columns, name="Weight"),
+        "risk_contributions": pd.Series(
+            risk_contributions(w, cov), index=returns.columns, name="Risk contribution"
+        ),
+        "expected_return": exp_ret,
+        "volatility": vol,
+        "sharpe": (exp_ret - rf) / vol if vol > 0 else np.nan,
+        "shrinkage": shrinkage,
+    }
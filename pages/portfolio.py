@@ -1,10 +1,26 @@
 import datetime as dt
+import os
+
 import numpy as np
 import pandas as pd
 import streamlit as st
 
-from data import load_yahoo_data
-from metrics import compute_performance_metrics
+from alignment import ALIGNMENT_POLICIES, align_prices
+from analytics import (
+    cross_sectional_analysis,
+    optimized_allocation,
+    panel_returns,
+    portfolio_analysis,
+    portfolio_var_analysis,
+    rolling_risk_analysis,
+)
+from charts import downsample
+from costs import CostModel
+from data import load_yahoo_data, load_yahoo_panel
+from metrics import cached_streaming_metrics
+from optimizer import OPTIMIZERS
+from profiling import stage
+from snapshots import save_snapshot
 
 
 def format_timestamp_utc(ts: dt.datetime | None) -> str:
@@ -14,7 +30,7 @@ def format_timestamp_utc(ts: dt.datetime | None) -> str:
 
 
 def render_portfolio(universe_by_category: dict, auto_refresh: bool):
-    st.subheader("Portfolio – Equal-weight / Custom")
+    st.subheader("Portfolio – Equal-weight / Custom / Optimized")
 
     all_categories = list(universe_by_category.keys())
 
@@ -66,48 +82,94 @@ def render_portfolio(universe_by_category: dict, auto_refresh: bool):
         start = default_start
         end = date_range
 
+    alignment = st.selectbox(
+        "Calendar alignment",
+        ALIGNMENT_POLICIES,
+        help="Compound: trading days only; the weekend moves of 24/7 assets (crypto) are "
+        "compounded into the next session. Forward-fill: every date, closed markets keep "
+        "their last price. Intersect: only the dates where every asset trades.",
+    )
+
     do_refresh = st.button("Refresh portfolio data") or auto_refresh
 
     if not do_refresh:
         st.info("Click 'Refresh portfolio data' or enable auto-refresh to load data.")
         return
 
-    returns_dict = {}
-    prices_dict = {}
-
-    for label in selected_labels:
-        tkr = current_universe[label]
-        with st.spinner(f"Downloading {label} ({tkr})..."):
-            try:
-                df = load_yahoo_data(tkr, start, end)
-            except Exception:
-                df = None
+    tickers = tuple(current_universe[label] for label in selected_labels)
+    with st.spinner(f"Downloading {len(tickers)} assets..."):
+        try:
+            panel, failures = load_yahoo_panel(tickers, start, end)
+        except Exception as e:
+            panel, failures = pd.DataFrame(), {tkr: str(e) for tkr in tickers}
 
-        if df is None or df.empty:
-            st.warning(f"No valid data for {label}. It will be excluded from the portfolio.")
-            continue
+    labels = {label: current_universe[label] for label in selected_labels}
+    returns, missing, alignment_info = panel_returns(panel, labels, alignment)
+    for label in missing:
+        reason = failures.get(labels[label], "no data")
+        st.warning(f"No valid data for {label} ({reason}). It will be excluded from the portfolio.")
 
-        returns_dict[label] = df["return"]
-        prices_dict[label] = df["price"]
-
-    if len(returns_dict) < 2:
+    if returns.shape[1] < 2:
         st.error("Not enough valid series to build the portfolio.")
         return
+    if returns.empty:
+        st.error(f"No dates left with the {alignment} alignment: try Compound or Forward-fill.")
+        return
+
+    st.caption(
+        f"{alignment} alignment: {alignment_info['rows']:,} of {alignment_info['dates']:,} dates "
+        f"kept, {alignment_info['merged']:,} compounded into the next date, "
+        f"{alignment_info['warm_up']:,} before every asset is listed; "
+        f"{alignment_info['filled']:,} prices forward-filled."
+    )
+    periods_per_year = alignment_info["periods_per_year"]
 
-    returns = pd.concat(returns_dict, axis=1).dropna()
     asset_list = list(returns.columns)
 
     st.markdown("### Portfolio allocation")
 
     allocation_mode = st.radio(
         "Allocation mode:",
-        ["Equal-weight", "Custom weights"],
+        ["Equal-weight", "Custom weights", *OPTIMIZERS],
         horizontal=True,
     )
 
+    optimization = None
     if allocation_mode == "Equal-weight":
         n = returns.shape[1]
         weights = np.array([1.0 / n] * n)
+    elif allocation_mode in OPTIMIZERS:
+        col_lo, col_cap, col_rf = st.columns(3)
+        with col_lo:
+            long_only = st.toggle(
+                "Long-only", value=True, disabled=allocation_mode == "Risk parity"
+            )
+        with col_cap:
+            n = len(asset_list)
+            cap_pct = st.slider(
+                "Max weight per asset (%)",
+                min_value=float(np.ceil(100.0 / n)),
+                max_value=100.0,
+                value=100.0,
+                step=1.0,
+                help="Budget constraint: weights sum to 100% and stay below this cap.",
+            )
+        with col_rf:
+            rf_pct = st.number_input("Risk-free rate (%)", value=0.0, step=0.25)
+        try:
+            optimization = optimized_allocation(
+                returns,
+                allocation_mode,
+                long_only=long_only,
+                max_weight=cap_pct / 100.0 if cap_pct < 100.0 else None,
+                rf=rf_pct / 100.0,
+                periods_per_year=periods_per_year,
+            )
+        except ValueError as e:
+            st.warning(f"Optimization failed ({e}). Falling back to equal-weight allocation.")
+            weights = np.array([1.0 / n] * n)
+        else:
+            weights = optimization["weights"].to_numpy()
     else:
         st.write("Set custom weights (they must sum to 100%).")
         custom_weights = []
@@ -134,67 +196,150 @@ def render_portfolio(universe_by_category: dict, auto_refresh: bool):
 
 
     weights_series = pd.Series(weights, index=asset_list)
-    st.dataframe(weights_series.rename("Weight"))
+    if optimization is None:
+        st.dataframe(weights_series.rename("Weight"))
+    else:
+        st.dataframe(
+            pd.concat(
+                [optimization["weights"], optimization["risk_contributions"]], axis=1
+            ).style.format("{:.2%}")
+        )
+        st.caption(
+            f"Ex-ante: expected return {optimization['expected_return']:.2%}, "
+            f"volatility {optimization['volatility']:.2%}, Sharpe {optimization['sharpe']:.2f} "
+            f"(Ledoit-Wolf shrinkage {optimization['shrinkage']:.2f})."
+        )
 
     rebalance_freq = st.selectbox(
         "Rebalancing frequency",
-        options=["Daily", "Weekly", "Monthly"],
+        options=["Daily", "Weekly", "Monthly", "Quarterly", "Never"],
         index=0,
     )
 
-    weights_df = pd.DataFrame(index=returns.index, columns=asset_list, dtype=float)
-
-    if rebalance_freq == "Daily":
-        for col in asset_list:
-            weights_df[col] = weights_series[col]
-    elif rebalance_freq == "Weekly":
-        current_w = weights_series.copy()
-        for date in returns.index:
-            if date.weekday() == 0:
-                current_w = weights_series.copy()
-            weights_df.loc[date] = current_w
-    else:
-        current_month = None
-        current_w = weights_series.copy()
-        for date in returns.index:
-            month_id = (date.year, date.month)
-            if current_month != month_id:
-                current_month = month_id
-                current_w = weights_series.copy()
-            weights_df.loc[date] = current_w
-
-    portfolio_returns = (returns * weights_df).sum(axis=1)
-    portfolio_equity = (1 + portfolio_returns).cumprod()
+    drift_threshold = None
+    if st.toggle("Also rebalance on weight drift", value=False):
+        drift_pct = st.slider(
+            "Drift tolerance (% points)", min_value=1.0, max_value=25.0, value=5.0, step=0.5
+        )
+        drift_threshold = drift_pct / 100.0
+
+    with st.expander("Transaction costs", expanded=False):
+        col_fee, col_slip, col_fixed, col_cap = st.columns(4)
+        with col_fee:
+            fee_bps = st.number_input("Fees (bps)", min_value=0.0, value=0.0, step=1.0)
+        with col_slip:
+            slippage_bps = st.number_input("Slippage (bps)", min_value=0.0, value=0.0, step=1.0)
+        with col_fixed:
+            fixed_cost = st.number_input("Fixed cost per trade", min_value=0.0, value=0.0)
+        with col_cap:
+            capital = st.number_input("Capital", min_value=1.0, value=100_000.0, step=10_000.0)
+    costs = CostModel(fee_bps, fixed_cost, capital, slippage_bps)
+    costs = None if costs.is_zero else costs
+
+    analysis = portfolio_analysis(
+        returns,
+        weights_series,
+        rebalance=rebalance_freq,
+        threshold=drift_threshold,
+        costs=costs,
+        periods_per_year=periods_per_year,
+    )
+    portfolio_returns = analysis["returns"]
+    portfolio_equity = analysis["nav"]
+    current_nav = analysis["nav_value"]
+    day_pnl_value = analysis["day_pnl"]
 
     st.session_state.last_update_portfolio = dt.datetime.utcnow()
 
-    initial_nav = 100.0
-    current_nav = float(initial_nav * portfolio_equity.iloc[-1])
-
-    today_port_ret = portfolio_returns.loc[
-        portfolio_returns.index.date == portfolio_returns.index[-1].date()
-    ]
-    day_ret_pct = float(today_port_ret.sum()) if not today_port_ret.empty else 0.0
-    day_pnl_value = current_nav * day_ret_pct
-
     pk1, pk2, pk3 = st.columns(3)
     pk1.metric("Portfolio NAV", f"{current_nav:,.2f}", f"{day_pnl_value:,.2f}")
     pk2.metric("Portfolio cumulative return", f"{portfolio_equity.iloc[-1] - 1:.2%}")
     pk3.metric("Last update (UTC)", format_timestamp_utc(st.session_state.last_update_portfolio))
 
     st.subheader("Equity curves – assets vs portfolio")
-    chart_df = pd.DataFrame(index=returns.index)
-    for col in returns.columns:
-        chart_df[col] = (1 + returns[col]).cumprod()
-    chart_df["Portfolio"] = portfolio_equity
-    st.line_chart(chart_df)
+    with stage("chart: equity curves"):
+        st.line_chart(downsample(analysis["equity"]))
 
     st.subheader("Return correlation matrix")
-    corr = returns.corr()
-    st.dataframe(corr.style.background_gradient(cmap="RdBu_r", vmin=-1, vmax=1))
+    with stage("styler: correlation matrix"):
+        st.dataframe(analysis["corr"].style.background_gradient(cmap="RdBu_r", vmin=-1, vmax=1))
+
+    st.subheader("Rolling risk")
+    col_win, col_bench = st.columns(2)
+    with col_win:
+        window = st.select_slider(
+            "Rolling window (days)", options=[21, 42, 63, 126, 252], value=63
+        )
+    with col_bench:
+        benchmark_labels = ["None"] + list(universe_by_category.get("Mixed (all types)", {}))
+        benchmark_label = st.selectbox(
+            "Beta benchmark",
+            benchmark_labels,
+            index=benchmark_labels.index("CAC 40") if "CAC 40" in benchmark_labels else 0,
+        )
+
+    benchmark = None
+    if benchmark_label != "None":
+        bench_ticker = universe_by_category["Mixed (all types)"][benchmark_label]
+        try:
+            bench_data = load_yahoo_data(bench_ticker, start, end)
+        except Exception:
+            bench_data = None
+        if bench_data is None or bench_data.empty:
+            st.warning(f"No data for benchmark {benchmark_label}: beta is not shown.")
+        else:
+            # Same calendar as the panel: the benchmark's moves are compounded the same way
+            benchmark = bench_data["price"].reindex(returns.index, method="ffill").pct_change()
+
+    pair = None
+    if len(asset_list) >= 2:
+        pair_labels = [f"{a} / {b}" for i, a in enumerate(asset_list) for b in asset_list[i + 1 :]]
+        pair_label = st.selectbox("Correlation pair", pair_labels)
+        pair = tuple(pair_label.split(" / ", 1))
+
+    if len(returns) <= window:
+        st.info(f"Not enough observations for a {window}-day window.")
+    else:
+        rolling = rolling_risk_analysis(
+            returns,
+            portfolio_returns,
+            window,
+            benchmark=benchmark,
+            pairs=[pair],
+            periods_per_year=periods_per_year,
+        )
+        vol_tab, var_tab, sharpe_tab, beta_tab, corr_tab = st.tabs(
+            ["Volatility", "VaR 95%", "Sharpe", "Beta", "Correlation"]
+        )
+        with stage("charts: rolling risk"):
+            with vol_tab:
+                st.line_chart(downsample(rolling["volatility"].dropna(how="all")))
+            with var_tab:
+                st.line_chart(downsample(rolling["var_95"].dropna(how="all")))
+            with sharpe_tab:
+                st.line_chart(downsample(rolling["sharpe"].dropna(how="all")))
+            with beta_tab:
+                if rolling["beta"] is None:
+                    st.info("Select a benchmark to compute rolling betas.")
+                else:
+                    st.line_chart(downsample(rolling["beta"].dropna(how="all")))
+            with corr_tab:
+                corr_chart = pd.concat(
+                    [rolling["pair_correlation"], rolling["avg_correlation"]], axis=1
+                )
+                st.line_chart(downsample(corr_chart.dropna(how="all")))
 
     st.subheader("Performance and risk metrics – Portfolio")
-    port_metrics = compute_performance_metrics(portfolio_returns)
+    metrics_cache = st.session_state.setdefault("metrics_cache", {})
+    port_key = "|".join(
+        ["portfolio", alignment, rebalance_freq, str(drift_threshold)]
+        + [repr(costs)]
+        + [f"{a}={w:.6f}" for a, w in weights_series.items()]
+    )
+    with stage("streaming metrics"):
+        port_metrics = cached_streaming_metrics(
+            metrics_cache, port_key, portfolio_returns, periods_per_year=periods_per_year
+        )
 
     c1, c2, c3 = st.columns(3)
     with c1:
@@ -204,4 +349,158 @@ def render_portfolio(universe_by_category: dict, auto_refresh: bool):
         st.metric("Annualized volatility", f"{port_metrics['ann_vol']:.2%}")
     with c3:
         st.metric("Sharpe ratio", f"{port_metrics['sharpe']:.2f}")
-        st.metric("Maximum drawdown", f"{port_metrics['max_dd']:.2%}")
\ No newline at end of file
+        st.metric("Maximum drawdown", f"{port_metrics['max_dd']:.2%}")
+
+    trading = analysis["trading"]
+    t1, t2, t3 = st.columns(3)
+    t1.metric("Trades", f"{trading['n_trades']:,}")
+    t2.metric("Annual turnover", f"{trading['turnover']:.2f}x")
+    t3.metric("Annual cost drag", f"{trading['cost_drag']:.2%}")
+
+    st.subheader("VaR / CVaR – historical, parametric and Monte Carlo")
+    with st.expander("Risk sign-off", expanded=False):
+        col_h, col_l, col_n, col_seed = st.columns(4)
+        with col_h:
+            horizon = st.number_input(
+                "Horizon (trading days)", min_value=1, max_value=250, value=10
+            )
+        with col_l:
+            confidence = st.selectbox("Confidence", [0.95, 0.975, 0.99], index=0)
+        with col_n:
+            n_paths = st.select_slider(
+                "Paths", options=[10_000, 100_000, 500_000, 1_000_000], value=100_000
+            )
+        with col_seed:
+            seed = st.number_input("Seed", min_value=0, value=0, step=1)
+
+        if st.toggle("Run simulation", value=False):
+            with st.spinner(f"Simulating {n_paths:,} paths..."):
+                var_table = portfolio_var_analysis(
+                    returns,
+                    weights_series,
+                    horizon=int(horizon),
+                    level=round(1 - confidence, 4),
+                    n_paths=n_paths,
+                    seed=int(seed),
+                    workers=os.cpu_count() or 1,
+                    periods_per_year=periods_per_year,
+                )
+            st.dataframe(var_table.style.format("{:.2%}"))
+            st.caption(
+                f"{horizon}-trading-day portfolio return quantile at {confidence:.1%} (VaR) "
+                "and mean return beyond it (CVaR), weights fixed over the horizon."
+            )
+
+    st.subheader("Performance and risk metrics – Assets vs portfolio")
+    with stage("styler: asset metrics"):
+        st.dataframe(
+            analysis["asset_metrics"].style.format(
+                {
+                    "cum_return": "{:.2%}",
+                    "ann_vol": "{:.2%}",
+                    "sharpe": "{:.2f}",
+                    "max_dd": "{:.2%}",
+                    "var_95": "{:.2%}",
+                }
+            )
+        )
+
+    with st.expander("Snapshot", expanded=False):
+        st.caption(
+            "Save this analysis (inputs, parameters, results) to reload it later "
+            "without network, from the Snapshots page."
+        )
+        if st.button("Save snapshot"):
+            params = {
+                "assets": tuple(asset_list),
+                "tickers": tuple(labels[a] for a in asset_list),
+                "start": start,
+                "end": end,
+                "alignment": alignment,
+                "allocation": allocation_mode,
+                "rebalance": rebalance_freq,
+                "drift_threshold": drift_threshold,
+                "costs": repr(costs),
+            }
+            with stage("snapshot export"):
+                path = save_snapshot(
+                    "portfolio",
+                    params,
+                    {"returns": returns, "weights": weights_series},
+                    {**analysis, "metrics": analysis["asset_metrics"]},
+                    label=allocation_mode,
+                )
+            with open(path, "rb") as f:
+                st.download_button("Download snapshot", f.read(), file_name=os.path.basename(path))
+            st.success(f"Snapshot saved to {path}.")
+
+    st.subheader("Cross-sectional momentum – selected categories")
+    with st.expander("Rank the universe by trailing return", expanded=False):
+        universe_tickers = tuple(dict.fromkeys(current_universe.values()))
+        n_universe = len(universe_tickers)
+        col_lb, col_skip, col_k, col_ls = st.columns(4)
+        with col_lb:
+            xs_lookback = st.number_input("Lookback (days)", min_value=2, value=126)
+        with col_skip:
+            xs_skip = st.number_input(
+                "Skip (days)", min_value=0, max_value=int(xs_lookback) - 1, value=0
+            )
+        with col_ls:
+            xs_long_short = st.toggle("Long/short", value=False)
+        with col_k:
+            max_k = max(1, n_universe // 2 if xs_long_short else n_universe)
+            xs_top_k = st.number_input(
+                "Top k", min_value=1, max_value=max_k, value=min(3, max_k)
+            )
+        xs_rebalance = st.selectbox(
+            "Ranking frequency", ["Weekly", "Monthly", "Quarterly"], index=1
+        )
+
+        if st.toggle("Run ranking", value=False):
+            with st.spinner(f"Downloading {n_universe} assets..."):
+                try:
+                    xs_panel, xs_failures = load_yahoo_panel(universe_tickers, start, end)
+                except Exception as e:
+                    xs_panel = pd.DataFrame()
+                    xs_failures = {tkr: str(e) for tkr in universe_tickers}
+            if xs_panel.empty:
+                st.error("No data for the selected categories.")
+                return
+            if xs_failures:
+                st.warning(f"Excluded (no data): {', '.join(xs_failures)}")
+            # Same calendar policy as the portfolio above
+            xs_prices, xs_info = align_prices(xs_panel["price"], alignment)
+            if xs_prices.empty:
+                st.error(f"No dates left with the {alignment} alignment.")
+                return
+            xs = cross_sectional_analysis(
+                xs_prices,
+                lookback=int(xs_lookback),
+                skip=int(xs_skip),
+                top_k=int(xs_top_k),
+                long_short=xs_long_short,
+                rebalance=xs_rebalance,
+                costs=costs,
+                periods_per_year=xs_info["periods_per_year"],
+            )
+            with stage("chart: cross-sectional equity"):
+                st.line_chart(downsample(xs["equity"]))
+            st.dataframe(
+                xs["metrics"].style.format(
+                    {
+                        "cum_return": "{:.2%}",
+                        "ann_vol": "{:.2%}",
+                        "sharpe": "{:.2f}",
+                        "max_dd": "{:.2%}",
+                        "var_95": "{:.2%}",
+                    }
+                )
+            )
+            latest = xs["weights"].iloc[-1]
+            st.write("Current book:")
+            book = latest[latest != 0].rename("Weight").to_frame()
+            st.dataframe(book.style.format("{:.2%}"))
+            st.caption(
+                f"Annual turnover {xs['trading']['turnover']:.2f}x, "
+                f"cost drag {xs['trading']['cost_drag']:.2%}."
+            )
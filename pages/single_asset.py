@@ -1,11 +1,26 @@
 import datetime as dt
-import numpy as np
+import os
+
 import pandas as pd
 import streamlit as st
 
+from analytics import single_asset_analysis, sweep_analysis
+from charts import downsample
+from costs import CostModel
 from data import load_yahoo_data
-from metrics import compute_performance_metrics
-from strategies import moving_average_strategy, momentum_strategy
+from intraday import (
+    INTERVALS,
+    LiveSeries,
+    coarser_intervals,
+    infer_bars_per_year,
+    is_intraday,
+    max_history_days,
+    resample_frame,
+)
+from metrics import cached_streaming_metrics
+from profiling import stage
+from snapshots import save_snapshot
+from strategies import sweep_surface
 
 def format_timestamp_utc(ts: dt.datetime | None) -> str:
     if ts is None:
@@ -24,13 +39,34 @@ def render_single_asset(universe: dict, auto_refresh: bool):
 
     ticker = universe[asset_label]
 
+    interval = st.selectbox(
+        "Bar interval",
+        list(INTERVALS),
+        index=list(INTERVALS).index("1d"),
+        help="Intraday history is limited by Yahoo (7 days for 1m, 60 days up to 30m, 730 days for 1h).",
+    )
+    resample_to = None
+    if is_intraday(interval):
+        resample_to = st.selectbox(
+            "Resample to",
+            [None, *coarser_intervals(interval)],
+            format_func=lambda i: i or "no resampling",
+            help="Aggregate the bars to a coarser interval (last price of each bar).",
+        )
+
     # Date range
     default_end = dt.date.today()
-    default_start = default_end - dt.timedelta(days=365)
+    if is_intraday(interval):
+        min_date = default_end - dt.timedelta(days=max_history_days(interval) - 1)
+        default_start = max(min_date, default_end - dt.timedelta(days=30))
+    else:
+        min_date = None
+        default_start = default_end - dt.timedelta(days=365)
 
     date_range = st.date_input(
         "Analysis period",
         value=(default_start, default_end),
+        min_value=min_date,
         max_value=default_end,
     )
 
@@ -50,7 +86,20 @@ def render_single_asset(universe: dict, auto_refresh: bool):
             short_w = st.number_input("Short MA window", min_value=1, value=20)
             long_w = st.number_input("Long MA window", min_value=1, value=50)
         with col2:
-            lookback_mom = st.number_input("Momentum lookback (days)", min_value=1, value=60)
+            lookback_mom = st.number_input("Momentum lookback (bars)", min_value=1, value=60)
+
+    with st.expander("Transaction costs", expanded=False):
+        col_fee, col_slip, col_fixed, col_cap = st.columns(4)
+        with col_fee:
+            fee_bps = st.number_input("Fees (bps)", min_value=0.0, value=0.0, step=1.0)
+        with col_slip:
+            slippage_bps = st.number_input("Slippage (bps)", min_value=0.0, value=0.0, step=1.0)
+        with col_fixed:
+            fixed_cost = st.number_input("Fixed cost per trade", min_value=0.0, value=0.0)
+        with col_cap:
+            capital = st.number_input("Capital", min_value=1.0, value=100_000.0, step=10_000.0)
+    costs = CostModel(fee_bps, fixed_cost, capital, slippage_bps)
+    costs = None if costs.is_zero else costs
 
     # Parameters validation
     if short_w >= long_w:
@@ -65,7 +114,7 @@ def render_single_asset(universe: dict, auto_refresh: bool):
 
     with st.spinner("Downloading data..."):
         try:
-            data = load_yahoo_data(ticker, start, end)
+            data = load_yahoo_data(ticker, start, end, interval)
         except Exception as e:
             st.error(f"Error loading data: {e}")
             data = None
@@ -74,28 +123,53 @@ def render_single_asset(universe: dict, auto_refresh: bool):
         st.error("No data received for this asset and period.")
         return
 
+    if is_intraday(interval):
+        # Bounded live window: new bars are appended to a fixed-size ring buffer
+        live = st.session_state.setdefault("live_series", {})
+        # One buffer per series: it resets itself when the date range moves
+        key = (ticker, interval)
+        if key not in live:
+            live[key] = LiveSeries.for_interval(interval)
+        with stage("live series update"):
+            live[key].update(data["price"])
+            data = live[key].frame()
+        if live[key].dropped:
+            st.warning(
+                f"Live buffer full: the {live[key].dropped:,} oldest bars were dropped, "
+                f"metrics start on {data.index[0]:%Y-%m-%d %H:%M} UTC."
+            )
+        if resample_to is not None:
+            with stage("resample"):
+                data = resample_frame(data, INTERVALS[resample_to][0])
+            if data.empty:
+                st.error(f"Not enough bars to resample to {resample_to}.")
+                return
+
+    # Bars per session and sessions per year as observed in the data
+    periods_per_year = infer_bars_per_year(data.index)
+
     st.session_state.last_update_single = dt.datetime.utcnow()
     st.success(f"Data loaded: {len(data)} observations.")
 
     
-    last_price = float(data["price"].iloc[-1])
-    
-    today = data.index[-1].date()
-    today_data = data[data.index.date == today]
-    
-    if not today_data.empty:
-        day_ret = float(today_data["return"].iloc[-1])
-    else:
-        day_ret = 0.0
-        
-    cum_bh = (1 + data["return"]).cumprod().iloc[-1] - 1
+    analysis = single_asset_analysis(
+        data,
+        short_window=short_w,
+        long_window=long_w,
+        lookback=lookback_mom,
+        costs=costs,
+        periods_per_year=periods_per_year,
+    )
+    last_price = analysis["last_price"]
+    day_ret = analysis["day_return"]
+    cum_bh = analysis["cum_bh"]
 
     kpi1, kpi2, kpi3 = st.columns(3)
     kpi1.metric(
         label="Last price",
         value=f"{last_price:,.2f}",
         delta=f"{day_ret:.2%}",
-        help="Last available close and today's return.",
+        help="Last available price and return since the previous session's close.",
     )
     kpi2.metric(
         label="Cumulative return (Buy & Hold)",
@@ -108,41 +182,43 @@ def render_single_asset(universe: dict, auto_refresh: bool):
         help="Time when data was last refreshed.",
     )
 
-    # Strategies calculation
-    ma_df = moving_average_strategy(data, short_window=short_w, long_window=long_w)
-    mom_df = momentum_strategy(data, lookback=lookback_mom)
+    ma_df = analysis["ma"]
+    mom_df = analysis["momentum"]
 
     # Tabs
     chart_tab, table_tab = st.tabs(["Charts", "Raw data"])
 
     with chart_tab:
         st.subheader("Price and strategies")
-        chart_df = pd.DataFrame(index=data.index)
-        chart_df["Price"] = data["price"]
-        # Normalisation base 100 ou affichage cumulé direct
-        chart_df["Buy & Hold"] = (1 + data["return"]).cumprod()
-        chart_df["MA Strategy"] = (1 + ma_df["strategy_return"]).cumprod()
-        chart_df["Momentum Strategy"] = (1 + mom_df["strategy_return"]).cumprod()
-        st.line_chart(chart_df)
+        with stage("chart: price and strategies"):
+            st.line_chart(downsample(analysis["equity"]))
 
     with table_tab:
         st.subheader("Last observations")
-        tail_df = pd.DataFrame(
-            {
-                "price": np.ravel(data["price"].to_numpy()),
-                "ret_bh": np.ravel(data["return"].to_numpy()),
-                "ret_ma": np.ravel(ma_df["strategy_return"].to_numpy()),
-                "ret_mom": np.ravel(mom_df["strategy_return"].to_numpy()),
-            },
-            index=data.index,
-        )
-        st.dataframe(tail_df.tail())
+        st.dataframe(analysis["returns"].tail())
 
     # Metrics
     st.subheader("Performance and risk metrics")
-    metrics_bh = compute_performance_metrics(data["return"])
-    metrics_ma = compute_performance_metrics(ma_df["strategy_return"])
-    metrics_mom = compute_performance_metrics(mom_df["strategy_return"])
+    # Accumulators stay warm across refreshes: only new bars are absorbed
+    metrics_cache = st.session_state.setdefault("metrics_cache", {})
+    # Not keyed on the date range: an accumulator resets when its first bar moves
+    key = f"{ticker}|{interval}|{costs!r}"
+    with stage("streaming metrics"):
+        metrics_bh = cached_streaming_metrics(
+            metrics_cache, f"{key}|bh", data["return"], periods_per_year=periods_per_year
+        )
+        metrics_ma = cached_streaming_metrics(
+            metrics_cache,
+            f"{key}|ma|{short_w}|{long_w}",
+            ma_df["strategy_return"],
+            periods_per_year=periods_per_year,
+        )
+        metrics_mom = cached_streaming_metrics(
+            metrics_cache,
+            f"{key}|mom|{lookback_mom}",
+            mom_df["strategy_return"],
+            periods_per_year=periods_per_year,
+        )
 
     col_bh, col_ma, col_mom = st.columns(3)
 
@@ -152,7 +228,7 @@ def render_single_asset(universe: dict, auto_refresh: bool):
         st.metric("Annualized volatility", f"{metrics_bh['ann_vol']:.2%}")
         st.metric("Sharpe ratio", f"{metrics_bh['sharpe']:.2f}")
         st.metric("Maximum drawdown", f"{metrics_bh['max_dd']:.2%}")
-        st.metric("Daily 95% VaR", f"{metrics_bh['var_95']:.2%}")
+        st.metric("Per-bar 95% VaR", f"{metrics_bh['var_95']:.2%}")
 
     with col_ma:
         st.markdown("### Moving Average Strategy")
@@ -160,7 +236,7 @@ def render_single_asset(universe: dict, auto_refresh: bool):
         st.metric("Annualized volatility", f"{metrics_ma['ann_vol']:.2%}")
         st.metric("Sharpe ratio", f"{metrics_ma['sharpe']:.2f}")
         st.metric("Maximum drawdown", f"{metrics_ma['max_dd']:.2%}")
-        st.metric("Daily 95% VaR", f"{metrics_ma['var_95']:.2%}")
+        st.metric("Per-bar 95% VaR", f"{metrics_ma['var_95']:.2%}")
 
     with col_mom:
         st.markdown("### Momentum Strategy")
@@ -168,4 +244,98 @@ def render_single_asset(universe: dict, auto_refresh: bool):
         st.metric("Annualized volatility", f"{metrics_mom['ann_vol']:.2%}")
         st.metric("Sharpe ratio", f"{metrics_mom['sharpe']:.2f}")
         st.metric("Maximum drawdown", f"{metrics_mom['max_dd']:.2%}")
-        st.metric("Daily 95% VaR", f"{metrics_mom['var_95']:.2%}")
+        st.metric("Per-bar 95% VaR", f"{metrics_mom['var_95']:.2%}")
+
+    st.markdown("### Trading activity")
+    st.dataframe(
+        analysis["trading"].style.format(
+            {"n_trades": "{:.0f}", "turnover": "{:.1f}x", "cost_drag": "{:.2%}"}
+        )
+    )
+    st.caption("Turnover and cost drag are annualized (traded volume and costs per year).")
+
+    with st.expander("Snapshot", expanded=False):
+        st.caption(
+            "Save this analysis (inputs, parameters, results) to reload it later "
+            "without network, from the Snapshots page."
+        )
+        if st.button("Save snapshot"):
+            params = {
+                "ticker": ticker,
+                "label": asset_label,
+                "interval": interval,
+                "start": start,
+                "end": end,
+                "short_window": int(short_w),
+                "long_window": int(long_w),
+                "lookback": int(lookback_mom),
+                "costs": repr(costs),
+                "periods_per_year": periods_per_year,
+            }
+            metrics = pd.DataFrame(
+                {
+                    "Buy & Hold": metrics_bh,
+                    "MA Strategy": metrics_ma,
+                    "Momentum Strategy": metrics_mom,
+                }
+            ).T
+            with stage("snapshot export"):
+                path = save_snapshot(
+                    "single_asset",
+                    params,
+                    {"data": data},
+                    {**analysis, "metrics": metrics},
+                    label=f"{ticker}_{interval}",
+                )
+            with open(path, "rb") as f:
+                st.download_button("Download snapshot", f.read(), file_name=os.path.basename(path))
+            st.success(f"Snapshot saved to {path}.")
+
+    # Parameter sweep
+    st.subheader("Parameter sweep")
+    with st.expander("Sharpe surface over strategy parameters", expanded=False):
+        col_s, col_l, col_m = st.columns(3)
+        with col_s:
+            short_min, short_max = st.slider("Short MA range", 1, 200, (5, 100))
+            short_step = st.number_input("Short step", min_value=1, value=5)
+        with col_l:
+            long_min, long_max = st.slider("Long MA range", 2, 400, (20, 250))
+            long_step = st.number_input("Long step", min_value=1, value=10)
+        with col_m:
+            mom_min, mom_max = st.slider("Momentum lookback range", 1, 400, (5, 250))
+            sweep_metric = st.selectbox(
+                "Metric", ["sharpe", "max_dd", "cum_return", "turnover", "cost_drag"]
+            )
+
+        if st.toggle("Run sweep", value=False):
+            try:
+                sweeps = sweep_analysis(
+                    data,
+                    range(short_min, short_max + 1, short_step),
+                    range(long_min, long_max + 1, long_step),
+                    range(mom_min, mom_max + 1),
+                    periods_per_year=periods_per_year,
+                    costs=costs,
+                )
+            except ValueError as e:
+                st.warning(str(e))
+                return
+            ma_sweep = sweeps["ma"]
+            ranked = ma_sweep["sharpe"].dropna()
+            if ranked.empty:
+                st.warning("No MA pair has a defined Sharpe ratio on this period.")
+            else:
+                best = ma_sweep.loc[ranked.idxmax()]
+                st.write(
+                    f"Best MA pair by Sharpe: **{int(best['short_window'])} / "
+                    f"{int(best['long_window'])}** (Sharpe {best['sharpe']:.2f}, "
+                    f"max DD {best['max_dd']:.2%})"
+                )
+            surface = sweep_surface(ma_sweep, sweep_metric)
+            with stage("styler: sweep surface"):
+                st.dataframe(
+                    surface.style.background_gradient(cmap="RdYlGn", axis=None).format("{:.2f}")
+                )
+
+            mom_sweep = sweeps["momentum"]
+            st.line_chart(mom_sweep.set_index("lookback")[sweep_metric])
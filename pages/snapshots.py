@@ -0,0 +1,86 @@
+import pandas as pd
+import streamlit as st
+
+from charts import downsample
+from snapshots import SNAPSHOT_DIR, compare_snapshots, list_snapshots, load_snapshot
+
+METRIC_FORMATS = {
+    "cum_return": "{:.2%}",
+    "ann_vol": "{:.2%}",
+    "sharpe": "{:.2f}",
+    "max_dd": "{:.2%}",
+    "var_95": "{:.2%}",
+}
+
+
+def _format_metrics(metrics: pd.DataFrame):
+    formats = {k: v for k, v in METRIC_FORMATS.items() if k in metrics.columns}
+    return metrics.style.format(formats, na_rep="-")
+
+
+def _describe(row) -> str:
+    params = row["params"]
+    name = params.get("label") or ", ".join(params.get("assets", ())) or row["kind"]
+    return f"{row['created_at']} – {row['kind']} – {name}"
+
+
+def _render_snapshot(snapshot: dict):
+    results = snapshot["results"]
+    st.caption(f"{snapshot['kind']} snapshot created {snapshot['created_at']} (UTC).")
+    with st.expander("Parameters", expanded=False):
+        st.json({k: str(v) for k, v in snapshot["params"].items()})
+
+    if isinstance(results.get("equity"), pd.DataFrame):
+        st.subheader("Equity curves")
+        st.line_chart(downsample(results["equity"]))
+    if isinstance(results.get("metrics"), pd.DataFrame):
+        st.subheader("Performance and risk metrics")
+        st.dataframe(_format_metrics(results["metrics"]))
+    if isinstance(results.get("corr"), pd.DataFrame):
+        st.subheader("Return correlation matrix")
+        st.dataframe(results["corr"].style.background_gradient(cmap="RdBu_r", vmin=-1, vmax=1))
+
+
+def render_snapshots():
+    st.subheader("Snapshots – saved analyses")
+    st.caption(
+        f"Analyses saved from the other pages or by the daily job (`{SNAPSHOT_DIR}/`), "
+        "reloaded without network or recomputation."
+    )
+
+    saved = list_snapshots()
+    uploaded = st.file_uploader("Open a snapshot file", type=["snap"])
+
+    snapshots = {}
+    if uploaded is not None:
+        try:
+            snapshots[f"Uploaded – {uploaded.name}"] = load_snapshot(uploaded.getvalue())
+        except Exception as e:
+            st.error(f"Could not read {uploaded.name}: {e}")
+
+    if saved.empty and not snapshots:
+        st.info("No snapshot saved yet: use 'Save snapshot' on the Single Asset or Portfolio page.")
+        return
+
+    labels = {_describe(row): row["path"] for _, row in saved.iterrows()}
+    selected = st.multiselect(
+        "Snapshots (select two or more to compare)",
+        list(labels),
+        default=list(labels)[:1] if not snapshots else [],
+    )
+    for label in selected:
+        snapshots[label] = load_snapshot(labels[label])
+
+    if len(snapshots) == 1:
+        _render_snapshot(next(iter(snapshots.values())))
+    elif len(snapshots) > 1:
+        comparable = {
+            label: snap
+            for label, snap in snapshots.items()
+            if isinstance(snap["results"].get("metrics"), pd.DataFrame)
+        }
+        if comparable:
+            st.subheader("Metrics comparison")
+            st.dataframe(_format_metrics(compare_snapshots(comparable)))
+        view = st.selectbox("Show details of", list(snapshots))
+        _render_snapshot(snapshots[view])
@@ -0,0 +1,263 @@
+import numpy as np
+import pandas as pd
+
+from costs import CostModel
+
+# Calendar rebalancing rules -> pandas period used to group dates
+REBALANCE_PERIODS = {
+    "Weekly": "W",
+    "Monthly": "M",
+    "Quarterly": "Q",
+    "Yearly": "Y",
+}
+
+
+def calendar_rebalance_mask(index: pd.DatetimeIndex, freq: str | None) -> np.ndarray:
+    """
+    Boolean array, True on the first date of each rebalancing period.
+    freq: "Daily", "Weekly", "Monthly", "Quarterly", "Yearly" or None
+    (buy and hold: only the first date).
+    """
+    n = len(index)
+    mask = np.zeros(n, dtype=bool)
+    if n == 0:
+        return mask
+
+    if freq == "Daily":
+        mask[:] = True
+    elif freq is None or freq == "Never":
+        mask[0] = True
+    elif freq in REBALANCE_PERIODS:
+        periods = pd.DatetimeIndex(index).to_period(REBALANCE_PERIODS[freq]).asi8
+        mask[0] = True
+        mask[1:] = periods[1:] != periods[:-1]
+    else:
+        raise ValueError(f"Unknown rebalancing frequency: {freq!r}")
+    return mask
+
+
+def _log_growth(returns: np.ndarray) -> np.ndarray:
+    """Cumulative log growth per asset, with a leading row of zeros (T+1 x N)."""
+    log_ret = np.log1p(np.clip(returns, -1.0 + 1e-12, None))
+    out = np.zeros((returns.shape[0] + 1, returns.shape[1]))
+    np.cumsum(log_ret, axis=0, out=out[1:])
+    return out
+
+
+def _first_breach(
+    cum_log: np.ndarray, weights: np.ndarray, start: int, stop: int, threshold: float
+) -> int | None:
+    """
+    First date t in [start, stop) whose end-of-day drifted weights are more
+    than `threshold` away from the targets, for a segment starting at `start`.
+    The window is scanned in doubling chunks so the cost stays proportional
+    to the segment length.
+    """
+    base = cum_log[start]
+    lo, width = start, 32
+    while lo < stop:
+        hi = min(stop, lo + width)
+        growth = np.exp(cum_log[lo + 1 : hi + 1] - base) * weights
+        drifted = growth / growth.sum(axis=1, keepdims=True)
+        breach = np.abs(drifted - weights).max(axis=1) > threshold
+        hit = np.flatnonzero(breach)
+        if hit.size:
+            return lo + int(hit[0])
+        lo, width = hi, width * 2
+    return None
+
+
+def _threshold_starts(
+    cum_log: np.ndarray, weights: np.ndarray, calendar_mask: np.ndarray, threshold: float
+) -> np.ndarray:
+    """Segment starts from calendar dates plus drift-threshold breaches."""
+    n = calendar_mask.size
+    calendar_starts = np.append(np.flatnonzero(calendar_mask), n)
+    starts = []
+    s = 0
+    while s < n:
+        starts.append(s)
+        # Next calendar rebalance strictly after s
+        c = int(calendar_starts[np.searchsorted(calendar_starts, s, side="right")])
+        t = _first_breach(cum_log, weights, s, c, threshold)
+        s = c if t is None or t + 1 >= c else t + 1
+    return np.asarray(starts, dtype=np.int64)
+
+
+def simulate_portfolio(
+    returns: pd.DataFrame,
+    target_weights,
+    rebalance: str | None = "Monthly",
+    threshold: float | None = None,
+    costs: CostModel | None = None,
+) -> dict:
+    """
+    Simulate a rebalanced portfolio with weights drifting between rebalances.
+
+    - returns: T x N asset returns (no missing values);
+    - target_weights: N weights (Series aligned on columns, or array);
+    - rebalance: calendar rule, see calendar_rebalance_mask;
+    - threshold: optional absolute drift tolerance (e.g. 0.05); when set the
+      portfolio is also rebalanced the day after any weight drifts further
+      than this from its target;
+    - costs: optional CostModel charged on the trades of each rebalance
+      (the initial allocation included), paid at the start of that day.
+
+    Weights are reset to target at the start of each rebalance date, then
+    grow with each asset's cumulative return. Everything is computed with
+    segment-wise cumulative sums of log returns: the only Python loop is
+    over threshold-triggered rebalances, never over dates.
+
+    Returns a dict with portfolio "returns" and "nav" (Series, starting at 1),
+    start-of-day "weights" (DataFrame), "rebalance_dates", "trades" (weight
+    changes at each rebalance, DataFrame) and "costs" (Series).
+    """
+    if isinstance(target_weights, pd.Series):
+        w = target_weights.reindex(returns.columns).to_numpy(dtype=float)
+    else:
+        w = np.asarray(target_weights, dtype=float)
+    if w.shape != (returns.shape[1],):
+        raise ValueError("target_weights must have one weight per returns column")
+
+    r = returns.to_numpy(dtype=float)
+    n = r.shape[0]
+    if n == 0:
+        empty = pd.Series(dtype=float, index=returns.index)
+        return {
+            "returns": empty,
+            "nav": empty,
+            "weights": returns.iloc[:0] * 0.0,
+            "rebalance_dates": returns.index[:0],
+            "trades": returns.iloc[:0] * 0.0,
+            "costs": empty,
+        }
+
+    cum_log = _log_growth(r)
+    mask = calendar_rebalance_mask(returns.index, rebalance)
+
+    if threshold is not None:
+        starts = _threshold_starts(cum_log, w, mask, threshold)
+        mask = np.zeros(n, dtype=bool)
+        mask[starts] = True
+    else:
+        starts = np.flatnonzero(mask)
+
+    # Index of the segment each date belongs to, and its starting log level
+    seg_id = np.cumsum(mask) - 1
+    base = cum_log[starts][seg_id]
+
+    # Per-asset growth since the segment start, before and after each day
+    growth_end = np.exp(cum_log[1:] - base) * w
+    growth_start = np.empty_like(growth_end)
+    growth_start[1:] = growth_end[:-1]
+    growth_start[starts] = w
+
+    value_end = growth_end.sum(axis=1)
+    value_start = growth_start.sum(axis=1)
+
+    port_ret = value_end / value_start - 1.0
+    weights = growth_start / value_start[:, None]
+
+    # Trades: from cash on day 0, then from the drifted end-of-day weights
+    trades = np.zeros_like(weights)
+    drifted = np.vstack([np.zeros(w.size), growth_end[:-1] / value_end[:-1, None]])
+    trades[starts] = w - drifted[starts]
+    cost = np.zeros(n)
+    if costs is not None:
+        # Paid out of the portfolio at the start of the rebalance day
+        cost = costs.trade_costs(trades).sum(axis=1)
+        port_ret = (1.0 - cost) * (1.0 + port_ret) - 1.0
+
+    port_returns = pd.Series(port_ret, index=returns.index, name="portfolio")
+    return {
+        "returns": port_returns,
+        "nav": (1.0 + port_returns).cumprod().rename("nav"),
+        "weights": pd.DataFrame(weights, index=returns.index, columns=returns.columns),
+        "rebalance_dates": returns.index[mask],
+        "trades": pd.DataFrame(trades, index=returns.index, columns=returns.columns),
+        "costs": pd.Series(cost, index=returns.index, name="costs"),
+    }
+
+
+def simulate_targets(
+    returns: pd.DataFrame,
+    targets: pd.DataFrame,
+    costs: CostModel | None = None,
+) -> dict:
+    """
+    Simulate a portfolio whose targets change at each rebalance (e.g. a
+    ranking strategy).
+
+    - returns: T x N asset returns (missing values count as a zero return);
+    - targets: target weights indexed by rebalance dates (a subset of
+      returns.index), as fractions of NAV; they may be negative (shorts) and
+      need not sum to 1, the rest being cash at a zero return; the portfolio
+      is in cash before the first rebalance;
+    - costs: optional CostModel charged on the trades of each rebalance,
+      paid at the start of that day (as in simulate_portfolio).
+
+    Only the assets held in each segment are tracked: every date gathers at
+    most (max holdings) cumulative log returns, so memory is O(T x holdings +
+    rebalances x N) on top of one T x N cumulative sum, for any universe size.
+
+    Returns a dict with portfolio "returns" and "nav" (Series),
+    "rebalance_dates", "trades" (weight changes at each rebalance,
+    DataFrame indexed by rebalance dates), "turnover" (sum of |trades| per
+    rebalance) and "costs" (Series per date).
+    """
+    targets = targets.reindex(columns=returns.columns).fillna(0.0)
+    targets = targets[targets.index.isin(returns.index)].sort_index()
+    n = len(returns)
+    starts = returns.index.get_indexer(targets.index)
+    w = targets.to_numpy(dtype=float)
+    if starts.size == 0 or starts[0] != 0:
+        # Cash until the first rebalance
+        starts = np.concatenate([[0], starts])
+        w = np.vstack([np.zeros(returns.shape[1]), w])
+
+    r = np.nan_to_num(returns.to_numpy(dtype=float))
+    cum_log = _log_growth(r)
+    mask = np.zeros(n, dtype=bool)
+    mask[starts] = True
+    seg_id = np.cumsum(mask) - 1
+
+    # Held assets per segment, padded to the largest book (weight 0)
+    held = w != 0
+    width = max(int(held.sum(axis=1).max()), 1)
+    order = np.argsort(~held, axis=1, kind="stable")[:, :width]
+    held_w = np.take_along_axis(w, order, axis=1) * np.take_along_axis(held, order, axis=1)
+    cash = 1.0 - w.sum(axis=1)
+
+    assets = order[seg_id]
+    dates = np.arange(n)[:, None]
+    growth = np.exp(cum_log[dates + 1, assets] - cum_log[starts[seg_id][:, None], assets])
+    value_end = cash[seg_id] + (held_w[seg_id] * growth).sum(axis=1)
+    value_start = np.empty(n)
+    value_start[1:] = value_end[:-1]
+    value_start[starts] = 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        port_ret = value_end / value_start - 1.0
+
+    # Trades: from the drifted weights at the end of the previous segment
+    ends = np.append(starts[1:], n) - 1
+    drifted = np.zeros_like(w)
+    end_weights = held_w * growth[ends] / value_end[ends, None]
+    np.put_along_axis(drifted, order, end_weights, axis=1)
+    trades = w.copy()
+    trades[1:] -= drifted[:-1]
+
+    cost = np.zeros(n)
+    if costs is not None:
+        cost[starts] = costs.trade_costs(trades).sum(axis=1)
+        port_ret = (1.0 - cost) * (1.0 + port_ret) - 1.0
+
+    rebalance_dates = returns.index[starts]
+    port_returns = pd.Series(port_ret, index=returns.index, name="portfolio")
+    return {
+        "returns": port_returns,
+        "nav": (1.0 + port_returns).cumprod().rename("nav"),
+        "rebalance_dates": rebalance_dates,
+        "trades": pd.DataFrame(trades, index=rebalance_dates, columns=returns.columns),
+        "turnover": pd.Series(np.abs(trades).sum(axis=1), index=rebalance_dates, name="turnover"),
+        "costs": pd.Series(cost, index=returns.index, name="costs"),
+    }
@@ -0,0 +1,186 @@
+import datetime as dt
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from profiling import timed
+from providers import yahoo_close_downloader
+
+PRICE_STORE_DIR = os.environ.get(
+    "PRICE_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".price_store"),
+)
+INDEX_FILE = "_index.json"
+
+
+def _to_date(value) -> dt.date:
+    return pd.Timestamp(value).date()
+
+
+def _normalize_index(index, interval: str) -> pd.DatetimeIndex:
+    """Naive timestamps: exchange dates for daily bars, UTC for intraday bars."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        return index
+    if interval == "1d":
+        return index.tz_localize(None)
+    return index.tz_convert("UTC").tz_localize(None)
+
+
+class PriceStore:
+    """
+    On-disk store of adjusted closes, one Parquet file per ticker.
+
+    The store remembers which [start, end) range has already been requested
+    for each ticker, so later calls only download the missing head and/or
+    tail segments. `downloader(ticker, start, end)` must return a Series of
+    closes (or None), e.g. one of the providers in providers.py; pass a stub
+    or an offline provider to use the store without network. Intraday series
+    are stored separately per interval and the downloader then also gets an
+    `interval` keyword (e.g. "1h").
+    """
+
+    def __init__(self, root: str = PRICE_STORE_DIR, downloader=yahoo_close_downloader):
+        self.root = root
+        self.downloader = downloader
+        os.makedirs(self.root, exist_ok=True)
+        self._index = self._read_index()
+        # Several tickers may be synced from a thread pool at once: one lock
+        # per ticker/interval for its file, one for the shared index
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    # ----------------- Files -----------------
+    @staticmethod
+    def _key(ticker: str, interval: str = "1d") -> str:
+        return ticker if interval == "1d" else f"{ticker}@{interval}"
+
+    def _path(self, key: str) -> str:
+        safe = "".join(c if c.isalnum() or c in "-_.@" else "_" for c in key)
+        return os.path.join(self.root, f"{safe}.parquet")
+
+    def _read_index(self) -> dict:
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_index(self):
+        path = os.path.join(self.root, INDEX_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._index, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+    def read(self, ticker: str, interval: str = "1d") -> pd.Series:
+        """Full stored history for a ticker (empty Series if unknown)."""
+        path = self._path(self._key(ticker, interval))
+        if not os.path.exists(path):
+            return pd.Series(dtype=float, name="price", index=pd.DatetimeIndex([], name="Date"))
+        return pd.read_parquet(path)["price"]
+
+    def _write(self, key: str, prices: pd.Series):
+        path = self._path(key)
+        tmp = path + ".tmp"
+        prices.rename("price").to_frame().to_parquet(tmp)
+        os.replace(tmp, path)
+
+    # ----------------- Sync -----------------
+    def coverage(self, ticker: str, interval: str = "1d") -> tuple[dt.date, dt.date] | None:
+        """[start, end) range already synced for a ticker, or None."""
+        entry = self._index.get(self._key(ticker, interval))
+        if entry is None:
+            return None
+        return dt.date.fromisoformat(entry["start"]), dt.date.fromisoformat(entry["end"])
+
+    def _missing_segments(self, ticker: str, start: dt.date, end: dt.date, interval: str) -> list:
+        cov = self.coverage(ticker, interval)
+        if cov is None:
+            return [(start, end)]
+        cov_start, cov_end = cov
+        segments = []
+        if start < cov_start:
+            segments.append((start, cov_start))
+        if end > cov_end:
+            segments.append((cov_end, end))
+        return segments
+
+    @timed("price_store.download")
+    def _download(self, ticker: str, start: dt.date, end: dt.date, interval: str):
+        if interval == "1d":
+            return self.downloader(ticker, start, end)
+        return self.downloader(ticker, start, end, interval=interval)
+
+    @staticmethod
+    def _confirmed_empty(start: dt.date, end: dt.date, interval: str) -> bool:
+        """A daily segment without any weekday cannot have bars."""
+        return interval == "1d" and np.busday_count(start, end) == 0
+
+    @timed()
+    def sync(self, ticker: str, start, end, interval: str = "1d") -> pd.Series:
+        """
+        Make sure [start, end) is on disk, downloading only the missing
+        segments, and return the stored closes for that range.
+
+        Coverage only grows over segments that returned rows (or cannot
+        have any): an empty answer, e.g. a transient upstream failure, is
+        downloaded again on the next call. Concurrent syncs of the same
+        ticker are serialized, so none of them overwrites the other's rows.
+        """
+        start, end = _to_date(start), _to_date(end)
+        key = self._key(ticker, interval)
+
+        with self._key_lock(key):
+            segments = self._missing_segments(ticker, start, end, interval)
+            if segments:
+                self._sync_segments(ticker, key, segments, interval)
+            prices = self.read(ticker, interval)
+
+        mask = (prices.index >= pd.Timestamp(start)) & (prices.index < pd.Timestamp(end))
+        return prices[mask]
+
+    def _sync_segments(self, ticker: str, key: str, segments: list, interval: str):
+        """Download `segments`, merge them into the file and extend the coverage (key locked)."""
+        pieces = [self.read(ticker, interval)]
+        covered = []
+        for seg_start, seg_end in segments:
+            fetched = self._download(ticker, seg_start, seg_end, interval)
+            if fetched is not None and not fetched.empty:
+                fetched = fetched.astype(float)
+                fetched.index = _normalize_index(fetched.index, interval)
+                pieces.append(fetched)
+                covered.append((seg_start, seg_end))
+            elif self._confirmed_empty(seg_start, seg_end, interval):
+                covered.append((seg_start, seg_end))
+
+        if len(pieces) > 1:
+            merged = pd.concat([p for p in pieces if not p.empty])
+            # Newer downloads win (e.g. a revised close for the last bar)
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            merged.index.name = "Date"
+            self._write(key, merged)
+
+        if not covered:
+            return
+        # Segments are the head and/or tail of the coverage (or the whole range)
+        # Today's bar can still move: never mark it as synced
+        today = dt.date.today()
+        with self._lock:
+            cov = self.coverage(ticker, interval)
+            new_start = min(s for s, _ in covered)
+            new_end = min(max(e for _, e in covered), today)
+            if cov is not None:
+                new_start, new_end = min(new_start, cov[0]), max(new_end, cov[1])
+            self._index[key] = {
+                "start": new_start.isoformat(),
+                "end": max(new_end, new_start).isoformat(),
+            }
+            self._write_index()
@@ -0,0 +1,129 @@
+"""
+Lightweight timing instrumentation for the dashboard pages and batch jobs.
+
+A run (`profile_run`) collects the wall time of named stages: `stage(name)`
+blocks in the pages and functions decorated with `timed()`. Stages nest
+(their depth is kept for display) and repeated stages are aggregated (calls,
+total seconds). The active run is thread-local, which matches Streamlit's one
+script thread per session; outside a run, stages cost one attribute lookup.
+
+When PROFILE_LOG is set (environment variable), every run is appended to
+that file as one JSON line, so timings can be compared across deployments.
+"""
+import contextlib
+import datetime as dt
+import functools
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+PROFILE_LOG = os.environ.get("PROFILE_LOG")  # JSONL file, disabled when unset
+
+_local = threading.local()
+
+
+class Timings:
+    """Stage timings of one run, in order of first occurrence."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = dt.datetime.now(dt.timezone.utc)
+        self.total = 0.0
+        self._stages = {}  # name -> [depth, calls, seconds]
+        self._depth = 0
+
+    def _entry(self, name: str, depth: int) -> list:
+        # Registered when the stage starts, so parents are listed before children
+        return self._stages.setdefault(name, [depth, 0, 0.0])
+
+    def add(self, name: str, seconds: float, depth: int = 0):
+        entry = self._entry(name, depth)
+        entry[1] += 1
+        entry[2] += seconds
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per stage: depth, calls, seconds and share of the run."""
+        rows = [
+            {"stage": name, "depth": depth, "calls": calls, "seconds": seconds}
+            for name, (depth, calls, seconds) in self._stages.items()
+        ]
+        frame = pd.DataFrame(rows, columns=["stage", "depth", "calls", "seconds"])
+        frame["share"] = frame["seconds"] / self.total if self.total > 0 else float("nan")
+        return frame.set_index("stage")
+
+    def to_record(self) -> dict:
+        return {
+            "run": self.name,
+            "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "total_s": round(self.total, 6),
+            "stages": {
+                name: {"calls": calls, "seconds": round(seconds, 6)}
+                for name, (_, calls, seconds) in self._stages.items()
+            },
+        }
+
+
+def current_run() -> Timings | None:
+    """The run being profiled in this thread, if any."""
+    return getattr(_local, "run", None)
+
+
+def append_log(timings: Timings, path: str):
+    """Append a run as one JSON line."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(timings.to_record()) + "\n")
+
+
+@contextlib.contextmanager
+def profile_run(name: str, log_path: str | None = PROFILE_LOG):
+    """Collect the stages timed in this thread until the block exits."""
+    previous = current_run()
+    timings = Timings(name)
+    _local.run = timings
+    t0 = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.total = time.perf_counter() - t0
+        _local.run = previous
+        if log_path:
+            append_log(timings, log_path)
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    """Time a block as a stage of the active run (no-op outside a run)."""
+    run = current_run()
+    if run is None:
+        yield
+        return
+    depth = run._depth
+    run._entry(name, depth)
+    run._depth += 1
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        run._depth = depth
+        run.add(name, time.perf_counter() - t0, depth)
+
+
+def timed(name: str | None = None):
+    """Decorator timing every call of a function as a stage (default: module.function)."""
+
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if current_run() is None:
+                return fn(*args, **kwargs)
+            with stage(label):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,348 @@
+"""
+Price data providers behind the price store.
+
+A provider is a callable `provider(ticker, start, end, interval="1d")`
+returning a Series of closes for [start, end) (or None when there is no
+data), i.e. a price_store.PriceStore downloader. Three implementations:
+
+- YahooProvider: yfinance, with retries, exponential backoff and explicit
+  errors (ProviderError) instead of silently returning nothing;
+- FileProvider: replays fixtures from a directory (one CSV or Parquet file
+  per ticker and interval); RecordingProvider writes such fixtures from any
+  other provider;
+- SyntheticProvider: deterministic GBM closes, consistent across requests.
+
+The active provider is chosen by configuration (DATA_PROVIDER environment
+variable, see make_provider), so the dashboard, the report job and the
+benchmarks run offline and deterministically on an isolated host.
+"""
+import logging
+import os
+import random
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from intraday import INTERVALS
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderError(RuntimeError):
+    """A provider failed to return data for a ticker (after retries)."""
+
+    def __init__(self, ticker: str, message: str, attempts: int = 1):
+        super().__init__(f"{ticker}: {message} (after {attempts} attempt(s))")
+        self.ticker = ticker
+        self.attempts = attempts
+
+
+class TransientProviderError(ProviderError):
+    """An upstream failure worth retrying (rate limit, timeout, network error)."""
+
+
+# Retried by YahooProvider; anything else (delisted or invalid symbol, bug) fails at once.
+# requests / curl_cffi exceptions derive from OSError, like ConnectionError and TimeoutError.
+TRANSIENT_ERRORS = (TransientProviderError, OSError)
+
+# yfinance messages of per-ticker errors that no retry can fix
+_PERMANENT_MARKERS = ("delisted", "not found", "no timezone", "invalid", "no data found")
+
+
+def _fixture_name(ticker: str, interval: str = "1d") -> str:
+    key = ticker if interval == "1d" else f"{ticker}@{interval}"
+    return "".join(c if c.isalnum() or c in "-_.@" else "_" for c in key)
+
+
+def _slice(prices: pd.Series, start, end) -> pd.Series | None:
+    mask = (prices.index >= pd.Timestamp(start)) & (prices.index < pd.Timestamp(end))
+    prices = prices[mask]
+    return prices if not prices.empty else None
+
+
+# ----------------- Yahoo Finance -----------------
+def _yfinance_errors(yf) -> dict:
+    """
+    {ticker: message} of the last download. yfinance logs per-ticker failures
+    instead of raising them and only keeps them in the private
+    yf.shared._ERRORS (yfinance 0.2.x, pinned to 0.2.66 in requirements.txt):
+    read defensively, so a release without it degrades to "no data".
+    """
+    errors = getattr(getattr(yf, "shared", None), "_ERRORS", None)
+    return errors if isinstance(errors, dict) else {}
+
+
+def yahoo_close_downloader(ticker: str, start, end, interval: str = "1d") -> pd.Series | None:
+    """
+    Download adjusted closes from Yahoo Finance for [start, end).
+    Returns a float Series indexed by date, or None if nothing came back.
+    Raises ProviderError when yfinance reports an error for the ticker:
+    TransientProviderError for rate limits and network failures, a plain
+    ProviderError for delisted or invalid symbols.
+    """
+    import yfinance as yf
+
+    df = yf.download(
+        ticker,
+        start=start,
+        end=end,
+        interval=interval,
+        auto_adjust=True,
+        progress=False,
+    )
+    if df is None or df.empty:
+        errors = _yfinance_errors(yf)
+        if ticker in errors:
+            message = str(errors[ticker])
+            if any(marker in message.lower() for marker in _PERMANENT_MARKERS):
+                raise ProviderError(ticker, message)
+            raise TransientProviderError(ticker, message)
+        return None
+
+    close = df["Close"]
+    # Recent yfinance versions return (field, ticker) MultiIndex columns
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    return close.dropna().astype(float)
+
+
+class YahooProvider:
+    """
+    Live Yahoo Finance provider. Transient failures (TRANSIENT_ERRORS) are
+    retried up to `retries` times with exponential backoff (base * 2**attempt,
+    capped, with jitter); the last error is raised as ProviderError. Other
+    failures, e.g. a delisted symbol, are raised at once. "No data" is not
+    an error. `stats` counts calls, retries and failures for reporting.
+    """
+
+    name = "yahoo"
+
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        download=yahoo_close_downloader,
+        sleep=time.sleep,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.download = download
+        self.sleep = sleep
+        self.stats = {"calls": 0, "retries": 0, "failures": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def __call__(self, ticker: str, start, end, interval: str = "1d") -> pd.Series | None:
+        self._count("calls")
+        for attempt in range(self.retries + 1):
+            try:
+                return self.download(ticker, start, end, interval=interval)
+            except TRANSIENT_ERRORS as e:
+                error = e
+            except ProviderError:
+                # Permanent (delisted or invalid symbol): retrying cannot help
+                self._count("failures")
+                raise
+            except Exception as e:
+                self._count("failures")
+                raise ProviderError(ticker, f"{type(e).__name__}: {e}") from e
+            if attempt == self.retries:
+                break
+            delay = min(self.max_backoff, self.backoff * 2**attempt)
+            delay *= random.uniform(0.5, 1.0)
+            logger.warning(
+                "%s: %s: %s, retrying in %.1fs", ticker, type(error).__name__, error, delay
+            )
+            self._count("retries")
+            self.sleep(delay)
+
+        self._count("failures")
+        if isinstance(error, ProviderError):
+            message = str(error)
+        else:
+            message = f"{type(error).__name__}: {error}"
+        raise ProviderError(ticker, message, attempts=self.retries + 1) from error
+
+
+# ----------------- Fixtures -----------------
+def save_fixture(root: str, ticker: str, prices: pd.Series, interval: str = "1d") -> str:
+    """Write closes as a CSV fixture (Date, Close) readable by FileProvider."""
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, _fixture_name(ticker, interval) + ".csv")
+    prices.rename("Close").rename_axis("Date").to_csv(path)
+    return path
+
+
+class FileProvider:
+    """
+    Replays closes from `root`: TICKER.csv / TICKER.parquet for daily bars,
+    TICKER@1h.csv etc. for intraday bars. CSV files have a date column first
+    and a Close column (or a single value column). Files are read once and
+    kept in memory.
+    """
+
+    name = "file"
+
+    def __init__(self, root: str):
+        self.root = root
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _load(self, ticker: str, interval: str) -> pd.Series | None:
+        key = _fixture_name(ticker, interval)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        prices = None
+        for ext in (".parquet", ".csv"):
+            path = os.path.join(self.root, key + ext)
+            if not os.path.exists(path):
+                continue
+            if ext == ".parquet":
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_csv(path, index_col=0, parse_dates=True)
+            column = "Close" if "Close" in df.columns else df.columns[0]
+            prices = df[column].dropna().astype(float).sort_index()
+            prices.index = pd.DatetimeIndex(prices.index)
+            break
+
+        with self._lock:
+            self._cache[key] = prices
+        return prices
+
+    def __call__(self, ticker: str, start, end, interval: str = "1d") -> pd.Series | None:
+        prices = self._load(ticker, interval)
+        return _slice(prices, start, end) if prices is not None else None
+
+
+class RecordingProvider:
+    """Forward to `inner` and save every non-empty answer as a fixture in `root`."""
+
+    def __init__(self, inner, root: str):
+        self.inner = inner
+        self.root = root
+        self.name = f"record-{getattr(inner, 'name', 'custom')}"
+        self._replay = FileProvider(root)
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker: str, start, end, interval: str = "1d") -> pd.Series | None:
+        prices = self.inner(ticker, start, end, interval=interval)
+        if prices is not None and not prices.empty:
+            with self._lock:
+                recorded = prices
+                previous = self._replay._load(ticker, interval)
+                if previous is not None:
+                    recorded = pd.concat([previous, prices])
+                    recorded = recorded[~recorded.index.duplicated(keep="last")].sort_index()
+                save_fixture(self.root, ticker, recorded, interval)
+                with self._replay._lock:
+                    self._replay._cache.pop(_fixture_name(ticker, interval), None)
+        return prices
+
+
+# ----------------- Synthetic -----------------
+class SyntheticProvider:
+    """
+    Deterministic GBM closes without network. Daily bars (business days) are
+    generated from a fixed epoch with a per-ticker seed, so any [start, end)
+    returns the same price for the same date; intraday bars walk from the
+    previous daily close with a per-(ticker, day) seed, around the clock.
+    """
+
+    name = "synthetic"
+    epoch = pd.Timestamp("2000-01-03")
+
+    def __init__(self, seed: int = 0, mu: float = 0.07, sigma: float = 0.2, s0: float = 100.0):
+        self.seed = seed
+        self.mu = mu
+        self.sigma = sigma
+        self.s0 = s0
+        self._daily = {}
+        self._lock = threading.Lock()
+
+    def _ticker_seed(self, ticker: str) -> int:
+        return zlib.crc32(ticker.encode()) ^ self.seed
+
+    def _daily_path(self, ticker: str, end) -> pd.Series:
+        end = max(pd.Timestamp(end), self.epoch + pd.Timedelta(days=1))
+        with self._lock:
+            path = self._daily.get(ticker)
+        if path is not None and path.index[-1] >= end - pd.Timedelta(days=1):
+            return path
+
+        # Always regenerate from the epoch with the same seed: prefix-stable
+        # Business days (as pd.bdate_range, whose generator is pure Python)
+        days = pd.date_range(self.epoch, end + pd.Timedelta(days=365), freq="D", name="Date")
+        index = days[days.dayofweek < 5]
+        rng = np.random.default_rng(self._ticker_seed(ticker))
+        step = 1.0 / 252
+        shocks = rng.standard_normal(len(index))
+        log_ret = (self.mu - 0.5 * self.sigma**2) * step + self.sigma * np.sqrt(step) * shocks
+        path = pd.Series(self.s0 * np.exp(np.cumsum(log_ret)), index=index)
+        with self._lock:
+            self._daily[ticker] = path
+        return path
+
+    def _intraday(self, ticker: str, start, end, interval: str) -> pd.Series | None:
+        freq = pd.Timedelta(INTERVALS[interval][0])
+        index = pd.date_range(start, end, freq=freq, inclusive="left", name="Date")
+        if len(index) == 0:
+            return None
+        daily = self._daily_path(ticker, end)
+        bars_per_day = int(pd.Timedelta("1D") / freq)
+        sigma_bar = self.sigma / np.sqrt(365 * bars_per_day)
+
+        days = index.normalize()
+        values = np.empty(len(index))
+        for day in days.unique():
+            pos = np.flatnonzero(days == day)
+            # Start from the previous daily close
+            k = daily.index.searchsorted(day) - 1
+            level = daily.iloc[k] if k >= 0 else self.s0
+            # The whole day is drawn from its own seed, so any sub-range matches
+            rng = np.random.default_rng([self._ticker_seed(ticker), day.toordinal()])
+            walk = np.cumsum(sigma_bar * rng.standard_normal(bars_per_day))
+            offsets = ((index[pos] - day) // freq).astype(int)
+            values[pos] = level * np.exp(walk[offsets])
+        return pd.Series(values, index=index)
+
+    def __call__(self, ticker: str, start, end, interval: str = "1d") -> pd.Series | None:
+        if interval != "1d":
+            return self._intraday(ticker, start, end, interval)
+        return _slice(self._daily_path(ticker, end), start, end)
+
+
+# ----------------- Configuration -----------------
+DATA_PROVIDER = os.environ.get("DATA_PROVIDER", "yahoo")
+
+
+def make_provider(spec: str | None = None):
+    """
+    Build a provider from a spec string (default: the DATA_PROVIDER
+    environment variable):
+    - "yahoo": live Yahoo Finance with retries;
+    - "file:<dir>": replay fixtures from <dir>;
+    - "record:<dir>": live Yahoo Finance, saving every answer to <dir>;
+    - "synthetic" or "synthetic:<seed>": deterministic GBM prices.
+    """
+    spec = spec or DATA_PROVIDER
+    kind, _, arg = spec.partition(":")
+    if kind == "yahoo":
+        return YahooProvider()
+    if kind == "file" and arg:
+        return FileProvider(arg)
+    if kind == "record" and arg:
+        return RecordingProvider(YahooProvider(), arg)
+    if kind == "synthetic":
+        return SyntheticProvider(seed=int(arg) if arg else 0)
+    raise ValueError(f"Unknown data provider spec: {spec!r}")
@@ -0,0 +1,172 @@
+"""
+Rolling (windowed) risk analytics on returns panels: volatility, Sharpe,
+historical VaR, beta against a benchmark and pairwise correlations.
+
+Moments come from running sums: every window is the difference of two
+cumulative sums, so each statistic costs O(T) per series whatever the window
+length, and the whole panel is processed column-wise in NumPy. Values are
+NaN until a window holds `window` valid observations. Outputs keep the input
+index (and column labels) so they can be charted directly.
+"""
+import numpy as np
+import pandas as pd
+
+# Bound on the (T x pairs) blocks built for pairwise correlations
+CORR_CHUNK_SIZE = 2_000_000
+
+
+def _as_frame(returns) -> tuple[pd.DataFrame, bool]:
+    if isinstance(returns, pd.Series):
+        return returns.to_frame(), True
+    return returns, False
+
+
+def _restore(values: np.ndarray, frame: pd.DataFrame, was_series: bool):
+    out = pd.DataFrame(values, index=frame.index, columns=frame.columns)
+    return out.iloc[:, 0] if was_series else out
+
+
+def window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sums of x over trailing windows along axis 0 (NaN for the first
+    window - 1 rows), from one cumulative sum.
+    """
+    csum = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=csum[1:])
+    out = np.full(x.shape, np.nan)
+    out[window - 1 :] = csum[window:] - csum[:-window]
+    return out
+
+
+def _window_moments(values: np.ndarray, window: int):
+    """(valid, mean, variance) per window; columns are centered first for accuracy."""
+    if window < 2:
+        raise ValueError("window must be at least 2")
+    missing = np.isnan(values)
+    centered = values - np.nanmean(values, axis=0)
+    x = np.where(missing, 0.0, centered)
+    valid = window_sums((~missing).astype(float), window) == window
+    mean = window_sums(x, window) / window
+    # Sample variance (ddof=1), as pandas / compute_performance_metrics
+    var = (window_sums(x * x, window) - window * mean**2) / (window - 1)
+    var = np.maximum(var, 0.0)
+    mean = mean + np.nanmean(values, axis=0)
+    return valid, mean, var
+
+
+def rolling_volatility(returns, window: int = 63, periods_per_year: float = 252):
+    """Annualized rolling volatility of each series."""
+    frame, was_series = _as_frame(returns)
+    valid, _, var = _window_moments(frame.to_numpy(dtype=float), window)
+    vol = np.where(valid, np.sqrt(var * periods_per_year), np.nan)
+    return _restore(vol, frame, was_series)
+
+
+def rolling_sharpe(returns, window: int = 63, rf: float = 0.0, periods_per_year: float = 252):
+    """Annualized rolling Sharpe ratio (same definition as compute_performance_metrics)."""
+    frame, was_series = _as_frame(returns)
+    valid, mean, var = _window_moments(frame.to_numpy(dtype=float), window)
+    std = np.sqrt(var)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = (mean - rf / periods_per_year) / std * np.sqrt(periods_per_year)
+    sharpe = np.where(valid & (std > 0), sharpe, np.nan)
+    return _restore(sharpe, frame, was_series)
+
+
+def rolling_var(returns, window: int = 252, level: float = 0.05):
+    """
+    Rolling historical VaR: the `level` quantile of each window (linear
+    interpolation, as np.percentile). pandas keeps each window in a sorted
+    skiplist updated bar by bar, i.e. O(log window) per step.
+    """
+    frame, was_series = _as_frame(returns)
+    var = frame.rolling(window, min_periods=window).quantile(level, interpolation="linear")
+    return var.iloc[:, 0] if was_series else var
+
+
+def rolling_beta(returns, benchmark: pd.Series, window: int = 63):
+    """Rolling beta of each series against `benchmark` (aligned on the index)."""
+    frame, was_series = _as_frame(returns)
+    bench = benchmark.reindex(frame.index).to_numpy(dtype=float)[:, None]
+    values = frame.to_numpy(dtype=float)
+
+    missing = np.isnan(values) | np.isnan(bench)
+    x = np.where(missing, 0.0, values - np.nanmean(values, axis=0))
+    b = np.where(missing, 0.0, bench - np.nanmean(bench))
+    valid = window_sums((~missing).astype(float), window) == window
+
+    sum_x, sum_b = window_sums(x, window), window_sums(b, window)
+    cov = window_sums(x * b, window) - sum_x * sum_b / window
+    var_b = window_sums(b * b, window) - sum_b**2 / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = np.where(valid & (var_b > 0), cov / var_b, np.nan)
+    return _restore(beta, frame, was_series)
+
+
+def rolling_correlation(returns: pd.DataFrame, window: int = 63, pairs=None) -> pd.DataFrame:
+    """
+    Rolling correlation for each pair of columns (all pairs by default), one
+    column per pair labelled "A / B". Pairs are processed in chunks so that
+    memory stays bounded for wide panels.
+    """
+    columns = list(returns.columns)
+    if pairs is None:
+        i_idx, j_idx = np.triu_indices(len(columns), k=1)
+    else:
+        pos = {c: k for k, c in enumerate(columns)}
+        i_idx = np.array([pos[a] for a, _ in pairs], dtype=int)
+        j_idx = np.array([pos[b] for _, b in pairs], dtype=int)
+
+    values = returns.to_numpy(dtype=float)
+    missing = np.isnan(values)
+    x = np.where(missing, 0.0, values - np.nanmean(values, axis=0))
+    count = window_sums((~missing).astype(float), window)
+    sums = window_sums(x, window)
+    sq = window_sums(x * x, window) - sums**2 / window
+
+    n_dates = values.shape[0]
+    out = np.full((n_dates, i_idx.size), np.nan)
+    chunk = max(1, CORR_CHUNK_SIZE // max(n_dates, 1))
+    for lo in range(0, i_idx.size, chunk):
+        i, j = i_idx[lo : lo + chunk], j_idx[lo : lo + chunk]
+        cov = window_sums(x[:, i] * x[:, j], window) - sums[:, i] * sums[:, j] / window
+        # Full windows only, for both columns
+        valid = (count[:, i] == window) & (count[:, j] == window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.sqrt(sq[:, i] * sq[:, j])
+        out[:, lo : lo + chunk] = np.where(valid, np.clip(corr, -1.0, 1.0), np.nan)
+
+    labels = [f"{columns[a]} / {columns[b]}" for a, b in zip(i_idx, j_idx)]
+    return pd.DataFrame(out, index=returns.index, columns=labels)
+
+
+def average_correlation(returns: pd.DataFrame, window: int = 63) -> pd.Series:
+    """Mean rolling pairwise correlation across the panel (diversification gauge)."""
+    return rolling_correlation(returns, window).mean(axis=1).rename("avg_correlation")
+
+
+def rolling_risk(
+    returns: pd.DataFrame,
+    window: int = 63,
+    benchmark: pd.Series | None = None,
+    var_window: int | None = None,
+    rf: float = 0.0,
+    periods_per_year: float = 252,
+    portfolio: pd.Series | None = None,
+) -> dict:
+    """
+    All rolling risk series of a returns panel:
+    {"volatility", "sharpe", "var_95", "beta" (None without benchmark),
+    "avg_correlation"}. var_window defaults to `window`. `portfolio` returns
+    are added as a "Portfolio" column, left out of the average correlation.
+    """
+    panel = returns if portfolio is None else returns.assign(Portfolio=portfolio)
+    return {
+        "volatility": rolling_volatility(panel, window, periods_per_year),
+        "sharpe": rolling_sharpe(panel, window, rf, periods_per_year),
+        "var_95": rolling_var(panel, var_window or window, 0.05),
+        "beta": rolling_beta(panel, benchmark, window) if benchmark is not None else None,
+        "avg_correlation": (
+            average_correlation(returns, window) if returns.shape[1] > 1 else None
+        ),
+    }
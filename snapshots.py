@@ -0,0 +1,216 @@
+"""
+Analysis snapshots: a computed analysis (inputs, parameters and results)
+written to one compact file and reloaded without network or recomputation.
+
+A snapshot is a ZIP archive holding meta.json (kind, creation time,
+parameters and the structure of the inputs/results) plus one Parquet file
+per DataFrame / Series / Index and one .npy file per array. Nested dicts,
+scalars and dates are kept in the JSON. Nothing is unpickled on load, so
+snapshots received from elsewhere (uploads) are safe to open.
+
+Snapshots are saved to SNAPSHOT_DIR (environment variable, default
+"snapshots/"): the cron host can precompute them overnight and the
+dashboard lists, serves and compares them.
+"""
+import datetime as dt
+import io
+import json
+import os
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_EXT = ".snap"
+FORMAT_VERSION = 1
+
+
+class _Writer:
+    def __init__(self, zf: zipfile.ZipFile):
+        self.zf = zf
+        self.count = 0
+
+    def _name(self, ext: str) -> str:
+        self.count += 1
+        return f"data/{self.count:04d}{ext}"
+
+    def _frame(self, frame: pd.DataFrame) -> str:
+        name = self._name(".parquet")
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer)
+        self.zf.writestr(name, buffer.getvalue())
+        return name
+
+    def encode(self, obj):
+        """JSON-able description of obj; tables and arrays go to their own files."""
+        if isinstance(obj, pd.DataFrame):
+            # Parquet needs string column names: the real labels go to the JSON
+            frame = obj.copy()
+            labels = list(frame.columns)
+            frame.columns = [str(c) for c in labels]
+            return {
+                "$frame": self._frame(frame),
+                "columns": self.encode(labels),
+                "column_names": self.encode(list(obj.columns.names)),
+            }
+        if isinstance(obj, pd.Series):
+            return {"$series": self._frame(obj.to_frame("value")), "name": self.encode(obj.name)}
+        if isinstance(obj, pd.Index):
+            values = pd.Series(obj, name="value").to_frame()
+            return {"$index": self._frame(values), "name": self.encode(obj.name)}
+        if isinstance(obj, np.ndarray):
+            name = self._name(".npy")
+            buffer = io.BytesIO()
+            np.save(buffer, obj, allow_pickle=False)
+            self.zf.writestr(name, buffer.getvalue())
+            return {"$array": name}
+        if isinstance(obj, dict):
+            return {"$dict": [[self.encode(k), self.encode(v)] for k, v in obj.items()]}
+        if isinstance(obj, tuple):
+            return {"$tuple": [self.encode(v) for v in obj]}
+        if isinstance(obj, list):
+            return [self.encode(v) for v in obj]
+        if isinstance(obj, pd.Timestamp):
+            return {"$timestamp": obj.isoformat()}
+        if isinstance(obj, dt.datetime):
+            return {"$timestamp": obj.isoformat()}
+        if isinstance(obj, dt.date):
+            return {"$date": obj.isoformat()}
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if obj is None or isinstance(obj, (bool, int, float, str)):
+            return obj
+        return str(obj)
+
+
+def _decode(obj, zf: zipfile.ZipFile):
+    if isinstance(obj, list):
+        return [_decode(v, zf) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if "$frame" in obj:
+        frame = pd.read_parquet(io.BytesIO(zf.read(obj["$frame"])))
+        labels = _decode(obj["columns"], zf)
+        names = _decode(obj["column_names"], zf)
+        if len(names) > 1:
+            frame.columns = pd.MultiIndex.from_tuples(labels, names=names)
+        else:
+            frame.columns = pd.Index(labels, name=names[0])
+        return frame
+    if "$series" in obj:
+        series = pd.read_parquet(io.BytesIO(zf.read(obj["$series"])))["value"]
+        return series.rename(_decode(obj["name"], zf))
+    if "$index" in obj:
+        values = pd.read_parquet(io.BytesIO(zf.read(obj["$index"])))["value"]
+        return pd.Index(values, name=_decode(obj["name"], zf))
+    if "$array" in obj:
+        return np.load(io.BytesIO(zf.read(obj["$array"])), allow_pickle=False)
+    if "$dict" in obj:
+        return {_decode(k, zf): _decode(v, zf) for k, v in obj["$dict"]}
+    if "$tuple" in obj:
+        return tuple(_decode(v, zf) for v in obj["$tuple"])
+    if "$timestamp" in obj:
+        return pd.Timestamp(obj["$timestamp"])
+    if "$date" in obj:
+        return dt.date.fromisoformat(obj["$date"])
+    raise ValueError(f"Unknown snapshot entry: {sorted(obj)}")
+
+
+def snapshot_bytes(kind: str, params: dict, inputs: dict, results: dict) -> bytes:
+    """Serialize an analysis to the snapshot format (e.g. for a download button)."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as zf:
+        writer = _Writer(zf)
+        meta = {
+            "format": FORMAT_VERSION,
+            "kind": kind,
+            "created_at": dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "params": writer.encode(params),
+            "inputs": writer.encode(inputs),
+            "results": writer.encode(results),
+        }
+        zf.writestr("meta.json", json.dumps(meta))
+    return buffer.getvalue()
+
+
+def save_snapshot(
+    kind: str,
+    params: dict,
+    inputs: dict,
+    results: dict,
+    root: str = SNAPSHOT_DIR,
+    label: str | None = None,
+) -> str:
+    """Write a snapshot to `root` and return its path."""
+    os.makedirs(root, exist_ok=True)
+    stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%S")
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", label) if label else ""
+    name = f"{kind}_{stamp}" + (f"_{slug}" if slug else "") + SNAPSHOT_EXT
+    path = os.path.join(root, name)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(snapshot_bytes(kind, params, inputs, results))
+    os.replace(tmp, path)
+    return path
+
+
+def load_snapshot(source) -> dict:
+    """
+    Read a snapshot from a path, bytes or file-like object. Returns
+    {"kind", "created_at", "params", "inputs", "results"}.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with zipfile.ZipFile(source) as zf:
+        meta = json.loads(zf.read("meta.json"))
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format: {meta.get('format')!r}")
+        return {
+            "kind": meta["kind"],
+            "created_at": meta["created_at"],
+            "params": _decode(meta["params"], zf),
+            "inputs": _decode(meta["inputs"], zf),
+            "results": _decode(meta["results"], zf),
+        }
+
+
+def _read_meta(path: str) -> dict:
+    with zipfile.ZipFile(path) as zf:
+        meta = json.loads(zf.read("meta.json"))
+        return {**meta, "params": _decode(meta["params"], zf)}
+
+
+def list_snapshots(root: str = SNAPSHOT_DIR, kind: str | None = None) -> pd.DataFrame:
+    """Snapshots in `root` (newest first): path, kind, created_at, params."""
+    rows = []
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            if not name.endswith(SNAPSHOT_EXT):
+                continue
+            path = os.path.join(root, name)
+            try:
+                meta = _read_meta(path)
+            except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+                continue
+            if kind is None or meta["kind"] == kind:
+                rows.append(
+                    {
+                        "path": path,
+                        "kind": meta["kind"],
+                        "created_at": meta["created_at"],
+                        "params": meta["params"],
+                    }
+                )
+    frame = pd.DataFrame(rows, columns=["path", "kind", "created_at", "params"])
+    return frame.sort_values("created_at", ascending=False, ignore_index=True)
+
+
+def compare_snapshots(snapshots: dict, key: str = "metrics") -> pd.DataFrame:
+    """
+    results[key] tables of several loaded snapshots ({label: snapshot})
+    stacked, with the snapshot label as the outer index level.
+    """
+    tables = {label: snap["results"][key] for label, snap in snapshots.items()}
+    return pd.concat(tables, names=["snapshot", None])
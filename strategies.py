@@ -1,35 +1,396 @@
+"""
+Trading strategies on one price/return frame, and vectorized parameter sweeps.
+
+A strategy is a signal function over NumPy arrays,
+`signal_fn(prices, returns, **params) -> {"signal": ..., <indicators>}`: the
+target position decided at each bar's close (0 = cash, 1 = long). backtest()
+does the rest for every strategy: indicator columns, one-bar position lag,
+trades, transaction costs, net returns, and optional stops. The resulting
+metrics come from strategy_metrics().
+
+Path-dependent rules (stop-loss, take-profit, trailing stop) cannot be
+vectorized: they run in a small loop kernel compiled with Numba when it is
+installed (optional dependency), and in plain Python otherwise.
+"""
+import numpy as np
 import pandas as pd
 
+from costs import CostModel, turnover_metrics
+from metrics import compute_performance_metrics
+
+try:
+    from numba import njit
+except ImportError:  # optional: kernels run as plain Python
+    njit = None
+
+
+def _compile(fn):
+    """Numba-compile a kernel when Numba is available."""
+    return njit(cache=True, nogil=True)(fn) if njit is not None else fn
+
+
+def _net_returns(df: pd.DataFrame, costs: CostModel | None) -> pd.DataFrame:
+    """Trades (position diffs), their cost and the net strategy_return."""
+    df["trade"] = df["position"].diff().fillna(df["position"])
+    df["cost"] = costs.trade_costs(df["trade"].to_numpy()) if costs is not None else 0.0
+    df["strategy_return"] = df["position"] * df["return"] - df["cost"]
+    return df
+
+
+# ----------------- Path-dependent kernels -----------------
+def _stop_kernel(signal, prices, stop_loss, take_profit, trailing_stop):
+    """
+    Apply stops to a long signal: a position entered at the close of bar t
+    (price prices[t]) is closed when the price falls `stop_loss` below the
+    entry, rises `take_profit` above it, or falls `trailing_stop` below its
+    highest close since entry (0 disables a rule). After a stop, the signal
+    must go back to 0 before a new entry.
+    """
+    out = np.zeros(signal.size)
+    in_position = False
+    blocked = False
+    entry = 0.0
+    peak = 0.0
+    for t in range(signal.size):
+        if signal[t] <= 0:
+            in_position = False
+            blocked = False
+            continue
+        if blocked:
+            continue
+        price = prices[t]
+        if not in_position:
+            in_position = True
+            entry = price
+            peak = price
+        elif price > peak:
+            peak = price
+        if (
+            (stop_loss > 0 and price <= entry * (1 - stop_loss))
+            or (take_profit > 0 and price >= entry * (1 + take_profit))
+            or (trailing_stop > 0 and price <= peak * (1 - trailing_stop))
+        ):
+            in_position = False
+            blocked = True
+            continue
+        out[t] = signal[t]
+    return out
+
+
+_stop_kernel = _compile(_stop_kernel)
+
+
+def apply_stops(
+    signal: np.ndarray,
+    prices: np.ndarray,
+    stop_loss: float | None = None,
+    take_profit: float | None = None,
+    trailing_stop: float | None = None,
+) -> np.ndarray:
+    """Long signal with stop-loss / take-profit / trailing-stop exits (fractions, e.g. 0.05)."""
+    return _stop_kernel(
+        np.ascontiguousarray(signal, dtype=float),
+        np.ascontiguousarray(prices, dtype=float),
+        float(stop_loss or 0.0),
+        float(take_profit or 0.0),
+        float(trailing_stop or 0.0),
+    )
+
+
+def hold_until(enter: np.ndarray, exit: np.ndarray) -> np.ndarray:
+    """
+    0/1 state that switches on at `enter` bars and off at `exit` bars (exit
+    wins on ties), vectorized: each bar takes the last event at or before it.
+    """
+    enter = np.asarray(enter, dtype=bool)
+    exit = np.asarray(exit, dtype=bool)
+    events = enter | exit
+    last = np.maximum.accumulate(np.where(events, np.arange(events.size), -1))
+    state = np.where(last >= 0, enter[np.maximum(last, 0)] & ~exit[np.maximum(last, 0)], False)
+    return state.astype(np.int64)
+
+
+# ----------------- Signal functions -----------------
+def moving_average_signals(prices, returns, short_window: int = 20, long_window: int = 50) -> dict:
+    """
+    Stratégie simple : long quand MA courte > MA longue, sinon cash.
+    """
+    prices = pd.Series(prices)
+    ma_short = prices.rolling(short_window).mean().to_numpy()
+    ma_long = prices.rolling(long_window).mean().to_numpy()
+    return {
+        "ma_short": ma_short,
+        "ma_long": ma_long,
+        "signal": (ma_short > ma_long).astype(np.int64),
+    }
+
+
+def momentum_signals(prices, returns, lookback: int = 60) -> dict:
+    """
+    Stratégie momentum très simple : long si le rendement sur 'lookback'
+    barres est > 0, cash sinon.
+    """
+    mom = np.full(prices.size, np.nan)
+    mom[lookback:] = prices[lookback:] / prices[:-lookback] - 1
+    return {"mom": mom, "signal": (mom > 0).astype(np.int64)}
+
+
+def breakout_signals(prices, returns, entry_window: int = 55, exit_window: int = 20) -> dict:
+    """
+    Donchian breakout: long when the close exceeds the highest close of the
+    previous `entry_window` bars, held until it falls below the lowest close
+    of the previous `exit_window` bars.
+    """
+    prices = pd.Series(prices)
+    upper = prices.rolling(entry_window).max().shift(1).to_numpy()
+    lower = prices.rolling(exit_window).min().shift(1).to_numpy()
+    values = prices.to_numpy()
+    return {
+        "upper": upper,
+        "lower": lower,
+        "signal": hold_until(values > upper, values < lower),
+    }
+
+
+STRATEGIES = {
+    "ma": moving_average_signals,
+    "momentum": momentum_signals,
+    "breakout": breakout_signals,
+}
+
+
+# ----------------- Backtest -----------------
+def backtest(
+    data: pd.DataFrame,
+    signal_fn,
+    costs: CostModel | None = None,
+    stop_loss: float | None = None,
+    take_profit: float | None = None,
+    trailing_stop: float | None = None,
+    **params,
+) -> pd.DataFrame:
+    """
+    Run `signal_fn(prices, returns, **params)` on a price/return frame.
+    Returns a copy of `data` with the indicator columns, signal, position
+    (signal lagged by one bar), trade, cost and strategy_return (net of
+    `costs` when given). Stops are applied to the signal first.
+    """
+    prices = np.ravel(data["price"].to_numpy(dtype=float))
+    returns = np.ravel(data["return"].to_numpy(dtype=float))
+    columns = signal_fn(prices, returns, **params)
+
+    signal = columns["signal"]
+    if stop_loss or take_profit or trailing_stop:
+        signal = apply_stops(signal, prices, stop_loss, take_profit, trailing_stop)
+
+    df = data.copy()
+    for name, values in columns.items():
+        if name != "signal":
+            df[name] = values
+    df["signal"] = signal
+    position = np.zeros(signal.size)
+    position[1:] = signal[:-1]
+    df["position"] = position
+    return _net_returns(df, costs)
+
+
+def strategy_metrics(result: pd.DataFrame, rf: float = 0.0, periods_per_year: float = 252) -> dict:
+    """Performance metrics and trading activity of a backtest() result."""
+    return {
+        **compute_performance_metrics(result["strategy_return"], rf, periods_per_year),
+        **turnover_metrics(result["trade"], result["cost"], periods_per_year),
+    }
+
 
 def moving_average_strategy(
-    data: pd.DataFrame, short_window: int = 20, long_window: int = 50
+    data: pd.DataFrame,
+    short_window: int = 20,
+    long_window: int = 50,
+    costs: CostModel | None = None,
 ) -> pd.DataFrame:
     """
     Stratégie simple : long quand MA courte > MA longue, sinon cash.
-    Renvoie un DataFrame avec colonnes de MAs, position et strategy_return.
+    Renvoie un DataFrame avec colonnes de MAs, position, trade, cost et
+    strategy_return (nette des coûts de transaction si `costs` est fourni).
     """
-    df = data.copy()
-    df["ma_short"] = df["price"].rolling(short_window).mean()
-    df["ma_long"] = df["price"].rolling(long_window).mean()
-    df["signal"] = 0
-    df.loc[df["ma_short"] > df["ma_long"], "signal"] = 1
-    df["position"] = df["signal"].shift(1).fillna(0)
-    df["strategy_return"] = df["position"] * df["return"]
-    return df
+    return backtest(
+        data, moving_average_signals, costs, short_window=short_window, long_window=long_window
+    )
 
 
 def momentum_strategy(
-    data: pd.DataFrame, lookback: int = 60
+    data: pd.DataFrame, lookback: int = 60, costs: CostModel | None = None
 ) -> pd.DataFrame:
     """
     Stratégie momentum très simple :
     - calcule le rendement sur 'lookback' jours
-    - long si ce rendement est > 0, cash sinon.
+    - long si ce rendement est > 0, cash sinon
+    - strategy_return nette des coûts de transaction si `costs` est fourni.
     """
-    df = data.copy()
-    df["mom"] = df["price"].pct_change(lookback)
-    df["signal"] = 0
-    df.loc[df["mom"] > 0, "signal"] = 1
-    df["position"] = df["signal"].shift(1).fillna(0)
-    df["strategy_return"] = df["position"] * df["return"]
-    return df
+    return backtest(data, momentum_signals, costs, lookback=lookback)
+
+
+# ----------------- Parameter sweeps -----------------
+SWEEP_CHUNK_SIZE = 2_000_000  # max cells (dates x combinations) held at once
+
+
+def rolling_mean_matrix(prices: np.ndarray, windows) -> np.ndarray:
+    """
+    Rolling means of `prices` for every window at once, from one shared
+    cumulative sum. Returns a (len(windows), T) array, NaN before each
+    window is full.
+    """
+    prices = np.asarray(prices, dtype=float)
+    windows = np.asarray(windows, dtype=np.int64)[:, None]
+    csum = np.concatenate([[0.0], np.cumsum(prices)])
+
+    end = np.arange(1, prices.size + 1)[None, :]
+    start = end - windows
+    valid = start >= 0
+    means = (csum[end] - csum[np.where(valid, start, 0)]) / windows
+    means[~valid] = np.nan
+    return means
+
+
+def _sweep_metrics(
+    signals: np.ndarray,
+    returns: np.ndarray,
+    rf: float = 0.0,
+    periods_per_year: float = 252,
+    trade_cost: float = 0.0,
+) -> dict:
+    """
+    Metrics of the strategies defined by a (K, T) 0/1 signal array, one
+    combination per row. Positions are the signals lagged by one bar, as in
+    the single-run functions. Every trade has size 1 and costs `trade_cost`.
+    """
+    positions = np.zeros(signals.shape)
+    positions[:, 1:] = signals[:, :-1]
+    n = returns.size
+    trades = np.zeros(signals.shape, dtype=bool)
+    trades[:, 2:] = signals[:, 1:-1] != signals[:, :-2]
+    trades[:, 1] = signals[:, 0]
+    n_trades = trades.sum(axis=1)
+
+    # Positions are 0/1, so the first two moments are plain matrix products.
+    # Net return: p*r - c*trade, whose square is p*r^2 - 2c*(entry*r) + c^2*trade
+    mean = (positions @ returns - trade_cost * n_trades) / n
+    sq_mean = positions @ returns**2 / n
+    if trade_cost:
+        entry_returns = (trades & (positions > 0)) @ returns
+        sq_mean += (trade_cost**2 * n_trades - 2 * trade_cost * entry_returns) / n
+    std = np.sqrt(np.maximum(sq_mean - mean**2, 0.0) * n / max(n - 1, 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(
+            std > 0, (mean - rf / periods_per_year) / std * np.sqrt(periods_per_year), np.nan
+        )
+
+    positions *= returns
+    positions += 1.0
+    if trade_cost:
+        positions -= trade_cost * trades
+    equity = np.cumprod(positions, axis=1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1.0
+
+    years = n / periods_per_year
+    return {
+        "cum_return": equity[:, -1] - 1.0,
+        "ann_vol": std * np.sqrt(periods_per_year),
+        "sharpe": sharpe,
+        "max_dd": drawdown.min(axis=1),
+        "n_trades": n_trades,
+        "turnover": n_trades / years,
+        "cost_drag": trade_cost * n_trades / years,
+    }
+
+
+def _run_sweep(
+    signal_fn,
+    n_combos: int,
+    n_dates: int,
+    returns: np.ndarray,
+    rf: float,
+    periods_per_year: float,
+    costs: CostModel | None = None,
+) -> dict:
+    """Evaluate combinations in row chunks so memory stays bounded."""
+    trade_cost = float(costs.trade_costs(1.0)) if costs is not None else 0.0
+    chunk = max(1, SWEEP_CHUNK_SIZE // max(n_dates, 1))
+    parts = []
+    for lo in range(0, n_combos, chunk):
+        hi = min(n_combos, lo + chunk)
+        parts.append(
+            _sweep_metrics(signal_fn(lo, hi), returns, rf, periods_per_year, trade_cost)
+        )
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+
+def moving_average_sweep(
+    data: pd.DataFrame,
+    short_windows,
+    long_windows,
+    rf: float = 0.0,
+    periods_per_year: float = 252,
+    costs: CostModel | None = None,
+) -> pd.DataFrame:
+    """
+    Evaluate every (short, long) MA crossover with short < long in one pass.
+    Returns one row per combination with columns short_window, long_window,
+    cum_return, ann_vol, sharpe, max_dd, n_trades, turnover, cost_drag
+    (net of `costs` when given).
+    """
+    prices = np.ravel(data["price"].to_numpy(dtype=float))
+    returns = np.ravel(data["return"].to_numpy(dtype=float))
+
+    windows = np.unique(np.concatenate([np.ravel(short_windows), np.ravel(long_windows)]))
+    means = rolling_mean_matrix(prices, windows)
+
+    short_grid, long_grid = np.meshgrid(
+        np.unique(short_windows), np.unique(long_windows), indexing="ij"
+    )
+    keep = short_grid < long_grid
+    short_w, long_w = short_grid[keep], long_grid[keep]
+    if short_w.size == 0:
+        raise ValueError("No (short, long) combination with short < long.")
+
+    short_idx = np.searchsorted(windows, short_w)
+    long_idx = np.searchsorted(windows, long_w)
+
+    def signals(lo, hi):
+        # NaN comparisons are False: no position until both MAs exist
+        return means[short_idx[lo:hi]] > means[long_idx[lo:hi]]
+
+    result = _run_sweep(signals, short_w.size, prices.size, returns, rf, periods_per_year, costs)
+    return pd.DataFrame({"short_window": short_w, "long_window": long_w, **result})
+
+
+def momentum_sweep(
+    data: pd.DataFrame,
+    lookbacks,
+    rf: float = 0.0,
+    periods_per_year: float = 252,
+    costs: CostModel | None = None,
+) -> pd.DataFrame:
+    """
+    Evaluate momentum_strategy for every lookback in one pass.
+    Returns one row per lookback with columns lookback, cum_return, ann_vol,
+    sharpe, max_dd, n_trades, turnover, cost_drag (net of `costs` when given).
+    """
+    prices = np.ravel(data["price"].to_numpy(dtype=float))
+    returns = np.ravel(data["return"].to_numpy(dtype=float))
+    lookbacks = np.unique(np.ravel(lookbacks)).astype(np.int64)
+
+    t = np.arange(prices.size)[None, :]
+
+    def signals(lo, hi):
+        past = t - lookbacks[lo:hi, None]
+        # p[t] / p[t - lookback] - 1 > 0  <=>  p[t] > p[t - lookback]
+        return (past >= 0) & (prices[None, :] > prices[np.maximum(past, 0)])
+
+    result = _run_sweep(signals, lookbacks.size, prices.size, returns, rf, periods_per_year, costs)
+    return pd.DataFrame({"lookback": lookbacks, **result})
+
+
+def sweep_surface(sweep: pd.DataFrame, metric: str = "sharpe") -> pd.DataFrame:
+    """Pivot a moving_average_sweep result into a short x long grid of `metric`."""
+    return sweep.pivot(index="short_window", columns="long_window", values=metric)
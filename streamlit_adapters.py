@@ -0,0 +1,22 @@
+"""Thin glue between the Streamlit app and the Streamlit-free analytics core."""
+import streamlit as st
+
+from profiling import Timings
+
+
+def render_timings(timings: Timings):
+    """Collapsible per-run timing breakdown in the sidebar."""
+    with st.sidebar.expander(f"Timings – {timings.total * 1000:,.0f} ms", expanded=False):
+        frame = timings.to_frame()
+        if frame.empty:
+            st.caption("No stage was timed in this run.")
+            return
+        # Indent nested stages under their parent
+        frame.index = ["\u2003" * depth + name for name, depth in frame["depth"].items()]
+        frame["ms"] = frame["seconds"] * 1000
+        st.dataframe(
+            frame[["calls", "ms", "share"]].style.format(
+                {"calls": "{:.0f}", "ms": "{:,.1f}", "share": "{:.0%}"}
+            ),
+            use_container_width=True,
+        )
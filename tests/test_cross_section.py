@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import gbm_prices
+from cross_section import cross_sectional_momentum
+from portfolio_sim import calendar_rebalance_mask
+
+
+def universe_prices() -> pd.DataFrame:
+    prices = gbm_prices(400, 12, seed=3)
+    prices.iloc[:150, 2] = np.nan  # listed later
+    prices.iloc[300:, 5] = np.nan  # delisted: keeps its last price
+    return prices
+
+
+def naive_targets(prices, lookback, skip, top_k, long_short) -> pd.DataFrame:
+    """Rank the universe date by date with plain pandas sorting."""
+    filled = prices.ffill()
+    rows = np.flatnonzero(calendar_rebalance_mask(prices.index, "Monthly"))
+    targets = pd.DataFrame(0.0, index=prices.index[rows], columns=prices.columns)
+    for date, t in zip(targets.index, rows):
+        if t - 1 - lookback < 0:
+            continue
+        scores = (filled.iloc[t - 1 - skip] / filled.iloc[t - 1 - lookback] - 1.0).dropna()
+        ranked = sorted(scores.index, key=lambda c: -scores[c])  # stable: column order on ties
+        k = min(top_k, len(ranked) // 2 if long_short else len(ranked))
+        if k == 0:
+            continue
+        targets.loc[date, ranked[:k]] = 1.0 / k
+        if long_short:
+            targets.loc[date, ranked[len(ranked) - k :]] = -1.0 / k
+    return targets
+
+
+@pytest.mark.parametrize("long_short", [False, True])
+def test_ranking_matches_a_date_by_date_sort(long_short):
+    prices = universe_prices()
+    result = cross_sectional_momentum(prices, lookback=60, skip=5, top_k=3, long_short=long_short)
+    expected = naive_targets(prices, 60, 5, 3, long_short)
+
+    pd.testing.assert_frame_equal(result["weights"], expected, check_freq=False)
+    assert (result["weights"].abs().sum(axis=1) > 0).sum() >= 10
+
+    # Portfolio returns: holdings grown day by day from the forward-filled prices
+    returns = prices.ffill().pct_change().fillna(0.0).to_numpy()
+    held, cash, expected_returns = np.zeros(prices.shape[1]), 1.0, []
+    for t, r in enumerate(returns):
+        if prices.index[t] in expected.index:
+            held = expected.loc[prices.index[t]].to_numpy()
+            cash = 1.0 - held.sum()
+        value = cash + (held * (1.0 + r)).sum()
+        expected_returns.append(value - 1.0)
+        held, cash = held * (1.0 + r) / value, cash / value
+    np.testing.assert_allclose(result["returns"], expected_returns, atol=1e-12)
@@ -0,0 +1,130 @@
+import datetime as dt
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import data
+from benchmarks.synthetic import StubUpstream, gbm_downloader
+from data import LIVE_TTL, _request
+from cache import MemoryCacheBackend, NoCacheBackend
+from fetch_service import FetchService
+from price_store import PriceStore
+
+
+@pytest.fixture
+def service():
+    service = FetchService(max_concurrency=2)
+    yield service
+    service.close()
+
+
+def get_concurrently(service, fn, keys):
+    """service.get(key, fn, key) from one thread per key; results in order."""
+    results = [None] * len(keys)
+
+    def worker(i, key):
+        results[i] = service.get(key, fn, key, "2020-01-01", "2021-01-01")
+
+    threads = [threading.Thread(target=worker, args=(i, k)) for i, k in enumerate(keys)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_identical_requests_share_one_fetch(service):
+    upstream = StubUpstream(latency=0.05)
+    keys = [f"T{i % 4}" for i in range(40)]
+
+    results = get_concurrently(service, upstream, keys)
+
+    assert upstream.calls == 4
+    assert upstream.peak <= service.max_concurrency
+    for key, result in zip(keys, results):
+        assert result is results[keys.index(key)]
+    assert service.stats()["fetches"] == 4
+
+    # Later requests are cache hits
+    get_concurrently(service, upstream, keys)
+    assert upstream.calls == 4
+
+
+def test_errors_reach_every_waiter_and_are_not_cached(service):
+    calls = []
+
+    def failing(*args):
+        calls.append(args)
+        time.sleep(0.05)
+        raise ConnectionError("upstream down")
+
+    outcomes = service.get_many([("K", failing, ("K",), None)] * 5)
+    assert len(calls) == 1
+    assert all(isinstance(o, ConnectionError) for o in outcomes)
+
+    with pytest.raises(ConnectionError):
+        service.get("K", failing, "K")
+    assert len(calls) == 2
+
+
+def test_only_live_ranges_expire():
+    today = dt.date.today()
+    assert _request("AAA", "2020-01-01", "2021-01-01")[3] is None
+    assert _request("AAA", "2020-01-01", today)[3] == LIVE_TTL
+    assert _request("AAA", today - dt.timedelta(days=5), today, "1h")[3] == LIVE_TTL
+
+    cache = MemoryCacheBackend(max_bytes=1e6)
+    cache.put("past", 1)
+    cache.put("live", 2, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("past") == 1
+    assert cache.get("live") is None
+
+
+def test_lru_evicts_least_recently_used():
+    frame = pd.DataFrame({"price": range(1000)}, dtype=float)
+    size = int(frame.memory_usage(deep=True).sum())
+    cache = MemoryCacheBackend(max_bytes=2.5 * size)
+    cache.put("a", frame)
+    cache.put("b", frame.copy())
+    cache.get("a")
+    cache.put("c", frame.copy())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.evictions == 1
+
+
+def test_no_data_answers_are_not_cached(tmp_path, monkeypatch):
+    answers = [None]
+
+    def flaky(ticker, start, end):
+        return answers.pop() if answers else gbm_downloader()(ticker, start, end)
+
+    monkeypatch.setattr(data, "_store", PriceStore(str(tmp_path), downloader=flaky))
+    service = FetchService()
+    monkeypatch.setattr(data, "_service", service)
+    try:
+        assert data.load_yahoo_data("AAA", "2020-01-01", "2020-03-01") is None
+        # The empty answer was not kept: the next call reaches the store again
+        df = data.load_yahoo_data("AAA", "2020-01-01", "2020-03-01")
+        assert df is not None and len(df) > 0
+
+        panel, failures = data.load_yahoo_panel(("AAA", "BBB"), "2020-01-01", "2020-03-01")
+        assert failures == {} and list(panel["price"].columns) == ["AAA", "BBB"]
+    finally:
+        service.close()
+
+
+def test_no_cache_backend_refetches_every_time():
+    upstream = StubUpstream(latency=0.0)
+    service = FetchService(cache=NoCacheBackend())
+    try:
+        for _ in range(3):
+            service.get("T0", upstream, "T0", "2020-01-01", "2021-01-01")
+    finally:
+        service.close()
+    assert upstream.calls == 3
+    assert service.stats()["entries"] == 0
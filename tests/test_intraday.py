@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+from intraday import (
+    LiveSeries,
+    RingBuffer,
+    infer_bars_per_year,
+    max_bars,
+    resample_frame,
+    resample_prices,
+)
+
+
+def hourly_session_bars(days: int = 3) -> pd.Series:
+    """Hourly closes 09:00-17:00 on consecutive business days."""
+    index = pd.DatetimeIndex(
+        [
+            day + pd.Timedelta(hours=h)
+            for day in pd.bdate_range("2024-01-02", periods=days)
+            for h in range(9, 18)
+        ]
+    )
+    return pd.Series(np.arange(len(index), dtype=float) + 100.0, index=index)
+
+
+def test_resample_takes_the_last_bar_of_each_bucket():
+    prices = hourly_session_bars()
+
+    four_hours = resample_prices(prices, "4h")
+    # [08:00, 12:00) ends at 11:00, [12:00, 16:00) at 15:00, [16:00, 20:00) at 17:00
+    first_day = four_hours.loc["2024-01-02"]
+    assert list(first_day.index.hour) == [8, 12, 16]
+    assert list(first_day) == [
+        prices[pd.Timestamp("2024-01-02 11:00")],
+        prices[pd.Timestamp("2024-01-02 15:00")],
+        prices[pd.Timestamp("2024-01-02 17:00")],
+    ]
+    # Overnight buckets without bars are dropped
+    assert len(four_hours) == 9
+
+    daily = resample_prices(prices, "1D")
+    assert list(daily) == list(prices.groupby(prices.index.normalize()).last())
+
+
+def test_resampled_returns_compound_the_bar_returns():
+    prices = hourly_session_bars()
+    data = prices.rename("price").to_frame()
+    data["return"] = data["price"].pct_change()
+
+    daily = resample_frame(data, "1D")
+    compounded = (1 + data["return"].fillna(0)).groupby(data.index.normalize()).prod() - 1
+    np.testing.assert_allclose(daily["return"], compounded.iloc[1:])
+    assert infer_bars_per_year(daily.index) == 252
+
+
+def test_ring_buffer_keeps_the_last_values_in_place():
+    buffer = RingBuffer(5)
+    storage = buffer._values
+    index = pd.date_range("2024-01-01", periods=12, freq="min")
+    for t, v in zip(index, range(12)):
+        buffer.append(t, float(v))
+
+    assert len(buffer) == 5
+    series = buffer.to_series()
+    assert list(series) == [7.0, 8.0, 9.0, 10.0, 11.0]
+    assert list(series.index) == list(index[-5:])
+    assert buffer._values is storage
+
+
+def test_live_series_holds_a_full_week_of_minute_bars():
+    week = pd.date_range("2024-01-01", periods=7 * 24 * 60, freq="min")
+    prices = pd.Series(np.linspace(100.0, 110.0, len(week)), index=week)
+    live = LiveSeries.for_interval("1m")
+    assert live.buffer.capacity == max_bars("1m") >= len(week)
+
+    live.update(prices)
+    assert live.dropped == 0
+    assert live.frame().index[0] == week[1]
+
+    small = LiveSeries(capacity=100)
+    small.update(prices.iloc[:150])
+    small.update(prices.iloc[:160])
+    assert small.dropped == 60
+    assert len(small.frame()) == 99
+
+
+def test_live_series_resets_when_the_range_moves():
+    index = pd.date_range("2024-01-01", periods=300, freq="min")
+    prices = pd.Series(np.arange(300, dtype=float) + 100.0, index=index)
+    live = LiveSeries(capacity=1000)
+
+    live.update(prices.iloc[:200])
+    live.update(prices.iloc[:210])  # refresh: only the new bars are appended
+    assert len(live.buffer) == 210
+
+    live.update(prices.iloc[50:220])  # start moved forward: trimmed
+    assert live.buffer.first_time == index[50]
+    assert len(live.buffer) == 170
+    assert list(live.buffer.to_series()) == list(prices.iloc[50:220])
+
+    live.update(prices.iloc[0:220])  # start moved back
+    assert live.buffer.first_time == index[0]
+
+    live.update(prices.iloc[0:100])  # end moved back
+    assert live.buffer.last_time == index[99]
+    assert len(live.buffer) == 100
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from metrics import (
+    StreamingMetrics,
+    cached_streaming_metrics,
+    compute_metrics_matrix,
+    compute_performance_metrics,
+)
+
+
+def daily_returns(n: int = 500, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2022-01-03", periods=n)
+    return pd.Series(rng.normal(0.0004, 0.012, n), index=index)
+
+
+def assert_same_metrics(actual: dict, expected: dict):
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-9, err_msg=name)
+
+
+def test_streaming_metrics_match_the_batch_version():
+    returns = daily_returns()
+    returns.iloc[[10, 200]] = np.nan
+
+    acc = StreamingMetrics(rf=0.02)
+    for end in (50, 51, 300, len(returns)):
+        acc.sync(returns.iloc[:end])
+        assert_same_metrics(acc.results(), compute_performance_metrics(returns.iloc[:end], rf=0.02))
+
+
+def test_cached_accumulator_follows_the_date_range():
+    returns = daily_returns()
+    cache = {}
+
+    cached_streaming_metrics(cache, "bh", returns.iloc[:300])
+    acc = cache["bh"]
+    # End extended: same accumulator, only the new bars absorbed
+    result = cached_streaming_metrics(cache, "bh", returns.iloc[:400])
+    assert cache["bh"] is acc and acc.n == 400
+    assert_same_metrics(result, compute_performance_metrics(returns.iloc[:400]))
+
+    # Start moved forward, then end moved back: rebuilt from the new range
+    for window in (returns.iloc[100:400], returns.iloc[100:250]):
+        result = cached_streaming_metrics(cache, "bh", window)
+        assert acc.n == len(window)
+        assert_same_metrics(result, compute_performance_metrics(window))
+
+
+def test_metrics_matrix_matches_the_series_version_per_column():
+    rng = np.random.default_rng(1)
+    index = pd.bdate_range("2022-01-03", periods=300)
+    returns = pd.DataFrame(rng.normal(0.0003, 0.015, (300, 4)), index=index, columns=list("ABCD"))
+    returns.iloc[:40, 1] = np.nan  # late listing
+    returns.iloc[[5, 90], 2] = np.nan
+    periods = pd.Series({"D": 365.0, "A": 252.0, "B": 252.0, "C": 252.0})
+
+    matrix = compute_metrics_matrix(returns, rf=0.02, periods_per_year=periods)
+    for name in returns:
+        expected = compute_performance_metrics(
+            returns[name], rf=0.02, periods_per_year=periods[name]
+        )
+        assert_same_metrics(matrix.loc[name].to_dict(), expected)
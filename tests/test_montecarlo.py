@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from montecarlo import historical_var, monte_carlo_var, simulate_portfolio_returns
+from optimizer import ledoit_wolf_cov
+
+WEIGHTS = np.array([0.5, 0.3, 0.2])
+
+
+def asset_returns(n: int = 500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cov = np.array([[1.0, 0.6, 0.2], [0.6, 1.0, 0.3], [0.2, 0.3, 1.0]]) * 0.015**2
+    values = rng.multivariate_normal([0.0005, 0.0003, 0.0001], cov, size=n)
+    return pd.DataFrame(values, index=pd.bdate_range("2022-01-03", periods=n), columns=list("ABC"))
+
+
+def test_historical_var_matches_a_loop_over_windows():
+    returns = asset_returns()
+    horizon = 10
+
+    window_returns = np.array(
+        [
+            (1 + returns.iloc[t : t + horizon]).prod().to_numpy() @ WEIGHTS - 1.0
+            for t in range(len(returns) - horizon + 1)
+        ]
+    )
+    var = np.quantile(window_returns, 0.05)
+    cvar = window_returns[window_returns <= var].mean()
+
+    result = historical_var(returns, WEIGHTS, horizon=horizon, level=0.05)
+    np.testing.assert_allclose([result["var"], result["cvar"]], [var, cvar], rtol=1e-10)
+
+
+def test_bootstrap_paths_match_a_path_by_path_loop():
+    returns = asset_returns()
+    history = returns.to_numpy()
+    n_paths, horizon = 2_000, 5
+
+    simulated = simulate_portfolio_returns(
+        returns, WEIGHTS, horizon, n_paths, method="Bootstrap", seed=7, chunk_size=n_paths
+    )
+
+    # Same draws as the single chunk: one day index per path, day after day
+    rng = np.random.default_rng(np.random.SeedSequence(7).spawn(1)[0])
+    days = np.array([rng.integers(0, len(history), size=n_paths) for _ in range(horizon)])
+    expected = [np.prod(1 + history[days[:, p]], axis=0) @ WEIGHTS - 1.0 for p in range(n_paths)]
+    np.testing.assert_allclose(simulated, expected, rtol=1e-5, atol=1e-6)
+
+    # Chunking and threads do not change the result for a given seed
+    chunked = simulate_portfolio_returns(
+        returns, WEIGHTS, horizon, n_paths, "Bootstrap", seed=7, chunk_size=300, workers=4
+    )
+    np.testing.assert_array_equal(
+        chunked,
+        simulate_portfolio_returns(
+            returns, WEIGHTS, horizon, n_paths, "Bootstrap", seed=7, chunk_size=300
+        ),
+    )
+
+
+def test_gaussian_var_matches_direct_multivariate_draws():
+    returns = asset_returns()
+    horizon = 10
+    log_returns = np.log1p(returns.to_numpy())
+    cov, _ = ledoit_wolf_cov(log_returns, periods_per_year=1)
+
+    rng = np.random.default_rng(1)
+    draws = rng.multivariate_normal(
+        horizon * log_returns.mean(axis=0), horizon * cov, size=400_000
+    )
+    naive = np.exp(draws) @ WEIGHTS - 1.0
+    naive_var = np.quantile(naive, 0.05)
+
+    result = monte_carlo_var(returns, WEIGHTS, horizon, n_paths=400_000, seed=2)
+    # Two independent samples of the same distribution
+    np.testing.assert_allclose(result["var"], naive_var, rtol=0.02)
+    np.testing.assert_allclose(result["cvar"], naive[naive <= naive_var].mean(), rtol=0.02)
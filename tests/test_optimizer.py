@@ -0,0 +1,101 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from optimizer import (
+    ledoit_wolf_cov,
+    max_sharpe_weights,
+    min_variance_weights,
+    project_budget_box,
+    risk_contributions,
+    risk_parity_weights,
+)
+
+COV = np.array(
+    [
+        [0.040, 0.012, 0.006],
+        [0.012, 0.090, 0.015],
+        [0.006, 0.015, 0.160],
+    ]
+)
+
+
+def grid_portfolios(n: int = 3, upper: float = 1.0, step: float = 0.005) -> np.ndarray:
+    """Every long-only portfolio of a grid on the simplex, capped at `upper`."""
+    ticks = np.arange(0.0, upper + step / 2, step)
+    rows = [(*w, 1.0 - sum(w)) for w in itertools.product(ticks, repeat=n - 1)]
+    w = np.array(rows)
+    return w[(w[:, -1] >= -1e-9) & (w[:, -1] <= upper + 1e-9)]
+
+
+def grid_sharpe(w: np.ndarray, cov: np.ndarray, excess: np.ndarray) -> np.ndarray:
+    return (w @ excess) / np.sqrt(np.einsum("ij,jk,ik->i", w, cov, w))
+
+
+def sharpe(w, cov, excess) -> float:
+    return float(w @ excess / np.sqrt(w @ cov @ w))
+
+
+def test_max_sharpe_matches_brute_force_grid():
+    mu = np.array([0.06, 0.10, 0.03])
+    w = max_sharpe_weights(COV, mu, rf=0.01, long_only=True, max_weight=0.6)
+
+    assert w.sum() == pytest.approx(1.0)
+    assert (w >= -1e-12).all() and (w <= 0.6 + 1e-12).all()
+    grid = grid_portfolios(upper=0.6)
+    best = grid_sharpe(grid, COV, mu - 0.01).max()
+    assert sharpe(w, COV, mu - 0.01) >= best - 1e-6
+
+
+def test_max_sharpe_rejects_bounds_without_positive_excess_return():
+    # Only one asset beats the risk-free rate and the cap forces the others in
+    mu = np.array([0.05, -0.20, -0.30])
+    assert (grid_portfolios(upper=0.4) @ mu).max() < 0
+
+    with pytest.raises(ValueError):
+        max_sharpe_weights(COV, mu, long_only=True, max_weight=0.4)
+
+
+def test_min_variance_matches_brute_force_grid():
+    w = min_variance_weights(COV, long_only=True, max_weight=0.5)
+    grid = grid_portfolios(upper=0.5)
+    best = np.einsum("ij,jk,ik->i", grid, COV, grid).min()
+    assert w @ COV @ w <= best + 1e-9
+    assert w.sum() == pytest.approx(1.0)
+
+
+def test_risk_parity_equalizes_contributions():
+    w = risk_parity_weights(COV)
+    np.testing.assert_allclose(risk_contributions(w, COV), np.full(3, 1 / 3), atol=1e-9)
+
+
+def test_budget_box_projection_matches_bisection():
+    rng = np.random.default_rng(0)
+    v = rng.normal(size=50)
+    lower, upper = -0.05, 0.1
+
+    lo, hi = v.min() - upper, v.max() - lower
+    for _ in range(200):
+        tau = 0.5 * (lo + hi)
+        lo, hi = (tau, hi) if np.clip(v - tau, lower, upper).sum() > 1 else (lo, tau)
+    np.testing.assert_allclose(
+        project_budget_box(v, lower, upper), np.clip(v - tau, lower, upper), atol=1e-9
+    )
+
+
+def test_ledoit_wolf_matches_reference_formula():
+    rng = np.random.default_rng(1)
+    x = rng.normal(scale=0.01, size=(60, 8))
+    cov, shrinkage = ledoit_wolf_cov(x, periods_per_year=1)
+
+    # Ledoit & Wolf (2004), element by element
+    t, n = x.shape
+    xc = x - x.mean(axis=0)
+    sample = xc.T @ xc / t
+    mu = np.trace(sample) / n
+    d2 = np.sum((sample - mu * np.eye(n)) ** 2)
+    b2 = sum(np.sum((np.outer(row, row) - sample) ** 2) for row in xc) / t**2
+    delta = min(b2, d2) / d2
+    assert shrinkage == pytest.approx(delta)
+    np.testing.assert_allclose(cov, delta * mu * np.eye(n) + (1 - delta) * sample)
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from costs import CostModel
+from portfolio_sim import calendar_rebalance_mask, simulate_portfolio, simulate_targets
+
+FEE = 0.001  # CostModel(fee_bps=10)
+
+
+def asset_returns(n: int = 400, n_assets: int = 4, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2021-01-04", periods=n)
+    values = rng.normal(0.0003, 0.02, (n, n_assets))
+    return pd.DataFrame(values, index=index, columns=[f"A{i}" for i in range(n_assets)])
+
+
+def naive_rebalance(returns: pd.DataFrame, w: np.ndarray, mask: np.ndarray, threshold=None):
+    """Day-by-day loop: reset to target on rebalance days, then let weights drift."""
+    held = np.zeros_like(w)
+    out, trades, pending = [], [], False
+    for t, r in enumerate(returns.to_numpy()):
+        trade = np.zeros_like(w)
+        if mask[t] or pending:
+            trade, held = w - held, w.copy()
+        growth = held * (1.0 + r)
+        ret = (1.0 - FEE * np.abs(trade).sum()) * growth.sum() - 1.0
+        held = growth / growth.sum()
+        pending = threshold is not None and np.abs(held - w).max() > threshold
+        out.append(ret)
+        trades.append(trade)
+    return np.array(out), np.array(trades)
+
+
+@pytest.mark.parametrize(
+    "rebalance, threshold", [("Monthly", None), ("Never", None), ("Quarterly", 0.03)]
+)
+def test_rebalancing_matches_the_daily_loop(rebalance, threshold):
+    returns = asset_returns()
+    w = np.array([0.4, 0.3, 0.2, 0.1])
+
+    result = simulate_portfolio(
+        returns, w, rebalance=rebalance, threshold=threshold, costs=CostModel(fee_bps=10)
+    )
+    mask = calendar_rebalance_mask(returns.index, rebalance)
+    expected_returns, expected_trades = naive_rebalance(returns, w, mask, threshold)
+
+    np.testing.assert_allclose(result["returns"], expected_returns, atol=1e-12)
+    np.testing.assert_allclose(result["trades"], expected_trades, atol=1e-12)
+    if threshold is not None:
+        # Drift-triggered rebalances on top of the calendar ones
+        assert len(result["rebalance_dates"]) > mask.sum()
+
+
+def test_changing_targets_match_the_daily_loop():
+    returns = asset_returns(n=200, n_assets=6, seed=1)
+    returns.iloc[:30, 5] = np.nan  # late listing: no return
+    dates = returns.index[[10, 60, 120]]
+    targets = pd.DataFrame(
+        [
+            [0.5, 0.5, 0.0, 0.0, 0.0, 0.0],
+            [0.0, 0.4, 0.4, -0.2, 0.0, 0.0],
+            [0.0, 0.0, 0.0, 0.3, 0.3, 0.3],
+        ],
+        index=dates,
+        columns=returns.columns,
+    )
+
+    result = simulate_targets(returns, targets, costs=CostModel(fee_bps=10))
+
+    held, cash, expected = np.zeros(6), 1.0, []
+    for t, r in enumerate(returns.fillna(0.0).to_numpy()):
+        fee = 0.0
+        if returns.index[t] in dates:
+            target = targets.loc[returns.index[t]].to_numpy()
+            fee = FEE * np.abs(target - held).sum()
+            held, cash = target, 1.0 - target.sum()
+        value = cash + (held * (1.0 + r)).sum()
+        expected.append((1.0 - fee) * value - 1.0)
+        held, cash = held * (1.0 + r) / value, cash / value
+
+    np.testing.assert_allclose(result["returns"], expected, atol=1e-12)
+    # The cash period before the first rebalance counts as one
+    assert list(result["rebalance_dates"]) == [returns.index[0], *dates]
@@ -0,0 +1,81 @@
+import datetime as dt
+
+import pandas as pd
+
+from benchmarks.synthetic import gbm_downloader
+from price_store import PriceStore
+
+
+class CountingDownloader:
+    """Synthetic closes, recording every (ticker, start, end) requested."""
+
+    def __init__(self):
+        self.provider = gbm_downloader(seed=1)
+        self.calls = []
+
+    def __call__(self, ticker, start, end, interval="1d"):
+        self.calls.append((ticker, start, end))
+        return self.provider(ticker, start, end, interval=interval)
+
+
+def test_sync_downloads_only_missing_segments(tmp_path):
+    downloader = CountingDownloader()
+    store = PriceStore(str(tmp_path), downloader=downloader)
+
+    first = store.sync("AAA", "2020-01-01", "2020-06-01")
+    assert downloader.calls == [("AAA", dt.date(2020, 1, 1), dt.date(2020, 6, 1))]
+    assert first.index.min() >= pd.Timestamp("2020-01-01")
+    assert first.index.max() < pd.Timestamp("2020-06-01")
+
+    # Wider range: only the head and the tail are downloaded
+    downloader.calls.clear()
+    wide = store.sync("AAA", "2019-06-01", "2020-09-01")
+    assert downloader.calls == [
+        ("AAA", dt.date(2019, 6, 1), dt.date(2020, 1, 1)),
+        ("AAA", dt.date(2020, 6, 1), dt.date(2020, 9, 1)),
+    ]
+    assert store.coverage("AAA") == (dt.date(2019, 6, 1), dt.date(2020, 9, 1))
+    pd.testing.assert_series_equal(wide.loc["2020-01-01":"2020-05-31"], first)
+
+    # Covered range: read from disk
+    downloader.calls.clear()
+    inner = store.sync("AAA", "2019-07-01", "2020-08-01")
+    assert downloader.calls == []
+    assert len(inner) > 0
+
+
+def test_store_persists_across_instances(tmp_path):
+    store = PriceStore(str(tmp_path), downloader=CountingDownloader())
+    prices = store.sync("AAA", "2020-01-01", "2020-06-01")
+
+    downloader = CountingDownloader()
+    reopened = PriceStore(str(tmp_path), downloader=downloader)
+    pd.testing.assert_series_equal(reopened.sync("AAA", "2020-01-01", "2020-06-01"), prices)
+    assert downloader.calls == []
+
+
+def test_empty_answer_is_downloaded_again(tmp_path):
+    answers = [None]
+
+    def flaky(ticker, start, end):
+        return answers.pop() if answers else gbm_downloader()(ticker, start, end)
+
+    store = PriceStore(str(tmp_path), downloader=flaky)
+    assert store.sync("AAA", "2020-01-01", "2020-02-01").empty
+    assert store.coverage("AAA") is None
+
+    assert len(store.sync("AAA", "2020-01-01", "2020-02-01")) > 0
+    assert store.coverage("AAA") == (dt.date(2020, 1, 1), dt.date(2020, 2, 1))
+
+
+def test_weekend_segment_is_not_downloaded(tmp_path):
+    downloader = CountingDownloader()
+    store = PriceStore(str(tmp_path), downloader=downloader)
+    store.sync("AAA", "2024-01-01", "2024-01-06")  # Monday to Saturday
+    downloader.calls.clear()
+
+    store.sync("AAA", "2024-01-01", "2024-01-08")  # + Saturday and Sunday
+    assert downloader.calls == [("AAA", dt.date(2024, 1, 6), dt.date(2024, 1, 8))]
+    downloader.calls.clear()
+    store.sync("AAA", "2024-01-01", "2024-01-08")
+    assert downloader.calls == []
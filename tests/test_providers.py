@@ -0,0 +1,140 @@
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import gbm_downloader
+from providers import (
+    FileProvider,
+    ProviderError,
+    RecordingProvider,
+    TransientProviderError,
+    YahooProvider,
+    yahoo_close_downloader,
+)
+
+
+def scripted_download(*answers):
+    """Downloader returning (or raising) `answers` in order."""
+    answers = list(answers)
+    calls = []
+
+    def download(ticker, start, end, interval="1d"):
+        calls.append((ticker, start, end, interval))
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    download.calls = calls
+    return download
+
+
+def test_yahoo_provider_retries_with_backoff():
+    prices = gbm_downloader()("AAA", "2020-01-01", "2020-03-01")
+    download = scripted_download(ConnectionError("reset"), TimeoutError("slow"), prices)
+    delays = []
+    provider = YahooProvider(retries=3, backoff=1.0, download=download, sleep=delays.append)
+
+    result = provider("AAA", "2020-01-01", "2020-03-01")
+
+    pd.testing.assert_series_equal(result, prices)
+    assert len(download.calls) == 3
+    # Exponential backoff with jitter in [0.5, 1] x base * 2**attempt
+    assert 0.5 <= delays[0] <= 1.0 and 1.0 <= delays[1] <= 2.0
+    assert provider.stats == {"calls": 1, "retries": 2, "failures": 0}
+
+
+def test_yahoo_provider_raises_after_retries():
+    download = scripted_download(*[ConnectionError("down")] * 3)
+    provider = YahooProvider(retries=2, download=download, sleep=lambda s: None)
+
+    with pytest.raises(ProviderError) as info:
+        provider("AAA", "2020-01-01", "2020-03-01")
+
+    assert info.value.ticker == "AAA"
+    assert info.value.attempts == 3
+    assert "ConnectionError: down" in str(info.value)
+    assert provider.stats == {"calls": 1, "retries": 2, "failures": 1}
+
+
+def test_delisted_symbol_fails_without_retry():
+    delisted = ProviderError("OLD", "possibly delisted; no price data found")
+    download = scripted_download(delisted)
+    provider = YahooProvider(retries=3, download=download, sleep=pytest.fail)
+
+    with pytest.raises(ProviderError) as info:
+        provider("OLD", "2020-01-01", "2020-03-01")
+
+    assert info.value is delisted
+    assert len(download.calls) == 1
+    assert provider.stats == {"calls": 1, "retries": 0, "failures": 1}
+
+
+def test_rate_limit_is_retried():
+    prices = gbm_downloader()("AAA", "2020-01-01", "2020-03-01")
+    download = scripted_download(TransientProviderError("AAA", "Too Many Requests"), prices)
+    provider = YahooProvider(retries=3, download=download, sleep=lambda s: None)
+
+    pd.testing.assert_series_equal(provider("AAA", "2020-01-01", "2020-03-01"), prices)
+    assert provider.stats == {"calls": 1, "retries": 1, "failures": 0}
+
+
+def test_unexpected_errors_are_not_retried():
+    download = scripted_download(KeyError("Close"))
+    provider = YahooProvider(retries=3, download=download, sleep=pytest.fail)
+
+    with pytest.raises(ProviderError, match="KeyError"):
+        provider("AAA", "2020-01-01", "2020-03-01")
+    assert len(download.calls) == 1
+
+
+def test_no_data_is_not_retried():
+    download = scripted_download(None)
+    provider = YahooProvider(download=download, sleep=lambda s: None)
+
+    assert provider("AAA", "2020-01-01", "2020-03-01") is None
+    assert provider.stats == {"calls": 1, "retries": 0, "failures": 0}
+
+
+def test_recorded_answers_replay_offline(tmp_path):
+    source = gbm_downloader(seed=3)
+    recorder = RecordingProvider(source, str(tmp_path))
+    # Two overlapping requests are merged into one fixture
+    recorder("AAA", "2020-01-01", "2020-04-01")
+    recorder("AAA", "2020-03-01", "2020-06-01")
+
+    replay = FileProvider(str(tmp_path))
+    expected = source("AAA", "2020-01-01", "2020-06-01")
+    replayed = replay("AAA", "2020-01-01", "2020-06-01")
+    assert replayed.index.equals(pd.DatetimeIndex(expected.index))
+    assert replayed.to_numpy() == pytest.approx(expected.to_numpy())
+
+    assert replay("AAA", "2021-01-01", "2021-02-01") is None
+    assert replay("BBB", "2020-01-01", "2020-06-01") is None
+
+
+def test_yfinance_errors_are_classified(monkeypatch):
+    errors = {
+        "OLD": "$OLD: possibly delisted; no price data found",
+        "AAA": "YFRateLimitError('Too Many Requests. Rate limited.')",
+    }
+    fake = types.SimpleNamespace(
+        download=lambda *args, **kwargs: pd.DataFrame(),
+        shared=types.SimpleNamespace(_ERRORS=errors),
+    )
+    monkeypatch.setitem(sys.modules, "yfinance", fake)
+
+    with pytest.raises(ProviderError) as info:
+        yahoo_close_downloader("OLD", "2020-01-01", "2020-03-01")
+    assert not isinstance(info.value, TransientProviderError)
+    with pytest.raises(TransientProviderError):
+        yahoo_close_downloader("AAA", "2020-01-01", "2020-03-01")
+    assert yahoo_close_downloader("BBB", "2020-01-01", "2020-03-01") is None
+
+
+def test_missing_yfinance_error_registry_means_no_data(monkeypatch):
+    fake = types.SimpleNamespace(download=lambda *args, **kwargs: pd.DataFrame())
+    monkeypatch.setitem(sys.modules, "yfinance", fake)
+    assert yahoo_close_downloader("AAA", "2020-01-01", "2020-03-01") is None
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from metrics import compute_performance_metrics
+from rolling import (
+    rolling_beta,
+    rolling_correlation,
+    rolling_sharpe,
+    rolling_var,
+    rolling_volatility,
+)
+
+WINDOW = 30
+
+
+def returns_panel(n: int = 160, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2023-01-02", periods=n)
+    common = rng.normal(0.0, 0.01, (n, 1))
+    panel = pd.DataFrame(
+        0.01 + common + rng.normal(0.0005, 0.01, (n, 3)), index=index, columns=["A", "B", "C"]
+    )
+    panel.iloc[:20, 1] = np.nan  # late listing
+    panel.iloc[70, 2] = np.nan  # gap
+    return panel
+
+
+def naive_rolling(panel: pd.DataFrame, stat) -> pd.DataFrame:
+    """stat(window) for every full window of every column, by explicit slicing."""
+    out = pd.DataFrame(np.nan, index=panel.index, columns=panel.columns)
+    for name in panel:
+        for t in range(WINDOW - 1, len(panel)):
+            window = panel[name].iloc[t - WINDOW + 1 : t + 1]
+            if window.notna().all():
+                out.iloc[t, out.columns.get_loc(name)] = stat(window)
+    return out
+
+
+def test_rolling_moments_match_window_by_window_metrics():
+    panel = returns_panel()
+
+    for periods in (252, 365):
+        vol = naive_rolling(
+            panel, lambda w: compute_performance_metrics(w, periods_per_year=periods)["ann_vol"]
+        )
+        sharpe = naive_rolling(
+            panel,
+            lambda w: compute_performance_metrics(w, 0.03, periods_per_year=periods)["sharpe"],
+        )
+        pd.testing.assert_frame_equal(rolling_volatility(panel, WINDOW, periods), vol, rtol=1e-8)
+        pd.testing.assert_frame_equal(
+            rolling_sharpe(panel, WINDOW, 0.03, periods), sharpe, rtol=1e-8
+        )
+
+    var = naive_rolling(panel, lambda w: np.percentile(w, 5))
+    pd.testing.assert_frame_equal(rolling_var(panel, WINDOW), var, rtol=1e-10)
+
+
+def test_rolling_beta_and_correlation_match_numpy_per_window():
+    panel = returns_panel(seed=1)
+    bench = panel["A"].rename("bench")
+    beta = rolling_beta(panel[["B", "C"]], bench, WINDOW)
+    corr = rolling_correlation(panel, WINDOW)
+    assert list(corr.columns) == ["A / B", "A / C", "B / C"]
+
+    for t in range(WINDOW - 1, len(panel)):
+        window = panel.iloc[t - WINDOW + 1 : t + 1]
+        for other in ("B", "C"):
+            pair = window[["A", other]]
+            if pair.isna().any().any():
+                assert np.isnan(beta[other].iloc[t])
+                assert np.isnan(corr[f"A / {other}"].iloc[t])
+                continue
+            cov = np.cov(pair["A"], pair[other])
+            np.testing.assert_allclose(beta[other].iloc[t], cov[0, 1] / cov[0, 0], rtol=1e-8)
+            np.testing.assert_allclose(
+                corr[f"A / {other}"].iloc[t], np.corrcoef(pair["A"], pair[other])[0, 1], rtol=1e-8
+            )
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import gbm_asset_frame
+from costs import CostModel
+from strategies import (
+    momentum_strategy,
+    momentum_sweep,
+    moving_average_strategy,
+    moving_average_sweep,
+    strategy_metrics,
+)
+
+METRICS = ["cum_return", "ann_vol", "sharpe", "max_dd", "n_trades", "turnover", "cost_drag"]
+
+
+def assert_row_matches(row, expected: dict):
+    for name in METRICS:
+        np.testing.assert_allclose(row[name], expected[name], rtol=1e-8, atol=1e-12, err_msg=name)
+
+
+@pytest.mark.parametrize("costs", [None, CostModel(fee_bps=10, slippage_bps=5)])
+def test_ma_sweep_matches_one_backtest_per_pair(costs):
+    data = gbm_asset_frame(600, seed=4)
+    sweep = moving_average_sweep(
+        data, [5, 10, 20, 40], [10, 20, 40, 80], rf=0.02, periods_per_year=365, costs=costs
+    )
+    # Only short < long pairs
+    assert len(sweep) == 10
+    assert (sweep["short_window"] < sweep["long_window"]).all()
+
+    for _, row in sweep.iterrows():
+        result = moving_average_strategy(
+            data, int(row["short_window"]), int(row["long_window"]), costs=costs
+        )
+        assert_row_matches(row, strategy_metrics(result, rf=0.02, periods_per_year=365))
+
+
+@pytest.mark.parametrize("costs", [None, CostModel(fee_bps=10, slippage_bps=5)])
+def test_momentum_sweep_matches_one_backtest_per_lookback(costs):
+    data = gbm_asset_frame(600, seed=5)
+    sweep = momentum_sweep(data, [60, 5, 20, 120], rf=0.02, costs=costs)
+    assert list(sweep["lookback"]) == [5, 20, 60, 120]
+
+    for _, row in sweep.iterrows():
+        result = momentum_strategy(data, int(row["lookback"]), costs=costs)
+        assert_row_matches(row, strategy_metrics(result, rf=0.02))
+
+
+def test_sweep_chunks_do_not_change_the_result(monkeypatch):
+    data = gbm_asset_frame(600, seed=6)
+    whole = moving_average_sweep(data, [5, 10, 20], [20, 40, 80])
+    monkeypatch.setattr("strategies.SWEEP_CHUNK_SIZE", 1_000)  # one combination per chunk
+    pd.testing.assert_frame_equal(moving_average_sweep(data, [5, 10, 20], [20, 40, 80]), whole)
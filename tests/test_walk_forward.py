@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import gbm_prices
+from walk_forward import run_walk_forward, walk_forward_splits
+
+
+def test_splits_roll_over_the_history():
+    assert walk_forward_splits(10, train=4, test=2) == [(0, 4, 6), (2, 6, 8), (4, 8, 10)]
+
+
+def test_crypto_folds_are_annualized_over_365_days():
+    prices = gbm_prices(700, 1, seed=3).iloc[:, 0]
+    # Same closes on a calendar that includes weekends
+    crypto = pd.Series(prices.to_numpy(), index=pd.date_range("2020-01-01", periods=700))
+    folds, summary = run_walk_forward(
+        {"EQ": prices, "CRYPTO": crypto}, "momentum", train=300, test=100, workers=1
+    )
+
+    summary = summary.set_index("ticker")
+    ratio = summary.loc["CRYPTO", "ann_vol"] / summary.loc["EQ", "ann_vol"]
+    assert ratio == pytest.approx(np.sqrt(365 / 252))
+    assert summary.loc["CRYPTO", "cum_return"] == pytest.approx(summary.loc["EQ", "cum_return"])
+    fold_vol = folds.groupby("ticker")["test_ann_vol"].mean()
+    assert fold_vol["CRYPTO"] == pytest.approx(fold_vol["EQ"] * np.sqrt(365 / 252))
@@ -0,0 +1,29 @@
+# ----------------- Asset universe -----------------
+UNIVERSE = {
+    "Engie (ENGI)": "ENGI.PA",
+    "CAC 40": "^FCHI",
+    "EURUSD": "EURUSD=X",
+    "Bitcoin": "BTC-USD",
+    "Ethereum": "ETH-USD",
+    "Solana": "SOL-USD",
+    "WTI Crude Oil": "CL=F",
+    "Natural Gas": "NG=F",
+}
+
+UNIVERSE_BY_CATEGORY = {
+    "Equities / Indices": {
+        "Engie (ENGI)": "ENGI.PA",
+        "CAC 40": "^FCHI",
+    },
+    "Forex": {"EURUSD": "EURUSD=X"},
+    "Crypto": {
+        "Bitcoin": "BTC-USD",
+        "Ethereum": "ETH-USD",
+        "Solana": "SOL-USD",
+    },
+    "Commodities": {
+        "WTI Crude Oil": "CL=F",
+        "Natural Gas": "NG=F",
+    },
+    "Mixed (all types)": UNIVERSE,
+}
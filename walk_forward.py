@@ -0,0 +1,305 @@
+"""
+Walk-forward optimization of the MA and momentum strategies.
+
+For each ticker the history is cut into rolling train/test windows. The best
+parameters (by Sharpe) are picked on each train slice with the vectorized
+sweeps from strategies.py, then applied out-of-sample on the following test
+slice. Folds and tickers are spread over a process pool; prices live in a
+shared-memory block so workers do not each receive a pickled DataFrame.
+
+Example:
+    python walk_forward.py --tickers ^FCHI BTC-USD --start 2015-01-01 \
+        --strategy ma --train 504 --test 126 --workers 4 --output wf.csv
+"""
+import argparse
+import datetime as dt
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from costs import CostModel, turnover_metrics
+from metrics import compute_performance_metrics
+from data import get_price_store
+from intraday import infer_bars_per_year
+from strategies import (
+    momentum_strategy,
+    momentum_sweep,
+    moving_average_strategy,
+    moving_average_sweep,
+)
+
+DEFAULT_GRIDS = {
+    "ma": {"short_windows": range(5, 101, 5), "long_windows": range(20, 251, 10)},
+    "momentum": {"lookbacks": range(5, 251, 5)},
+}
+
+# Used for a fold whose train slice gives no defined Sharpe ratio (e.g. flat prices)
+DEFAULT_PARAMS = {
+    "ma": {"short_window": 20, "long_window": 50},
+    "momentum": {"lookback": 60},
+}
+
+
+# ----------------- Splits -----------------
+def walk_forward_splits(n: int, train: int, test: int, step: int | None = None) -> list:
+    """Rolling (train_start, train_end, test_end) positions over n bars."""
+    step = step or test
+    splits = []
+    start = 0
+    while start + train + test <= n:
+        splits.append((start, start + train, start + train + test))
+        start += step
+    return splits
+
+
+# ----------------- Shared price panel -----------------
+class SharedPricePanel:
+    """
+    Concatenated price histories of several tickers in one shared-memory
+    block (dates as int64 ns + prices as float64), with per-ticker offsets.
+    """
+
+    def __init__(self, tickers, offsets, shm_name: str, owner: bool = False):
+        self.tickers = list(tickers)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._shm = shared_memory.SharedMemory(name=shm_name)
+        self._owner = owner
+        total = int(self.offsets[-1])
+        self.dates = np.ndarray((total,), dtype=np.int64, buffer=self._shm.buf)
+        self.prices = np.ndarray(
+            (total,), dtype=np.float64, buffer=self._shm.buf, offset=total * 8
+        )
+
+    @classmethod
+    def create(cls, series: dict) -> "SharedPricePanel":
+        tickers = list(series)
+        lengths = [len(series[t]) for t in tickers]
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        total = int(offsets[-1])
+        shm = shared_memory.SharedMemory(create=True, size=max(total * 16, 1))
+        panel = cls(tickers, offsets, shm.name, owner=True)
+        shm.close()
+        for i, t in enumerate(tickers):
+            lo, hi = offsets[i], offsets[i + 1]
+            dates = series[t].index.to_numpy(dtype="datetime64[ns]")
+            panel.dates[lo:hi] = dates.view(np.int64)
+            panel.prices[lo:hi] = series[t].to_numpy(dtype=float)
+        return panel
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def frame(self, i: int) -> pd.DataFrame:
+        """price/return frame of ticker i (prices are a view on shared memory)."""
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        index = pd.DatetimeIndex(self.dates[lo:hi].view("datetime64[ns]"))
+        df = pd.DataFrame({"price": self.prices[lo:hi]}, index=index)
+        df["return"] = df["price"].pct_change()
+        return df.dropna()
+
+    def close(self):
+        # Drop the numpy views before releasing the buffer
+        self.dates = self.prices = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+_panel = None
+
+
+def _init_worker(tickers, offsets, shm_name):
+    global _panel
+    _panel = SharedPricePanel(tickers, offsets, shm_name)
+
+
+# ----------------- Folds -----------------
+def _best_params(
+    train_df: pd.DataFrame,
+    strategy: str,
+    grid: dict,
+    costs: CostModel | None = None,
+    periods_per_year: float = 252,
+) -> tuple[dict, float]:
+    if strategy == "ma":
+        sweep = moving_average_sweep(
+            train_df,
+            grid["short_windows"],
+            grid["long_windows"],
+            periods_per_year=periods_per_year,
+            costs=costs,
+        )
+        names = ["short_window", "long_window"]
+    else:
+        sweep = momentum_sweep(
+            train_df, grid["lookbacks"], periods_per_year=periods_per_year, costs=costs
+        )
+        names = ["lookback"]
+    ranked = sweep["sharpe"].dropna()
+    if ranked.empty:
+        return dict(DEFAULT_PARAMS[strategy]), float("nan")
+    best = sweep.loc[ranked.idxmax()]
+    return {name: int(best[name]) for name in names}, float(best["sharpe"])
+
+
+def _apply(df: pd.DataFrame, strategy: str, params: dict, costs: CostModel | None = None):
+    if strategy == "ma":
+        return moving_average_strategy(df, **params, costs=costs)
+    return momentum_strategy(df, **params, costs=costs)
+
+
+def run_fold(
+    ticker_idx: int,
+    split: tuple,
+    strategy: str,
+    grid: dict,
+    costs: CostModel | None = None,
+    periods_per_year: float = 252,
+) -> tuple[dict, pd.Series]:
+    """
+    Optimize on the train slice, evaluate on the test slice (net of costs,
+    annualized with the ticker's periods_per_year).
+    """
+    df = _panel.frame(ticker_idx)
+    train_start, train_end, test_end = split
+    train_df = df.iloc[train_start:train_end]
+
+    params, train_sharpe = _best_params(train_df, strategy, grid, costs, periods_per_year)
+
+    # Run on all history up to the end of the test slice so indicators are
+    # warmed up, then keep only the out-of-sample part.
+    result = _apply(df.iloc[:test_end], strategy, params, costs).iloc[train_end:test_end]
+    oos = result["strategy_return"]
+    test_metrics = compute_performance_metrics(oos, periods_per_year=periods_per_year)
+    test_metrics.update(turnover_metrics(result["trade"], result["cost"], periods_per_year))
+
+    row = {
+        "ticker": _panel.tickers[ticker_idx],
+        "strategy": strategy,
+        "train_start": df.index[train_start].date(),
+        "test_start": df.index[train_end].date(),
+        "test_end": df.index[test_end - 1].date(),
+        **params,
+        "train_sharpe": train_sharpe,
+        **{f"test_{k}": v for k, v in test_metrics.items()},
+    }
+    return row, oos
+
+
+def _run_fold_task(args):
+    return run_fold(*args)
+
+
+def run_walk_forward(
+    series: dict,
+    strategy: str = "ma",
+    train: int = 504,
+    test: int = 126,
+    step: int | None = None,
+    grid: dict | None = None,
+    workers: int | None = None,
+    costs: CostModel | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Walk-forward analysis over {ticker: price Series}, net of `costs`.
+    Returns (folds, summary): one row per fold, and one row per ticker with
+    the metrics of the stitched out-of-sample returns.
+    """
+    if strategy not in DEFAULT_GRIDS:
+        raise ValueError(f"Unknown strategy: {strategy!r}")
+    grid = grid or DEFAULT_GRIDS[strategy]
+    workers = workers or os.cpu_count() or 1
+
+    # Per ticker: 365 periods a year for 24/7 markets (crypto), 252 otherwise
+    periods = {t: infer_bars_per_year(prices.index) for t, prices in series.items()}
+
+    global _panel
+    panel = SharedPricePanel.create(series)
+    try:
+        tasks = []
+        for i, ticker in enumerate(panel.tickers):
+            n_returns = int(panel.offsets[i + 1] - panel.offsets[i]) - 1
+            for split in walk_forward_splits(n_returns, train, test, step):
+                tasks.append((i, split, strategy, grid, costs, periods[ticker]))
+
+        if workers == 1:
+            _panel = panel
+            results = [_run_fold_task(t) for t in tasks]
+            _panel = None
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(panel.tickers, panel.offsets, panel.name),
+            ) as pool:
+                results = list(pool.map(_run_fold_task, tasks, chunksize=4))
+    finally:
+        panel.close()
+
+    folds = pd.DataFrame([row for row, _ in results])
+
+    oos_by_ticker = {}
+    for row, oos in results:
+        oos_by_ticker.setdefault(row["ticker"], []).append(oos)
+    rows = []
+    for ticker, parts in oos_by_ticker.items():
+        # Overlapping test slices (step < test) keep the earliest fold's return
+        oos = pd.concat(parts)
+        oos = oos[~oos.index.duplicated(keep="first")]
+        metrics = compute_performance_metrics(oos, periods_per_year=periods[ticker])
+        rows.append({"ticker": ticker, "n_folds": len(parts), **metrics})
+    summary = pd.DataFrame(rows)
+    return folds, summary
+
+
+# ----------------- CLI -----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward strategy optimization.")
+    parser.add_argument("--tickers", nargs="+", required=True)
+    parser.add_argument("--start", default="2015-01-01")
+    parser.add_argument("--end", default=dt.date.today().isoformat())
+    parser.add_argument("--strategy", choices=sorted(DEFAULT_GRIDS), default="ma")
+    parser.add_argument("--train", type=int, default=504, help="train bars per fold")
+    parser.add_argument("--test", type=int, default=126, help="test bars per fold")
+    parser.add_argument("--step", type=int, default=None, help="bars between folds (default: test)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--fee-bps", type=float, default=0.0, help="proportional fee per trade")
+    parser.add_argument("--slippage-bps", type=float, default=0.0)
+    parser.add_argument("--output", default="walk_forward_folds.csv")
+    args = parser.parse_args(argv)
+
+    store = get_price_store()
+    series = {}
+    for ticker in args.tickers:
+        prices = store.sync(ticker, args.start, args.end)
+        if prices.empty:
+            print(f"WARNING: no data for {ticker}, skipped.")
+            continue
+        series[ticker] = prices
+
+    if not series:
+        print("ERROR: no data for any ticker.")
+        return 1
+
+    folds, summary = run_walk_forward(
+        series,
+        strategy=args.strategy,
+        train=args.train,
+        test=args.test,
+        step=args.step,
+        workers=args.workers,
+        costs=CostModel(fee_bps=args.fee_bps, slippage_bps=args.slippage_bps),
+    )
+    folds.to_csv(args.output, index=False)
+    print(f"{len(folds)} folds saved to {args.output}")
+    if not summary.empty:
+        print(summary.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())